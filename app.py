@@ -9,6 +9,7 @@ from stock_analysis.presentation.controllers.daily import DailyController
 from stock_analysis.presentation.controllers.scanner import ScannerController
 from stock_analysis.presentation.plotting import plot_intraday_openingbell
 from stock_analysis.services.watchlist import WatchlistService
+from stock_analysis.services.enrichment import LazyEnricher
 
 # Presets + רישום אסטרטגיות
 from stock_analysis.strategies.filters import presets_for_openingbell
@@ -36,15 +37,27 @@ UIState.init()
 # ---- UI forms (sidebar) ----
 ui, scan = sidebar()
 
+def _apply_sector_bench():
+    # הטוגל חל מיד: רושם מחדש את OpeningBell+ עם אותם פילטרים (ה-preset הנוכחי) ובנצ'מרק חדש
+    current = strategy_registry.get("OpeningBell+")
+    strategy_registry.register("OpeningBell+", OpeningBellPlus(
+        filters=getattr(current, "filters", None),
+        sector_benchmark=bool(st.session_state.get("ob_sector_bench", False)),
+    ))
+
 # ===== OpeningBell+ Tuning (Preset / Quality / Late Reclaim) =====
 with st.sidebar.expander("⚙️ OpeningBell+ Tuning", expanded=False):
     preset = st.selectbox("Preset", ["Loose", "Default", "Strict"],
                           index=["Loose","Default","Strict"].index(st.session_state.get("ob_preset", "Default")),
                           key="ob_preset_select")
+    # RS30m מול ETF הסקטור (XLK/XLF/...) במקום SPY
+    sector_bench = st.toggle("Sector ETF benchmark",
+                             value=bool(st.session_state.get("ob_sector_bench", False)),
+                             key="ob_sector_bench", on_change=_apply_sector_bench)
     if st.button("Apply preset", use_container_width=True, key="apply_preset"):
         fcfg = presets_for_openingbell(preset)
         # רושם/מעדכן את OpeningBell+ עם הפילטרים החדשים
-        strategy_registry.register("OpeningBell+", OpeningBellPlus(filters=fcfg))
+        strategy_registry.register("OpeningBell+", OpeningBellPlus(filters=fcfg, sector_benchmark=sector_bench))
         st.success(f"Preset applied: {preset}")
         st.session_state["ob_preset"] = preset
         st.rerun()
@@ -84,9 +97,14 @@ with st.sidebar:
 def _get_screener(min_p: float, max_p: float):
     return build_screener(min_p, max_p)
 
+@st.cache_resource
+def _get_enricher(min_p: float, max_p: float):
+    # memo של סנטימנט/צ'קליסט משותף לכל ה-reruns והסשנים
+    return LazyEnricher(_get_screener(min_p, max_p))
+
 screener = _get_screener(ui.min_price, ui.max_price)
 daily = DailyController(screener)
-scanner = ScannerController(screener)
+scanner = ScannerController(screener, enricher=_get_enricher(ui.min_price, ui.max_price))
 
 with st.sidebar.expander("📦 Universe Data", expanded=False):
     st.caption(f"עדכון אחרון לקובץ S&P 500: {get_last_update_date()}")
@@ -131,16 +149,18 @@ if ui.run_intraday and ui.symbol:
         st.dataframe(out.tail(50)[show_cols], use_container_width=True)
 
 # ---- Bulk scans ----
-bulk_df = None
-bulk_results = None
+# תוצאות הסריקה האחרונה נשמרות ב-session כדי שהעשרה לפי דרישה (selectbox/expanders) תשרוד rerun
+bulk_df, bulk_results = scanner.last_results()
 
 if scan.run_sp500:
     with st.spinner("Scanning S&P 500..."):
-        bulk_df, bulk_results = scanner.run_sp500(limit=scan.max_to_scan, workers=scan.workers)
+        bulk_df, bulk_results = scanner.run_sp500(limit=scan.max_to_scan, workers=scan.workers,
+                                                  engine=scan.engine, lazy=scan.lazy_enrich)
 
 if scan.run_nasdaq:
     with st.spinner("Scanning NASDAQ..."):
-        bulk_df, bulk_results = scanner.run_nasdaq(limit=scan.max_to_scan, workers=scan.workers)
+        bulk_df, bulk_results = scanner.run_nasdaq(limit=scan.max_to_scan, workers=scan.workers,
+                                                   engine=scan.engine, lazy=scan.lazy_enrich)
 
 # ---- Bulk Strategy scans ----
 if scan.run_strategy_sp500:
@@ -1,10 +1,15 @@
 # src/stock_analysis/finnhub_news.py
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
-import requests
+from typing import List, Dict, Any, Optional, Sequence
+import numpy as np
+
+from stock_analysis.infrastructure.data_providers.finnhub_news_client import default_news_client
+from stock_analysis.infrastructure.persistent.sentiment_store import (
+    ArticleSentimentStore, article_key, default_sentiment_store,
+)
 
 # ===== נסיונות טעינה "רכים" של מנועי סנטימנט =====
 _HAS_HF = True
@@ -21,6 +26,15 @@ except Exception:
     _HAS_VADER = False
     SentimentIntensityAnalyzer = None  # type: ignore
 
+HF_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+HF_BATCH_SIZE = 32
+
+# Fallback כללי (מאוד פשוט) אם אין שום מנוע מותקן
+POS_WORDS = ("beat estimates", "beats", "surge", "upgrade", "bullish",
+             "record", "strong", "growth", "profit", "top", "positive")
+NEG_WORDS = ("miss estimates", "misses", "plunge", "downgrade", "bearish",
+             "loss", "weak", "lawsuit", "cut", "negative")
+
 
 @dataclass
 class NewsItem:
@@ -35,11 +49,17 @@ class FinnhubNewsAnalyzer:
     - אם יש transformers + ביקשת להשתמש (use_hf=True): pipeline("sentiment-analysis")
     - אחרת: VADER (קל ומהיר)
     - ואם גם VADER לא קיים: fallback פשוט על בסיס מילות מפתח
+    ציוני כתבות נשמרים ב-ArticleSentimentStore (לפי id של Finnhub), כך שסריקה חוזרת
+    מנקדת רק כתבות חדשות – ואלה מנוקדות ב-batch אחד.
     """
 
-    def __init__(self, api_key: str, use_hf: bool = False, request_timeout: int = 12):
+    def __init__(self, api_key: str, use_hf: bool = False, request_timeout: int = 12,
+                 store: Optional[ArticleSentimentStore] = None):
         self.api_key = api_key
         self.request_timeout = int(request_timeout)
+        self.store = store if store is not None else default_sentiment_store()
+        # Session משותף + מושל קצב של Finnhub + cache חלונות תאריכים לפי סימבול
+        self.client = default_news_client(api_key)
 
         self._mode = "none"
         self._hf = None
@@ -49,7 +69,7 @@ class FinnhubNewsAnalyzer:
             # מודל קליל יחסית; חותכים טקסט ל-512 תווים בעת הקריאה
             self._hf = hf_pipeline(
                 "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english",
+                model=HF_MODEL,
             )
             self._mode = "hf"
         elif _HAS_VADER:
@@ -61,29 +81,33 @@ class FinnhubNewsAnalyzer:
     # ----------- Data fetching -----------
 
     def fetch_news(self, symbol: str, days_back: int = 7) -> List[Dict[str, Any]]:
-        """מביא חדשות 7 ימים אחורה (ברירת מחדל) עבור סימבול מ-Finnhub."""
+        """מביא חדשות 7 ימים אחורה (ברירת מחדל) עבור סימבול מ-Finnhub; רק ימים שעוד לא הורדו עולים רשת."""
         symbol = (symbol or "").upper().strip()
         if not symbol:
             return []
 
-        from_date = (datetime.utcnow() - timedelta(days=int(days_back))).strftime("%Y-%m-%d")
-        to_date = datetime.utcnow().strftime("%Y-%m-%d")
-
-        url = "https://finnhub.io/api/v1/company-news"
-        params = {"symbol": symbol, "from": from_date, "to": to_date, "token": self.api_key}
-
         try:
-            r = requests.get(url, params=params, timeout=self.request_timeout)
-            r.raise_for_status()
-            data = r.json()
-            # ודא שמחזירים רשימה
-            return data if isinstance(data, list) else []
+            return self.client.fetch_news(symbol, days_back=days_back, timeout=self.request_timeout)
         except Exception as e:
             print(f"❌ שגיאה בשליפת חדשות מ-Finnhub עבור {symbol}: {e}")
             return []
 
+    def fetch_news_many(self, symbols: Sequence[str], days_back: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+        """חדשות לכמה סימבולים במקביל, תחת מכסת Finnhub."""
+        wanted = list(dict.fromkeys((s or "").upper().strip() for s in symbols if s))
+        if not wanted:
+            return {}
+        # דרך self.fetch_news (ולא ישירות ל-client), כדי שהקלטה/ניגון של fetch_news יחולו גם כאן
+        with ThreadPoolExecutor(max_workers=max(1, min(self.client.workers, len(wanted)))) as ex:
+            return dict(zip(wanted, ex.map(lambda sym: self.fetch_news(sym, days_back), wanted)))
+
     # ----------- Sentiment scoring -----------
 
+    @property
+    def engine(self) -> str:
+        """מזהה המנוע לצורך ה-store: ציון של hf לא תקף ל-vader ולהפך."""
+        return f"hf:{HF_MODEL}" if self._mode == "hf" else self._mode
+
     def _score_text(self, text: str) -> float:
         """
         מחזיר ציון סנטימנט בתחום [-1..1]:
@@ -92,26 +116,48 @@ class FinnhubNewsAnalyzer:
         text = (text or "").strip()
         if not text:
             return 0.0
+        return self._score_texts([text])[0]
+
+    def _score_texts(self, texts: List[str]) -> List[float]:
+        """ניקוד ב-batch: קריאה אחת ל-pipeline של HF, או ניקוד וקטורי של מילות המפתח."""
+        if not texts:
+            return []
 
         if self._mode == "hf" and self._hf is not None:
-            out = self._hf(text[:512])[0]  # {'label': 'POSITIVE'|'NEGATIVE', 'score': float}
-            return float(out["score"] if out["label"] == "POSITIVE" else -out["score"])
+            outs = self._hf([t[:512] for t in texts], batch_size=HF_BATCH_SIZE)  # [{'label', 'score'}, ...]
+            return [float(o["score"] if o["label"] == "POSITIVE" else -o["score"]) for o in outs]
 
         if self._mode == "vader" and self._vader is not None:
-            s = self._vader.polarity_scores(text)  # {'compound': [-1..1], ...}
-            return float(s.get("compound", 0.0))
+            return [float(self._vader.polarity_scores(t).get("compound", 0.0)) for t in texts]  # [-1..1]
 
-        # Fallback כללי (מאוד פשוט) אם אין שום מנוע מותקן
-        POS_WORDS = ("beat estimates", "beats", "surge", "upgrade", "bullish",
-                     "record", "strong", "growth", "profit", "top", "positive")
-        NEG_WORDS = ("miss estimates", "misses", "plunge", "downgrade", "bearish",
-                     "loss", "weak", "lawsuit", "cut", "negative")
+        low = np.char.lower(np.asarray(texts, dtype=str))
+        pos = sum((np.char.find(low, w) >= 0).astype(np.int64) for w in POS_WORDS)
+        neg = sum((np.char.find(low, w) >= 0).astype(np.int64) for w in NEG_WORDS)
+        return np.clip(pos * 0.2 - neg * 0.2, -1.0, 1.0).astype(float).tolist()
+
+    def score_articles(self, articles: List[Dict[str, Any]]) -> List[float]:
+        """ציון לכל כתבה עם טקסט (לפי הסדר); רק כתבות שלא נוקדו בעבר עוברות במנוע."""
+        keys: List[str] = []
+        texts: List[str] = []
+        for art in articles or []:
+            title = art.get("headline", "") or ""
+            summary = art.get("summary", "") or ""
+            text = f"{title}. {summary}".strip()
+            if not text:
+                continue
+            keys.append(article_key(art, text))
+            texts.append(text)
+        if not texts:
+            return []
 
-        low = text.lower()
-        score = 0.0
-        score += sum(1 for w in POS_WORDS if w in low) * 0.2
-        score -= sum(1 for w in NEG_WORDS if w in low) * 0.2
-        return max(-1.0, min(1.0, score))
+        known = self.store.get_many(self.engine, keys) if self.store is not None else {}
+        todo = {k: t for k, t in zip(keys, texts) if k not in known}  # אותה כתבה פעמיים -> ניקוד אחד
+        if todo:
+            fresh = dict(zip(todo, self._score_texts(list(todo.values()))))
+            if self.store is not None:
+                self.store.put_many(self.engine, fresh)
+            known = {**known, **fresh}
+        return [known[k] for k in keys]
 
     def analyze_sentiment(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -121,14 +167,7 @@ class FinnhubNewsAnalyzer:
         pos = neg = neu = 0
         total = 0
 
-        for art in articles or []:
-            title = art.get("headline", "") or ""
-            summary = art.get("summary", "") or ""
-            text = f"{title}. {summary}".strip()
-            if not text:
-                continue
-
-            s = self._score_text(text)
+        for s in self.score_articles(articles):
             total += 1
 
             # סיווג לפי סף סטנדרטי (VADER): >0.05=חיובי, <-0.05=שלילי, אחרת ניטרלי
@@ -10,6 +10,7 @@ from stock_analysis.application.config import AppConfig
 from stock_analysis.application.services.live_engine import LiveEngine, EngineConfig
 from stock_analysis.application.strategies.opening_bell_strategy import OpeningBellStrategy
 from stock_analysis.infrastructure.feeds.yfinance_feed import YFinanceFeed
+from stock_analysis.infrastructure.recording.wrappers import feed_from_env
 from stock_analysis.infrastructure.sinks.console_sink import ConsoleSink
 from stock_analysis.infrastructure.sinks.telegram_sink import TelegramSink
 from stock_analysis.infrastructure.sinks.streamlit_sink import StreamlitSink
@@ -91,7 +92,7 @@ def run_engine(
     # AppConfig לא חובה פה, אם אתה משתמש בו מאוחר יותר אתה יכול לשלב
     sink = _build_sink(use_console, use_streamlit, use_telegram)
     engine = LiveEngine(
-        feed=YFinanceFeed(),
+        feed=feed_from_env(YFinanceFeed()),
         sink=sink,
         strategy=OpeningBellStrategy(),
         cfg=EngineConfig(
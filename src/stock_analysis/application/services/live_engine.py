@@ -7,6 +7,7 @@ import pandas as pd
 import pytz
 
 from ...domain.entities import Signal
+from ...features.streaming import BarIndicators
 from ...domain.ports import MarketDataFeed, AlertSink
 from ..strategies.base_strategy import BaseStrategy
 from .trading import TradeExecutor, RiskManager, TradeConfig
@@ -53,6 +54,8 @@ class LiveEngine:
         self.strategy = strategy
         self.cfg = cfg
         self._signaled: set[str] = set()
+        # מצב אינדיקטורים לכל טיקר: כל poll מכניס רק את הנרות החדשים
+        self._indicators: dict[str, BarIndicators] = {}
 
         self.trade_cfg = TradeConfig(
             position_size=cfg.position_size,
@@ -113,7 +116,8 @@ class LiveEngine:
         if df5.empty:
             log.debug("[%s] empty df", ticker); return
 
-        should, reason = self.strategy.evaluate_opening_bar(df5)
+        state = self._indicators.setdefault(ticker, BarIndicators())
+        should, reason = self.strategy.evaluate_opening_bar(df5, state=state)
         log.info("[%s] strategy result | should=%s | %s", ticker, should, reason)
 
         if not should:
@@ -1,8 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Optional, Tuple
 import pandas as pd
 
+from stock_analysis.features.streaming import BarIndicators
+
 
 class BaseStrategy(ABC):
     def name(self) -> str:
@@ -10,6 +12,9 @@ class BaseStrategy(ABC):
 
 
     @abstractmethod
-    def evaluate_opening_bar(self, df5: pd.DataFrame) -> Tuple[bool, str]:
-        """Return (should_signal, reason). Requires first 5m bar of today + prior history."""
+    def evaluate_opening_bar(self, df5: pd.DataFrame, state: Optional[BarIndicators] = None) -> Tuple[bool, str]:
+        """
+        Return (should_signal, reason). Requires first 5m bar of today + prior history.
+        state: מצב אינדיקטורים אינקרמנטלי של הטיקר (LiveEngine) – אם ניתן, אין חישוב מחדש על כל ההיסטוריה.
+        """
         raise NotImplementedError
\ No newline at end of file
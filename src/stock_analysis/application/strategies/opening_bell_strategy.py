@@ -2,6 +2,8 @@ import numpy as np
 import pandas as pd
 import pytz
 from datetime import datetime
+from typing import Optional
+from stock_analysis.features.streaming import BarIndicators
 from .base_strategy import BaseStrategy
 
 US_EASTERN = pytz.timezone("US/Eastern")
@@ -19,9 +21,11 @@ def _as_series_close(df: pd.DataFrame) -> pd.Series:
 
 
 class OpeningBellStrategy(BaseStrategy):
-    def evaluate_opening_bar(self, df5: pd.DataFrame):
+    def evaluate_opening_bar(self, df5: pd.DataFrame, state: Optional[BarIndicators] = None):
         if df5.empty:
             return False, "empty df"
+        if state is not None:
+            return self._evaluate_streaming(df5, state)
 
         # הבטח TZ
         if df5.index.tz is None:
@@ -74,23 +78,34 @@ class OpeningBellStrategy(BaseStrategy):
 
         sma20 = _as_scalar(row_at_open["SMA20"])
         sma200 = _as_scalar(row_at_open["SMA200"])
-        if pd.isna(sma20) or pd.isna(sma200):
-            return False, "not enough history for SMA"
-
         open_high = _as_scalar(open_bar["High"])
         prev_close = _as_scalar(prev_day_last["Close"])
+        return self._decide(sma20, sma200, open_high, prev_close)
 
-        cond1 = sma20 > sma200
-        cond2 = open_high > prev_close
-
-        if cond1 and cond2:
-            reason = (
+    @staticmethod
+    def _decide(sma20: float, sma200: float, open_high: float, prev_close: float):
+        if pd.isna(sma20) or pd.isna(sma200):
+            return False, "not enough history for SMA"
+        if sma20 > sma200 and open_high > prev_close:
+            return True, (
                 f"SMA20({sma20:.2f})>SMA200({sma200:.2f}) & "
                 f"OpenHigh({open_high:.2f})>PrevClose({prev_close:.2f})"
             )
-            return True, reason
-
         return False, (
             f"no-signal (SMA20={sma20:.2f}, SMA200={sma200:.2f}, "
             f"openHigh={open_high:.2f}, prevClose={prev_close:.2f})"
         )
+
+    def _evaluate_streaming(self, df5: pd.DataFrame, state: BarIndicators):
+        """
+        אותם תנאים, מתוך מצב אינקרמנטלי: sync מכניס רק נרות חדשים (O(1) לנר),
+        ו-snapshot נר הפתיחה נותן SMA20/SMA200 + PrevClose בלי לסרוק את ההיסטוריה.
+        """
+        state.sync(df5)
+        today = datetime.now(US_EASTERN).date()
+        snap = state.opening(today)
+        if snap is None:
+            return False, "no today bars yet"
+        if pd.isna(snap["PrevClose"]):
+            return False, "no previous day bars"
+        return self._decide(snap["SMA20"], snap["SMA200"], snap["High"], snap["PrevClose"])
@@ -6,6 +6,8 @@ import pandas as pd
 class DataProvider(Protocol):
     def info(self, symbol: str) -> Mapping[str, Any]: ...
     def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame: ...
+    # הורדה מרוכזת: (frames לפי סימבול, רשימת סימבולים חסרים)
+    def history_many(self, symbols: Sequence[str], period: str = "1y", interval: str = "1d") -> tuple[dict[str, pd.DataFrame], list[str]]: ...
     def last_price(self, symbol: str) -> float | None: ...
 
 @runtime_checkable
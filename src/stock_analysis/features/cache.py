@@ -0,0 +1,179 @@
+# src/stock_analysis/features/cache.py
+from __future__ import annotations
+import hashlib, os, pickle, threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable, Optional, Tuple
+
+import pandas as pd
+
+from stock_analysis.features.pipeline import Pipeline
+from stock_analysis.infrastructure.utils.single_flight import default_flight
+
+# ===== הגדרות (ENV) =====
+FEATURE_CACHE_MAX_MB = float(os.getenv("FEATURE_CACHE_MAX_MB", "256"))   # תקרת זיכרון לשכבת ה-LRU
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", "")                   # ריק = בלי שכבת דיסק
+
+
+def frame_fingerprint(df: pd.DataFrame) -> Tuple:
+    """
+    זהות הנרות שנכנסו לחישוב: נר ראשון/אחרון, מספר נרות, ו-Close/Volume של הנר האחרון
+    (הנר היומי של היום מתעדכן במהלך המסחר עם אותו timestamp).
+    """
+    if df is None or df.empty:
+        return ("empty",)
+    idx = df.index
+    last = df.iloc[-1]
+    close = last.get("Close", last.get("close"))
+    volume = last.get("Volume", last.get("volume"))
+    return (pd.Timestamp(idx[0]).value, pd.Timestamp(idx[-1]).value, len(df), float(close), float(volume))
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    try:
+        return int(df.memory_usage(index=True, deep=False).sum())
+    except Exception:
+        return 0
+
+
+class FeatureCache:
+    """
+    Cache לתוצאות Pipeline לפי (symbol, טביעת הנרות, חתימת ה-Pipeline).
+    נר חדש (או עדכון של הנר האחרון) משנה את המפתח – אין צורך ב-invalidate ידני.
+    שכבת זיכרון LRU מוגבלת בבתים + שכבת דיסק אופציונלית (pickle לכל מפתח).
+    ה-DataFrame המוחזר משותף לכל הקוראים – לקריאה בלבד.
+    """
+
+    def __init__(self, max_bytes: int = int(FEATURE_CACHE_MAX_MB * 1024 * 1024),
+                 disk_dir: str = FEATURE_CACHE_DIR) -> None:
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[Hashable, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(symbol: str, hist: pd.DataFrame, pipeline: Optional[Pipeline]) -> Tuple:
+        sig = pipeline.signature() if pipeline is not None else "raw"
+        return (symbol.upper(), frame_fingerprint(hist), sig)
+
+    # ---------- שכבת זיכרון ----------
+    def _get_mem(self, key: Hashable) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put_mem(self, key: Hashable, df: pd.DataFrame) -> None:
+        size = _frame_bytes(df)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._lru.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._lru[key] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._lru:
+                _, (_, freed) = self._lru.popitem(last=False)
+                self._bytes -= freed
+                self.evictions += 1
+
+    # ---------- שכבת דיסק ----------
+    def _path(self, key: Hashable) -> Optional[Path]:
+        if self.disk_dir is None:
+            return None
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.disk_dir / f"{key[0]}_{digest[:20]}.pkl"
+
+    def _get_disk(self, key: Hashable) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                stored_key, df = pickle.load(f)
+        except Exception:
+            return None
+        if stored_key != key:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        return df
+
+    def _put_disk(self, key: Hashable, df: pd.DataFrame) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        # גרסאות קודמות של אותו סימבול לא ייקראו שוב (המפתח השתנה) – מוחקים
+        for old in path.parent.glob(f"{key[0]}_*.pkl"):
+            if old != path:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump((key, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    # ---------- API ----------
+    def run(self, symbol: str, hist: pd.DataFrame, pipeline: Optional[Pipeline]) -> pd.DataFrame:
+        """פיצ'רים יומיים: hist עם עמודות Title-case + עמודות ה-Pipeline; מחושב רק אם המפתח חדש."""
+        key = self.key(symbol, hist, pipeline)
+        df = self._get_mem(key)
+        if df is not None:
+            return df
+        df = self._get_disk(key)
+        if df is None:
+            df = default_flight.do(("features",) + key, lambda: self._compute(hist, pipeline))
+            self._put_disk(key, df)
+        self._put_mem(key, df)
+        return df
+
+    def _compute(self, hist: pd.DataFrame, pipeline: Optional[Pipeline]) -> pd.DataFrame:
+        with self._lock:
+            self.misses += 1
+        df = hist.copy()
+        df.columns = [c.title() for c in df.columns]  # Ensure ['Open','High','Low','Close','Volume']
+        if pipeline is not None:
+            df = pipeline.run(df, copy=False)  # df כבר עותק פרטי
+        return df
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._lru), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions, "disk": str(self.disk_dir) if self.disk_dir else None}
+
+
+_default_cache: Optional[FeatureCache] = None
+_default_guard = threading.Lock()
+
+def default_feature_cache() -> FeatureCache:
+    """FeatureCache אחד לתהליך – משותף ל-UI, לסריקות, ל-API ול-FeatureExtractor."""
+    global _default_cache
+    with _default_guard:
+        if _default_cache is None:
+            _default_cache = FeatureCache()
+        return _default_cache
@@ -0,0 +1,18 @@
+# src/stock_analysis/features/daily.py
+from __future__ import annotations
+
+from stock_analysis.features.pipeline import Pipeline
+from stock_analysis.features.rsi import RSI
+from stock_analysis.features.macd import MACD
+from stock_analysis.features.sma import SMA
+from stock_analysis.features.volume import VolumeStatus
+
+
+def default_daily_pipeline() -> Pipeline:
+    """ה-Pipeline היומי של ה-Screener (UI/API) וה-FeatureExtractor – אותה חתימה, אותו cache."""
+    return Pipeline([
+        RSI(period=14, out_col="RSI"),
+        MACD(span_fast=12, span_slow=26, out_col="MACD Value"),
+        SMA(window=20), SMA(window=50), SMA(window=200),
+        VolumeStatus(out_ratio_col="Volume Ratio", out_status_col="Volume Status"),
+    ], shared=True)
@@ -3,17 +3,24 @@ from __future__ import annotations
 import pandas as pd
 from dataclasses import dataclass
 
+from stock_analysis.features.pipeline import FeatureContext
+
 @dataclass
 class MACD:
     span_fast: int = 12
     span_slow: int = 26
     out_col: str = "MACD"
 
+    def inputs(self): return ("Close",)
+    def outputs(self): return (self.out_col,)
+    def intermediates(self): return (("ewm", "Close", self.span_fast), ("ewm", "Close", self.span_slow))
+
+    def apply(self, df: pd.DataFrame, ctx: FeatureContext) -> None:
+        df[self.out_col] = ctx.ewm_mean(self.span_fast) - ctx.ewm_mean(self.span_slow)
+
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-        ema_fast = df["Close"].ewm(span=self.span_fast).mean()
-        ema_slow = df["Close"].ewm(span=self.span_slow).mean()
         out = df.copy()
-        out[self.out_col] = ema_fast - ema_slow
+        self.apply(out, FeatureContext(out))
         return out
 
 def compute_macd_last(close: pd.Series, span_fast: int = 12, span_slow: int = 26) -> float:
@@ -1,18 +1,88 @@
 # src/stock_analysis/features/pipeline.py
 from __future__ import annotations
+import hashlib
+from collections import Counter
 from dataclasses import dataclass
 import pandas as pd
-from typing import Protocol, List
+from typing import Any, Callable, Dict, Hashable, List, Protocol, Tuple
 
 class FeatureStep(Protocol):
     def transform(self, df: pd.DataFrame) -> pd.DataFrame: ...
 
+
+class FeatureContext:
+    """
+    תוצרי-ביניים משותפים לריצה אחת של Pipeline על frame אחד (diff של Close, EWM, ממוצעים נעים...).
+    כל מפתח מחושב פעם אחת; צעד שני שמבקש אותו מקבל את אותה Series בלי לחשב ובלי להעתיק.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        self._memo: Dict[Hashable, Any] = {}
+        self.computed = 0
+        self.reused = 0
+
+    def shared(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if key in self._memo:
+            self.reused += 1
+            return self._memo[key]
+        self.computed += 1
+        value = self._memo[key] = fn()
+        return value
+
+    def diff(self, col: str = "Close") -> pd.Series:
+        return self.shared(("diff", col), lambda: self.df[col].diff())
+
+    def ewm_mean(self, span: int, col: str = "Close") -> pd.Series:
+        return self.shared(("ewm", col, span), lambda: self.df[col].ewm(span=span).mean())
+
+    def rolling_mean(self, window: int, col: str = "Close") -> pd.Series:
+        return self.shared(("rolling_mean", col, window), lambda: self.df[col].rolling(window).mean())
+
+    def mean(self, col: str) -> float:
+        return self.shared(("mean", col), lambda: self.df[col].mean())
+
+
 @dataclass
 class Pipeline:
+    """
+    shared=False (ברירת מחדל): כל צעד מחזיר frame חדש (transform) – ההתנהגות המקורית.
+    shared=True: עותק אחד בכניסה (או אפס עם copy=False), וכל צעד שיש לו apply() כותב
+    את העמודות שלו לאותו frame ומשתמש ב-FeatureContext לתוצרי-ביניים. צעד בלי apply() רץ כרגיל.
+    """
     steps: List[FeatureStep]
+    shared: bool = False
+
+    def run(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        if not self.shared:
+            out = df
+            for step in self.steps:
+                out = step.transform(out)
+            return out
 
-    def run(self, df: pd.DataFrame) -> pd.DataFrame:
-        out = df
+        out = df.copy() if copy else df
+        ctx = FeatureContext(out)
         for step in self.steps:
-            out = step.transform(out)
+            apply = getattr(step, "apply", None)
+            if apply is not None:
+                apply(out, ctx)
+            else:
+                out = step.transform(out)
+                ctx = FeatureContext(out)
         return out
+
+    def signature(self) -> str:
+        """hash של תצורת הצעדים (סוג + פרמטרים) – חלק ממפתח ה-FeatureCache; shared לא משנה תוצאה."""
+        raw = "|".join(repr(step) for step in self.steps)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def plan(self) -> Dict[str, Any]:
+        """מה כל צעד קורא/כותב, ואילו תוצרי-ביניים משותפים ליותר מצעד אחד."""
+        steps: List[Dict[str, Tuple]] = []
+        uses: Counter = Counter()
+        for step in self.steps:
+            declared = {k: tuple(getattr(step, k)()) if hasattr(step, k) else ()
+                        for k in ("inputs", "outputs", "intermediates")}
+            uses.update(declared["intermediates"])
+            steps.append({"step": type(step).__name__, **declared})
+        return {"steps": steps, "shared": [k for k, n in uses.items() if n > 1]}
@@ -3,20 +3,27 @@ from __future__ import annotations
 import pandas as pd
 from dataclasses import dataclass
 
+from stock_analysis.features.pipeline import FeatureContext
+
 @dataclass
 class RSI:
     period: int = 14
     out_col: str = "RSI"
 
-    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-        s = df["Close"]
-        delta = s.diff()
+    def inputs(self): return ("Close",)
+    def outputs(self): return (self.out_col,)
+    def intermediates(self): return (("diff", "Close"),)
+
+    def apply(self, df: pd.DataFrame, ctx: FeatureContext) -> None:
+        delta = ctx.diff("Close")
         gain = delta.where(delta > 0, 0).rolling(window=self.period).mean()
         loss = -delta.where(delta < 0, 0).rolling(window=self.period).mean()
         rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        df[self.out_col] = 100 - (100 / (1 + rs))
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         out = df.copy()
-        out[self.out_col] = rsi
+        self.apply(out, FeatureContext(out))
         return out
 
 def compute_rsi_last(close: pd.Series, period: int = 14) -> float:
@@ -3,13 +3,33 @@ from __future__ import annotations
 import pandas as pd
 from dataclasses import dataclass
 
+from stock_analysis.features.pipeline import FeatureContext
+
 @dataclass
 class SMA:
     window: int
     out_col: str | None = None
 
+    @property
+    def col(self) -> str:
+        return self.out_col or f"SMA_{self.window}"
+
+    def inputs(self): return ("Close",)
+    def outputs(self): return (self.col,)
+    def intermediates(self): return (("rolling_mean", "Close", self.window),)
+
+    def apply(self, df: pd.DataFrame, ctx: FeatureContext) -> None:
+        df[self.col] = ctx.rolling_mean(self.window)
+
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         out = df.copy()
-        col = self.out_col or f"SMA_{self.window}"
-        out[col] = out["Close"].rolling(self.window).mean()
+        self.apply(out, FeatureContext(out))
         return out
+
+
+def last_sma(df: pd.DataFrame, window: int) -> float:
+    """ממוצע נע אחרון – מעמודת SMA_<window> אם ה-Pipeline כבר חישב אותה, אחרת מחושב."""
+    col = f"SMA_{window}"
+    if col in df:
+        return df[col].iloc[-1]
+    return df["Close"].rolling(window).mean().iloc[-1]
@@ -0,0 +1,335 @@
+# src/stock_analysis/features/streaming.py
+# אינדיקטורים אינקרמנטליים: מצב O(1) לכל אינדיקטור, נר אחד בכל פעם.
+# update(...) מכניס נר סגור למצב; peek(...) מחזיר את הערך "אילו זה היה הנר הבא" בלי לשנות מצב –
+# לנר שעדיין נבנה (ה-poll הבא עשוי לעדכן אותו).
+# התוצאות זהות לגרסאות ה-batch (rolling/ewm של pandas, RSI/MACD ב-features, compute_vwap/compute_atr_5m
+# ב-strategies/filters) עד דיוק float.
+from __future__ import annotations
+import math
+from collections import deque
+from datetime import date
+from typing import Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+NAN = float("nan")
+
+
+def _isnan(x: float) -> bool:
+    return x != x
+
+
+class RollingMean:
+    """rolling(window, min_periods=window).mean(): סכום רץ (Kahan) + תור; NaN בחלון -> NaN."""
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self._buf: deque = deque()
+        self._sum = 0.0
+        self._comp = 0.0
+        self._nans = 0
+
+    def _add(self, x: float) -> None:
+        y = x - self._comp
+        t = self._sum + y
+        self._comp = (t - self._sum) - y
+        self._sum = t
+
+    def _mean(self, total: float, nans: int, count: int) -> float:
+        if count < self.window or nans:
+            return NAN
+        return total / self.window
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        self._buf.append(x)
+        if _isnan(x):
+            self._nans += 1
+        else:
+            self._add(x)
+        if len(self._buf) > self.window:
+            old = self._buf.popleft()
+            if _isnan(old):
+                self._nans -= 1
+            else:
+                self._add(-old)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        x = float(x)
+        total, nans, count = self._sum - self._comp, self._nans, len(self._buf) + 1
+        if _isnan(x):
+            nans += 1
+        else:
+            total += x
+        if count > self.window:
+            old = self._buf[0]
+            if _isnan(old):
+                nans -= 1
+            else:
+                total -= old
+            count = self.window
+        return self._mean(total, nans, count)
+
+    @property
+    def value(self) -> float:
+        return self._mean(self._sum - self._comp, self._nans, len(self._buf))
+
+
+class EWMMean:
+    """ewm(span=span).mean() (adjust=True, ignore_na=False, min_periods=0) – אותה נוסחה רקורסיבית של pandas."""
+
+    def __init__(self, span: int) -> None:
+        self.span = int(span)
+        self._decay = 1.0 - 2.0 / (self.span + 1.0)
+        self._weighted = NAN
+        self._old_wt = 1.0
+
+    def _step(self, x: float) -> Tuple[float, float]:
+        weighted, old_wt = self._weighted, self._old_wt
+        if not _isnan(weighted):
+            old_wt *= self._decay
+            if not _isnan(x):
+                if weighted != x:
+                    weighted = (old_wt * weighted + x) / (old_wt + 1.0)
+                old_wt += 1.0
+        elif not _isnan(x):
+            weighted = x
+        return weighted, old_wt
+
+    def update(self, x: float) -> float:
+        self._weighted, self._old_wt = self._step(float(x))
+        return self._weighted
+
+    def peek(self, x: float) -> float:
+        return self._step(float(x))[0]
+
+    @property
+    def value(self) -> float:
+        return self._weighted
+
+
+class StreamingMACD:
+    """MACD (features/macd.py): EMA מהירה פחות EMA איטית."""
+
+    def __init__(self, span_fast: int = 12, span_slow: int = 26) -> None:
+        self.fast = EWMMean(span_fast)
+        self.slow = EWMMean(span_slow)
+
+    def update(self, close: float) -> float:
+        return self.fast.update(close) - self.slow.update(close)
+
+    def peek(self, close: float) -> float:
+        return self.fast.peek(close) - self.slow.peek(close)
+
+    @property
+    def value(self) -> float:
+        return self.fast.value - self.slow.value
+
+
+def _rsi(gain: float, loss: float) -> float:
+    # כמו 100 - 100/(1 + gain/loss) ב-pandas: loss=0 -> inf -> 100; 0/0 -> NaN
+    if _isnan(gain) or _isnan(loss):
+        return NAN
+    if loss == 0:
+        return NAN if gain == 0 else 100.0
+    return 100.0 - (100.0 / (1.0 + gain / loss))
+
+
+class StreamingRSI:
+    """RSI (features/rsi.py): ממוצע נע פשוט של רווחים/הפסדים; ה-diff הראשון (NaN) נספר כ-0."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = int(period)
+        self.gain = RollingMean(self.period)
+        self.loss = RollingMean(self.period)
+        self._prev = NAN
+
+    def _split(self, close: float) -> Tuple[float, float]:
+        delta = close - self._prev
+        if _isnan(delta):
+            return 0.0, 0.0
+        return (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        g, l = self._split(close)
+        self._prev = close
+        return _rsi(self.gain.update(g), self.loss.update(l))
+
+    def peek(self, close: float) -> float:
+        g, l = self._split(float(close))
+        return _rsi(self.gain.peek(g), self.loss.peek(l))
+
+    @property
+    def value(self) -> float:
+        return _rsi(self.gain.value, self.loss.value)
+
+
+class StreamingVWAP:
+    """compute_vwap: סכום מצטבר של Close×Volume חלקי סכום Volume; reset() בתחילת סשן."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._pv = 0.0
+        self._v = 0.0
+
+    @staticmethod
+    def _parts(close: float, volume: float) -> Tuple[float, float]:
+        pv = close * volume
+        return (0.0 if _isnan(pv) else pv), (0.0 if _isnan(volume) else volume)
+
+    def update(self, close: float, volume: float) -> float:
+        pv, v = self._parts(float(close), float(volume))
+        self._pv += pv
+        self._v += v
+        return self.value
+
+    def peek(self, close: float, volume: float) -> float:
+        pv, v = self._parts(float(close), float(volume))
+        return (self._pv + pv) / (self._v + v) if (self._v + v) else NAN
+
+    @property
+    def value(self) -> float:
+        return self._pv / self._v if self._v else NAN
+
+
+class StreamingATR:
+    """compute_atr_5m: ממוצע נע של True Range; None עד שיש lookback+2 נרות (כמו גרסת ה-batch)."""
+
+    def __init__(self, lookback: int = 14) -> None:
+        self.lookback = int(lookback)
+        self.tr = RollingMean(self.lookback)
+        self._prev_close = NAN
+        self._count = 0
+
+    def _true_range(self, high: float, low: float) -> float:
+        parts = [abs(high - low), abs(high - self._prev_close), abs(low - self._prev_close)]
+        parts = [p for p in parts if not _isnan(p)]
+        return max(parts) if parts else NAN
+
+    def _result(self, atr: float, count: int) -> Optional[float]:
+        if count < self.lookback + 2 or _isnan(atr) or math.isinf(atr):
+            return None
+        return atr
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        atr = self.tr.update(self._true_range(float(high), float(low)))
+        self._prev_close = float(close)
+        self._count += 1
+        return self._result(atr, self._count)
+
+    def peek(self, high: float, low: float, close: float) -> Optional[float]:
+        return self._result(self.tr.peek(self._true_range(float(high), float(low))), self._count + 1)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._result(self.tr.value, self._count)
+
+
+# ---------- מצב לטיקר אחד (live) ----------
+class BarIndicators:
+    """
+    כל האינדיקטורים של טיקר אחד על נרות 5m. sync(df) מכניס רק נרות שלא נראו (לפי timestamp):
+    נרות סגורים נכנסים למצב, והנר האחרון (שעדיין עשוי להשתנות) נמדד ב-peek.
+    בנוסף נשמר snapshot של הערכים בנר הפתיחה של כל סשן (כולל סגירת הסשן הקודם).
+    """
+
+    def __init__(self, sma_windows: Sequence[int] = (20, 200), rsi_period: int = 14,
+                 macd_spans: Tuple[int, int] = (12, 26), atr_lookback: int = 14,
+                 tz: str = "America/New_York", keep_sessions: int = 5) -> None:
+        self.tz = tz
+        self.keep_sessions = keep_sessions
+        self._args = (tuple(sma_windows), rsi_period, tuple(macd_spans), atr_lookback)
+        self.reset()
+
+    def reset(self) -> None:
+        sma_windows, rsi_period, macd_spans, atr_lookback = self._args
+        self.sma = {w: RollingMean(w) for w in sma_windows}
+        self.rsi = StreamingRSI(rsi_period)
+        self.macd = StreamingMACD(*macd_spans)
+        self.atr = StreamingATR(atr_lookback)
+        self.vwap = StreamingVWAP()
+        self.last_ts: Optional[pd.Timestamp] = None
+        self.last_close = NAN
+        self.bars = 0
+        self._session: Optional[date] = None
+        self._openings: Dict[date, dict] = {}
+        self._pending: Optional[Tuple[date, dict]] = None
+        self.latest: dict = {}
+
+    def _session_of(self, ts: pd.Timestamp) -> date:
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")
+        return ts.tz_convert(self.tz).date()
+
+    def _values(self, sma, rsi, macd, vwap, atr, bar) -> dict:
+        out = {f"SMA{w}": v for w, v in sma.items()}
+        out.update({"RSI": rsi, "MACD": macd, "VWAP": vwap, "ATR": atr,
+                    "Open": bar[0], "High": bar[1], "Low": bar[2], "Close": bar[3], "Volume": bar[4]})
+        return out
+
+    def update(self, ts: pd.Timestamp, o: float, h: float, l: float, c: float, v: float) -> dict:
+        """מכניס נר סגור אחד (O(1))."""
+        session = self._session_of(ts)
+        new_session = session != self._session
+        if new_session:
+            self.vwap.reset()
+        bar = (float(o), float(h), float(l), float(c), float(v))
+        values = self._values(
+            {w: m.update(c) for w, m in self.sma.items()}, self.rsi.update(c), self.macd.update(c),
+            self.vwap.update(c, v), self.atr.update(h, l, c), bar,
+        )
+        if new_session:
+            self._openings[session] = {**values, "PrevClose": self.last_close, "ts": pd.Timestamp(ts)}
+            for old in sorted(self._openings)[:-self.keep_sessions]:
+                del self._openings[old]
+        self._session, self.last_ts, self.last_close = session, pd.Timestamp(ts), float(c)
+        self.bars += 1
+        self.latest = values
+        return values
+
+    def peek(self, ts: pd.Timestamp, o: float, h: float, l: float, c: float, v: float) -> dict:
+        """ערכים עם נר שעדיין נבנה, בלי לשנות את המצב."""
+        session = self._session_of(ts)
+        new_session = session != self._session
+        vwap = StreamingVWAP().peek(c, v) if new_session else self.vwap.peek(c, v)
+        bar = (float(o), float(h), float(l), float(c), float(v))
+        values = self._values(
+            {w: m.peek(c) for w, m in self.sma.items()}, self.rsi.peek(c), self.macd.peek(c),
+            vwap, self.atr.peek(h, l, c), bar,
+        )
+        self._pending = (session, {**values, "PrevClose": self.last_close, "ts": pd.Timestamp(ts)}) \
+            if new_session else None
+        return values
+
+    def sync(self, df: pd.DataFrame) -> dict:
+        """
+        מעדכן מ-DataFrame של נרות (כל ההיסטוריה או רק הזנב) – רק נרות אחרי last_ts נכנסים.
+        אם ההיסטוריה "חזרה אחורה" (ניגון מחדש / feed אחר) – מתחילים מאפס.
+        """
+        if df is None or df.empty:
+            return self.latest
+        idx = pd.DatetimeIndex(df.index)
+        if self.last_ts is not None and idx[-1] < self.last_ts:
+            self.reset()
+        start = 0 if self.last_ts is None else int(idx.searchsorted(self.last_ts, side="right"))
+        if start >= len(df):
+            self._pending = None
+            return self.latest
+
+        cols = [df[c].to_numpy(dtype=float) for c in ("Open", "High", "Low", "Close", "Volume")]
+        last = len(df) - 1
+        for i in range(start, last):
+            self.update(idx[i], *(col[i] for col in cols))
+        self.latest = self.peek(idx[last], *(col[last] for col in cols))
+        return self.latest
+
+    def opening(self, session: date) -> Optional[dict]:
+        """הערכים בנר הפתיחה של הסשן (כולל PrevClose) – גם אם נר הפתיחה עדיין ב-peek."""
+        if self._pending is not None and self._pending[0] == session:
+            return self._pending[1]
+        return self._openings.get(session)
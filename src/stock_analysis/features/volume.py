@@ -4,20 +4,28 @@ import pandas as pd
 from dataclasses import dataclass
 from typing import Tuple
 
+from stock_analysis.features.pipeline import FeatureContext
+
 @dataclass
 class VolumeStatus:
     high_threshold: float = 1.5
     out_ratio_col: str = "Volume Ratio"
     out_status_col: str = "Volume Status"
 
+    def inputs(self): return ("Volume",)
+    def outputs(self): return (self.out_ratio_col, self.out_status_col)
+    def intermediates(self): return (("mean", "Volume"),)
+
+    def apply(self, df: pd.DataFrame, ctx: FeatureContext) -> None:
+        avg_vol = ctx.mean("Volume")
+        latest = df["Volume"].iloc[-1]
+        ratio = round(latest / avg_vol, 2) if avg_vol else 0.0
+        df[self.out_ratio_col] = ratio
+        df[self.out_status_col] = "High" if ratio > self.high_threshold else "Normal"
+
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         out = df.copy()
-        avg_vol = out["Volume"].mean()
-        latest = out["Volume"].iloc[-1]
-        ratio = round(latest / avg_vol, 2) if avg_vol else 0.0
-        status = "High" if ratio > self.high_threshold else "Normal"
-        out[self.out_ratio_col] = ratio
-        out[self.out_status_col] = status
+        self.apply(out, FeatureContext(out))
         return out
 
 def analyze_volume_snapshot(hist: pd.DataFrame) -> Tuple[float, str]:
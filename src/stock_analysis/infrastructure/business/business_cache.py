@@ -0,0 +1,173 @@
+# src/stock_analysis/infrastructure/business/business_cache.py
+from __future__ import annotations
+import json, os, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from stock_analysis.domain.interfaces import CompetitorClient, HoldersProvider, WikipediaClient
+from stock_analysis.infrastructure.utils.single_flight import default_flight
+
+# ===== הגדרות (ENV) =====
+BUSINESS_CACHE_DB = os.getenv("BUSINESS_CACHE_DB", "data/business_cache.db")          # ריק = בלי cache
+BUSINESS_WIKI_TTL_SEC = float(os.getenv("BUSINESS_WIKI_TTL_SEC", str(30 * 86400)))      # רקע חברה: חודש
+BUSINESS_TIPRANKS_TTL_SEC = float(os.getenv("BUSINESS_TIPRANKS_TTL_SEC", str(7 * 86400)))  # מתחרים: שבוע
+BUSINESS_HOLDERS_TTL_SEC = float(os.getenv("BUSINESS_HOLDERS_TTL_SEC", str(14 * 86400)))   # מחזיקים: 13F רבעוני
+BUSINESS_NEGATIVE_TTL_SEC = float(os.getenv("BUSINESS_NEGATIVE_TTL_SEC", str(86400)))     # 404 / תשובה ריקה: יום
+
+SOURCE_TTLS: Dict[str, float] = {
+    "wiki": BUSINESS_WIKI_TTL_SEC,
+    "tipranks": BUSINESS_TIPRANKS_TTL_SEC,
+    "holders": BUSINESS_HOLDERS_TTL_SEC,
+}
+
+
+class BusinessDataCache:
+    """
+    Cache מתמשך (SQLite) לנתונים עסקיים שמשתנים לאט: ויקיפדיה, מתחרים מ-TipRanks, מחזיקים מוסדיים.
+    רשומה לכל (source, key) עם TTL לפי מקור. תשובה "ריקה" (404, אין מתחרים, אין מחזיקים)
+    נשמרת כ-negative עם TTL קצר יותר, כך שסימבול בלי דף ויקי לא עולה קריאת רשת בכל סריקה.
+    """
+
+    def __init__(self, db_path: str = BUSINESS_CACHE_DB,
+                 ttls: Optional[Mapping[str, float]] = None,
+                 negative_ttl: float = BUSINESS_NEGATIVE_TTL_SEC) -> None:
+        self.db_path = db_path
+        self.ttls = dict(SOURCE_TTLS if ttls is None else ttls)
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self._ensure_schema()
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _ensure_schema(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("""
+            CREATE TABLE IF NOT EXISTS business_cache (
+                source TEXT NOT NULL, key TEXT NOT NULL,
+                value TEXT, negative INTEGER NOT NULL DEFAULT 0,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (source, key)
+            )
+            """)
+            con.commit()
+
+    def _ttl(self, source: str, negative: bool) -> float:
+        return self.negative_ttl if negative else self.ttls.get(source, BUSINESS_NEGATIVE_TTL_SEC)
+
+    def lookup(self, source: str, key: str) -> Optional[Tuple[Any, bool, bool]]:
+        """(value, negative, fresh) אם קיימת רשומה – גם אם פג תוקפה; None אם לא נשמר כלום."""
+        with self._conn() as con:
+            row = con.execute("SELECT value, negative, stored_at FROM business_cache WHERE source=? AND key=?",
+                              (source, key)).fetchone()
+        if row is None:
+            return None
+        value, negative, stored_at = row
+        negative = bool(negative)
+        fresh = time.time() - float(stored_at) < self._ttl(source, negative)
+        return (json.loads(value) if value is not None else None), negative, fresh
+
+    def put(self, source: str, key: str, value: Any, negative: bool = False) -> None:
+        with self._conn() as con:
+            con.execute("INSERT OR REPLACE INTO business_cache(source,key,value,negative,stored_at) VALUES(?,?,?,?,?)",
+                        (source, key, json.dumps(value), 1 if negative else 0, time.time()))
+            con.commit()
+
+    def get(self, source: str, key: str, fetch: Callable[[], Any],
+            is_empty: Callable[[Any], bool], fallback: Any) -> Any:
+        """
+        ערך טרי מה-DB בלי רשת; אחרת fetch() (מאוחד בין threads) ושמירה.
+        fetch שנכשל (שגיאת רשת / 5xx) לא נשמר: מוגש הערך הישן אם יש, אחרת fallback.
+        """
+        cached = self.lookup(source, key)
+        if cached is not None and cached[2]:
+            with self._lock:
+                if cached[1]:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+            return fallback if cached[1] else cached[0]
+        with self._lock:
+            self.misses += 1
+        try:
+            value = default_flight.do(("business", source, key), fetch)
+        except Exception:
+            if cached is not None and not cached[1]:
+                with self._lock:
+                    self.stale_served += 1
+                return cached[0]
+            return fallback
+        negative = is_empty(value)
+        self.put(source, key, None if negative else value, negative=negative)
+        return fallback if negative else value
+
+    def purge(self, source: Optional[str] = None) -> int:
+        with self._conn() as con:
+            if source is None:
+                cur = con.execute("DELETE FROM business_cache")
+            else:
+                cur = con.execute("DELETE FROM business_cache WHERE source=?", (source,))
+            con.commit()
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._conn() as con:
+            rows = con.execute("SELECT source, COUNT(*), SUM(negative) FROM business_cache GROUP BY source").fetchall()
+        with self._lock:
+            return {"db": self.db_path, "hits": self.hits, "negative_hits": self.negative_hits,
+                    "misses": self.misses, "stale_served": self.stale_served,
+                    "entries": {src: {"rows": n, "negative": int(neg or 0)} for src, n, neg in rows}}
+
+
+# ---------- עטיפות לפרוטוקולים ----------
+class CachedWikipediaClient(WikipediaClient):
+    def __init__(self, inner: WikipediaClient, cache: BusinessDataCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def page_summary(self, title: str) -> Mapping[str, Any] | None:
+        return self.cache.get("wiki", title, lambda: self.inner.page_summary(title),
+                              is_empty=lambda v: not v, fallback=None)
+
+
+class CachedCompetitorClient(CompetitorClient):
+    def __init__(self, inner: CompetitorClient, cache: BusinessDataCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def similar_symbols(self, symbol: str) -> list[str]:
+        symbol = symbol.upper()
+        return self.cache.get("tipranks", symbol, lambda: self.inner.similar_symbols(symbol),
+                              is_empty=lambda v: not v, fallback=[])
+
+
+class CachedHoldersProvider(HoldersProvider):
+    def __init__(self, inner: HoldersProvider, cache: BusinessDataCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def top_institutional_holders(self, symbol: str, top_n: int = 5) -> list[str]:
+        symbol = symbol.upper()
+        return self.cache.get("holders", f"{symbol}:{int(top_n)}",
+                              lambda: self.inner.top_institutional_holders(symbol, top_n=top_n),
+                              is_empty=lambda v: not v or list(v) == ["N/A"], fallback=["N/A"])
+
+
+_default_cache: Optional[BusinessDataCache] = None
+_default_guard = threading.Lock()
+
+def default_business_cache() -> Optional[BusinessDataCache]:
+    """Cache עסקי אחד לתהליך (None אם BUSINESS_CACHE_DB ריק)."""
+    global _default_cache
+    if not BUSINESS_CACHE_DB:
+        return None
+    with _default_guard:
+        if _default_cache is None:
+            _default_cache = BusinessDataCache()
+        return _default_cache
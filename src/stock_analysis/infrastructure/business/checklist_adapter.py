@@ -7,19 +7,43 @@ from stock_analysis.services.business.checklist_service import ChecklistService
 from stock_analysis.infrastructure.business.wiki_client import WikipediaHttpClient
 from stock_analysis.infrastructure.business.tipranks_client import TipRanksClient
 from stock_analysis.infrastructure.business.holders_yf import YFinanceHoldersProvider
+from stock_analysis.infrastructure.business.business_cache import (
+    CachedWikipediaClient, CachedCompetitorClient, CachedHoldersProvider, default_business_cache,
+)
+from stock_analysis.infrastructure.recording.archive import recording_from_env
+from stock_analysis.infrastructure.recording.wrappers import (
+    RecordedWikipediaClient, RecordedCompetitorClient, RecordedHoldersProvider,
+)
 
 class BusinessChecklistAdapter(BusinessChecklist):
     """Adapts the new ChecklistService to the BusinessChecklist protocol."""
     def __init__(self):
-        self.service = ChecklistService(
-            wiki=WikipediaHttpClient(),
-            competitors=TipRanksClient(),
-            holders=YFinanceHoldersProvider(),
-        )
+        call = recording_from_env()
+        cache = default_business_cache() if call is None else None
+        if cache is not None:
+            # ויקי/מתחרים/מחזיקים נשמרים ב-SQLite עם TTL לפי מקור; סימבול "חם" לא עולה קריאת רשת
+            wiki = CachedWikipediaClient(WikipediaHttpClient(strict=True), cache)
+            competitors = CachedCompetitorClient(TipRanksClient(strict=True), cache)
+            holders = CachedHoldersProvider(YFinanceHoldersProvider(strict=True), cache)
+        else:
+            wiki, competitors, holders = WikipediaHttpClient(), TipRanksClient(), YFinanceHoldersProvider()
+        if call is not None:
+            # הקלטה/ניגון: בלי cache, כדי שכל קריאה תיכנס ל-archive (או תוגש ממנו)
+            wiki = RecordedWikipediaClient(wiki, call)
+            competitors = RecordedCompetitorClient(competitors, call)
+            holders = RecordedHoldersProvider(holders, call)
+        self.cache = cache
+        self.service = ChecklistService(wiki=wiki, competitors=competitors, holders=holders)
 
     def __call__(self, info: Mapping[str, Any], sentiment_score: float, symbol: str, analyzer: SentimentAnalyzer) -> dict:
         return self.service.run(info, sentiment_score, symbol, analyzer)
 
+    def stats(self) -> dict:
+        # latency / timeouts לכל מקור חיצוני (משותף לכל המופעים בתהליך)
+        return {"deadline_sec": self.service.deadline_sec, "queue_sec": self.service.queue_sec,
+                "sources": self.service.latency.stats(),
+                "cache": self.cache.stats() if self.cache is not None else None}
+
 
 # ---- תאימות לאחור: מספק פונקציה זהה לשם ולחתימה המקוריים ----
 def run_full_analysis(info: Mapping[str, Any], news_sentiment_score: float, symbol: str | None = None, news_analyzer: SentimentAnalyzer | None = None) -> dict:
@@ -3,14 +3,23 @@ from __future__ import annotations
 from typing import List
 import yfinance as yf
 from stock_analysis.domain.interfaces import HoldersProvider
+from stock_analysis.infrastructure.data_providers.metadata_cache import default_metadata_cache
+from stock_analysis.infrastructure.utils.rate_limit import default_governor
 
 class YFinanceHoldersProvider(HoldersProvider):
+    def __init__(self, strict: bool = False) -> None:
+        # strict: שגיאת yfinance נזרקת, ותשובה ריקה מוחזרת כ-[] (ולא ["N/A"]) – בשביל negative caching
+        self.strict = strict
+
     def top_institutional_holders(self, symbol: str, top_n: int = 5) -> List[str]:
         try:
-            t = yf.Ticker(symbol)
-            holders = t.institutional_holders
+            # רשימת המחזיקים משתנה לאט – נשמרת ב-cache המשותף עם TTL של פנדמנטלס
+            holders = default_metadata_cache().get(
+                symbol, "institutional_holders", lambda: default_governor().call(lambda: yf.Ticker(symbol).institutional_holders)
+            )
             if holders is not None and "Holder" in holders.columns:
                 return list(holders["Holder"].head(top_n))
         except Exception:
-            pass
-        return ["N/A"]
+            if self.strict:
+                raise
+        return [] if self.strict else ["N/A"]
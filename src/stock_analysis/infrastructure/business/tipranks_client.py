@@ -6,6 +6,10 @@ from stock_analysis.domain.interfaces import CompetitorClient
 class TipRanksClient(CompetitorClient):
     URL = "https://www.tipranks.com/api/symbol/get-similar-symbols?symbol={symbol}"
 
+    def __init__(self, strict: bool = False) -> None:
+        # strict: שגיאת רשת / 5xx / 429 נזרקת במקום [], כדי ש-cache לא ישמור כשל זמני כ"אין מתחרים"
+        self.strict = strict
+
     def similar_symbols(self, symbol: str) -> list[str]:
         try:
             r = requests.get(self.URL.format(symbol=symbol), timeout=8)
@@ -13,6 +17,9 @@ class TipRanksClient(CompetitorClient):
                 data = r.json() or {}
                 sims = data.get("similar", []) or []
                 return [item.get("ticker") for item in sims if item.get("ticker")][:5]
+            if self.strict and (r.status_code == 429 or r.status_code >= 500):
+                r.raise_for_status()
         except Exception:
-            pass
+            if self.strict:
+                raise
         return []
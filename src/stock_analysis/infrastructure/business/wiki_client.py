@@ -7,11 +7,18 @@ from stock_analysis.domain.interfaces import WikipediaClient
 class WikipediaHttpClient(WikipediaClient):
     BASE = "https://en.wikipedia.org/api/rest_v1/page/summary/"
 
+    def __init__(self, strict: bool = False) -> None:
+        # strict: שגיאת רשת / 5xx נזרקת במקום None, כדי ש-cache לא ישמור כשל זמני כ"אין דף"
+        self.strict = strict
+
     def page_summary(self, title: str) -> Mapping[str, Any] | None:
         try:
             r = requests.get(self.BASE + title, timeout=8)
             if r.status_code == 200:
                 return r.json()
+            if self.strict and (r.status_code == 429 or r.status_code >= 500):
+                r.raise_for_status()
         except Exception:
-            pass
+            if self.strict:
+                raise
         return None
@@ -0,0 +1,328 @@
+# src/stock_analysis/infrastructure/data/bar_store.py
+from __future__ import annotations
+import os, re, json, time, threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ===== הגדרות שניתנות לשליטה דרך ENV =====
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", "data/bars")
+BAR_STORE_REFRESH_SEC = os.getenv("BAR_STORE_REFRESH_SEC")          # ברירת מחדל לפי interval
+BAR_STORE_INTRADAY_MAX_DAYS = int(os.getenv("BAR_STORE_INTRADAY_MAX_DAYS", "60"))  # מגבלת yfinance ל-5m
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+_INTRADAY_RE = re.compile(r"^\d+(m|h)$")
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+_MAX_COVER = np.iinfo(np.int64).min  # sentinel: "max" כבר הורד
+
+# fetch(period=..., start=...) -> DataFrame; בדיוק אחד מהם לא None
+Fetcher = Callable[..., pd.DataFrame]
+
+
+def is_intraday(interval: str) -> bool:
+    return bool(_INTRADAY_RE.match(interval or ""))
+
+
+def period_start(period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """תחילת החלון הקלנדרי של period ("1y"/"6mo"/"2wk"/"ytd"). None עבור "max"."""
+    p = (period or "").strip().lower()
+    if p == "max":
+        return None
+    if p == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    m = _PERIOD_RE.match(p)
+    if not m:
+        raise ValueError(f"Unsupported period: {period!r}")
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "d":
+        return now.normalize() - pd.Timedelta(days=n)
+    if unit == "wk":
+        return now.normalize() - pd.Timedelta(weeks=n)
+    if unit == "mo":
+        return now.normalize() - pd.DateOffset(months=n)
+    return now.normalize() - pd.DateOffset(years=n)
+
+
+def _session_days(period: str) -> Optional[int]:
+    """עבור "5d"/"30d" yfinance מחזיר N ימי מסחר (לא ימים קלנדריים)."""
+    m = _PERIOD_RE.match((period or "").strip().lower())
+    return int(m.group(1)) if m and m.group(2) == "d" else None
+
+
+def period_window(df: pd.DataFrame, period: str, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    החלון ש-yfinance היה מחזיר עבור period, חתוך מתוך frame ארוך יותר:
+    "2d"/"5d" = N ימי מסחר אחרונים, "1mo"/"1y" = חלון קלנדרי עד now.
+    """
+    if df.empty or (period or "").lower() == "max":
+        return df
+    n_sessions = _session_days(period)
+    if n_sessions is not None:
+        dates = df.index.date
+        keep = np.unique(dates)[-n_sessions:]
+        return df.loc[dates >= keep[0]]
+    start = period_start(period, now if now is not None else pd.Timestamp.now(tz="UTC"))
+    if df.index.tz is None:
+        start = start.tz_convert(None)
+    return df.loc[df.index >= start]
+
+
+class BarStore:
+    """
+    מאגר נרות OHLCV על הדיסק, קובץ עמודתי (npz) אחד לכל (symbol, interval, adjusted/raw).
+    history() מחזיר חלון לפי period מתוך המאגר, ומוריד מהרשת רק את הזנב שאחרי הנר האחרון השמור.
+    ה-fetcher מוזרק מבחוץ כך שהמאגר לא תלוי ב-yfinance.
+    """
+
+    def __init__(self, root: str | Path = BAR_STORE_DIR, refresh_sec: float | None = None) -> None:
+        self.root = Path(root)
+        self.refresh_sec = refresh_sec if refresh_sec is not None else (
+            float(BAR_STORE_REFRESH_SEC) if BAR_STORE_REFRESH_SEC else None
+        )
+        self._locks: Dict[Tuple[str, str, bool], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ---------- אחסון ----------
+    def path(self, symbol: str, interval: str, adjusted: bool) -> Path:
+        safe = symbol.upper().replace(os.sep, "_")
+        return self.root / interval / ("adj" if adjusted else "raw") / f"{safe}.npz"
+
+    def symbols(self, interval: str = "1d", adjusted: bool = True) -> List[str]:
+        """כל הסימבולים שיש להם קובץ נרות שמור (בלי רשת)."""
+        base = self.root / interval / ("adj" if adjusted else "raw")
+        return sorted(p.stem for p in base.glob("*.npz")) if base.exists() else []
+
+    def _lock(self, key: Tuple[str, str, bool]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _min_refresh(self, interval: str) -> float:
+        if self.refresh_sec is not None:
+            return self.refresh_sec
+        return 60.0 if is_intraday(interval) else 900.0
+
+    def load(self, symbol: str, interval: str = "1d", adjusted: bool = True) -> Tuple[pd.DataFrame, dict]:
+        """טוען את כל הנרות השמורים + meta. מחזיר (DataFrame ריק, {}) אם אין קובץ."""
+        p = self.path(symbol, interval, adjusted)
+        if not p.exists():
+            return pd.DataFrame(columns=OHLCV), {}
+        try:
+            with np.load(p, allow_pickle=False) as z:
+                ts = z["ts"]
+                values = z["ohlcv"]
+                meta = json.loads(str(z["meta"]))
+        except Exception:
+            return pd.DataFrame(columns=OHLCV), {}
+
+        idx = pd.DatetimeIndex(ts.view("datetime64[ns]")).tz_localize("UTC")
+        tz = meta.get("tz") or None
+        idx = idx.tz_convert(tz) if tz else idx.tz_localize(None)
+        df = pd.DataFrame(values, index=idx, columns=OHLCV)
+        if np.isfinite(df["Volume"].to_numpy()).all():
+            df["Volume"] = df["Volume"].astype("int64")
+        return df, meta
+
+    def save(self, symbol: str, interval: str, adjusted: bool, df: pd.DataFrame, meta: dict) -> None:
+        p = self.path(symbol, interval, adjusted)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        idx = pd.DatetimeIndex(df.index)
+        tz = str(idx.tz) if idx.tz is not None else ""
+        naive_utc = idx.tz_convert("UTC").tz_localize(None) if idx.tz is not None else idx
+        ts = np.asarray(naive_utc, dtype="datetime64[ns]").view(np.int64)
+        values = df.reindex(columns=OHLCV).to_numpy(dtype=np.float64)
+        meta = {**meta, "tz": tz}
+        # כתיבה אטומית – קורא מקביל לעולם לא יראה קובץ חצי-כתוב
+        tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, ts=ts, ohlcv=values, meta=np.array(json.dumps(meta)))
+        os.replace(tmp, p)
+
+    # ---------- קריאה לפי period ----------
+    def _covers(self, df: pd.DataFrame, meta: dict, period: str, now: pd.Timestamp) -> bool:
+        if df.empty or not meta:
+            return False
+        covered_since = int(meta.get("covered_since", 0))
+        last = pd.Timestamp(df.index[-1])
+        last = last.tz_localize("UTC") if last.tzinfo is None else last
+        if is_intraday(meta.get("interval", "")) and \
+                (now - last) > pd.Timedelta(days=BAR_STORE_INTRADAY_MAX_DAYS):
+            return False  # yfinance לא יחזיר זנב כל כך ישן ב-intraday
+        if (period or "").lower() == "max":
+            return covered_since == _MAX_COVER
+        n_sessions = _session_days(period)
+        if n_sessions is not None:
+            return len(np.unique(df.index.date)) >= n_sessions
+        return covered_since <= period_start(period, now).value
+
+    @staticmethod
+    def _window(df: pd.DataFrame, period: str, now: pd.Timestamp) -> pd.DataFrame:
+        return period_window(df, period, now)
+
+    @staticmethod
+    def _clean(df: pd.DataFrame | None) -> pd.DataFrame:
+        if df is None or df.empty:
+            return pd.DataFrame(columns=OHLCV)
+        df = df.reindex(columns=OHLCV)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        return df.dropna(how="all", subset=["Open", "High", "Low", "Close"])
+
+    def _trim(self, df: pd.DataFrame, interval: str) -> pd.DataFrame:
+        if not is_intraday(interval) or df.empty:
+            return df
+        cutoff = df.index[-1] - pd.Timedelta(days=BAR_STORE_INTRADAY_MAX_DAYS)
+        return df.loc[df.index >= cutoff]
+
+    def cached(self, symbol: str, period: str, interval: str, adjusted: bool) -> Optional[pd.DataFrame]:
+        """חלון מהמאגר רק אם הוא מכסה את period ורוענן לאחרונה; אחרת None (בלי רשת)."""
+        state, window, _last = self.status(symbol, period, interval, adjusted)
+        return window if state == "fresh" else None
+
+    def status(self, symbol: str, period: str, interval: str,
+               adjusted: bool) -> Tuple[str, Optional[pd.DataFrame], Optional[pd.Timestamp]]:
+        """
+        בלי רשת: ("fresh", חלון, None) | ("stale", None, הנר האחרון) – מכוסה אבל צריך זנב |
+        ("missing", None, None) – אין כיסוי ל-period, צריך הורדה מלאה.
+        """
+        df, meta = self.load(symbol, interval, adjusted)
+        now = pd.Timestamp.now(tz="UTC")
+        if not self._covers(df, meta, period, now):
+            return "missing", None, None
+        if time.time() - float(meta.get("fetched_at", 0)) >= self._min_refresh(interval):
+            return "stale", None, df.index[-1]
+        return "fresh", self._window(df, period, now), None
+
+    def latest_close(self, symbol: str, interval: str, adjusted: bool) -> Optional[Tuple[float, float]]:
+        """(Close של הנר האחרון, fetched_at) – בלי רשת; None אם אין נתונים."""
+        df, meta = self.load(symbol, interval, adjusted)
+        if df.empty:
+            return None
+        close = df["Close"].dropna()
+        if close.empty:
+            return None
+        return float(close.iloc[-1]), float(meta.get("fetched_at", 0))
+
+    def put(self, symbol: str, interval: str, adjusted: bool, fresh: pd.DataFrame, period: str) -> pd.DataFrame:
+        """הורדה מלאה עבור period (למשל מ-yf.download בבאלק), ממוזגת עם ההיסטוריה השמורה."""
+        key = (symbol.upper(), interval, adjusted)
+        now = pd.Timestamp.now(tz="UTC")
+        with self._lock(key):
+            df = self._replace(symbol, interval, adjusted, self._clean(fresh), period, now)
+            return self._window(df, period, now)
+
+    def put_tail(self, symbol: str, interval: str, adjusted: bool, tail: pd.DataFrame,
+                 period: str) -> Optional[pd.DataFrame]:
+        """
+        זנב מהורדה מרוכזת (start=) למפתח שכבר מכוסה; מחזיר את החלון ל-period.
+        None אם ההתאמה (דיבידנד/ספליט) השתנתה – הקורא צריך הורדה מלאה.
+        """
+        key = (symbol.upper(), interval, adjusted)
+        now = pd.Timestamp.now(tz="UTC")
+        with self._lock(key):
+            df, meta = self.load(symbol, interval, adjusted)
+            merged = self._merge_tail(symbol, interval, adjusted, df, meta, self._clean(tail))
+            return None if merged is None else self._window(merged, period, now)
+
+    @staticmethod
+    def _align_tz(fresh: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+        if fresh.index.tz is None and df.index.tz is not None:
+            fresh.index = fresh.index.tz_localize(df.index.tz)
+        elif fresh.index.tz is not None and df.index.tz is None:
+            fresh.index = fresh.index.tz_localize(None)
+        elif fresh.index.tz is not None and df.index.tz is not None:
+            fresh.index = fresh.index.tz_convert(df.index.tz)
+        return fresh
+
+    @staticmethod
+    def _same_basis(df: pd.DataFrame, fresh: pd.DataFrame, adjusted: bool) -> bool:
+        """Adjusted: דיבידנד/ספליט חדש משנה את כל העבר -> נר החפיפה לא יתאים ואי אפשר למזג."""
+        common = fresh.index.intersection(df.index)
+        if not adjusted or common.empty:
+            return True
+        first = common[0]
+        old_open = float(df.loc[first, "Open"])
+        new_open = float(fresh.loc[first, "Open"])
+        return not (np.isfinite(old_open) and np.isfinite(new_open) and not np.isclose(old_open, new_open, rtol=1e-4))
+
+    def _merge_tail(self, symbol: str, interval: str, adjusted: bool, df: pd.DataFrame, meta: dict,
+                    tail: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """ממזג זנב (מהנר האחרון השמור והלאה) ושומר; None אם ההתאמה השתנתה."""
+        if tail.empty:
+            meta["fetched_at"] = time.time()
+            self.save(symbol, interval, adjusted, df, meta)
+            return df
+        tail = self._align_tz(tail, df)
+        if not self._same_basis(df, tail, adjusted):
+            return None
+        merged = pd.concat([df.loc[df.index < tail.index[0]], tail])
+        merged = self._trim(merged[~merged.index.duplicated(keep="last")].sort_index(), interval)
+        meta["fetched_at"] = time.time()
+        self.save(symbol, interval, adjusted, merged, meta)
+        return merged
+
+    def _replace(self, symbol: str, interval: str, adjusted: bool, fresh: pd.DataFrame,
+                 period: str, now: pd.Timestamp) -> pd.DataFrame:
+        """
+        שומר הורדה מלאה של period. היסטוריה שמורה שנוגעת בה (ובאותה התאמה) נשמרת:
+        נרות ישנים יותר נשארים ו-covered_since הוא המינימום – הורדת 1y לא מוחקת 10y שכבר במאגר.
+        """
+        fresh = self._trim(fresh, interval)
+        if fresh.empty:
+            return fresh
+        if (period or "").lower() == "max":
+            covered = _MAX_COVER
+        elif _session_days(period) is not None:
+            covered = pd.Timestamp(fresh.index[0]).value
+        else:
+            covered = period_start(period, now).value
+        df, meta = self.load(symbol, interval, adjusted)
+        if not df.empty and meta:
+            fresh = self._align_tz(fresh, df)
+            # רק אם אין חור בין השמור לחדש ואותה התאמה; אחרת החדש מחליף הכול
+            if df.index[-1] >= fresh.index[0] and self._same_basis(df, fresh, adjusted):
+                merged = pd.concat([df.loc[df.index < fresh.index[0]], fresh])
+                fresh = self._trim(merged[~merged.index.duplicated(keep="last")].sort_index(), interval)
+                covered = min(covered, int(meta.get("covered_since", covered)))
+        meta = {"interval": interval, "covered_since": int(covered), "fetched_at": time.time()}
+        self.save(symbol, interval, adjusted, fresh, meta)
+        return fresh
+
+    def history(self, symbol: str, period: str, interval: str, adjusted: bool, fetch: Fetcher) -> pd.DataFrame:
+        """
+        מחזיר נרות עבור period מתוך המאגר:
+        1) אין כיסוי מספיק -> הורדה מלאה של period, ממוזגת עם מה שכבר שמור.
+        2) יש כיסוי -> הורדת זנב בלבד (מהנר האחרון והלאה) ומיזוג, אלא אם רוענן לאחרונה.
+        """
+        symbol = symbol.upper()
+        now = pd.Timestamp.now(tz="UTC")
+        key = (symbol, interval, adjusted)
+        with self._lock(key):
+            df, meta = self.load(symbol, interval, adjusted)
+
+            if not self._covers(df, meta, period, now):
+                df = self._replace(symbol, interval, adjusted, self._clean(fetch(period=period)), period, now)
+                return self._window(df, period, now)
+
+            if time.time() - float(meta.get("fetched_at", 0)) < self._min_refresh(interval):
+                return self._window(df, period, now)
+
+            last_ts = df.index[-1]
+            tail = self._clean(fetch(start=last_ts if is_intraday(interval) else last_ts.date()))
+            merged = self._merge_tail(symbol, interval, adjusted, df, meta, tail)
+            if merged is None:
+                # ההתאמה השתנתה: מורידים הכול מחדש ומחליפים (השמור כבר לא באותו בסיס)
+                merged = self._replace(symbol, interval, adjusted, self._clean(fetch(period=period)), period, now)
+            return self._window(merged, period, now)
+
+
+_default_store: Optional[BarStore] = None
+_default_guard = threading.Lock()
+
+def default_bar_store() -> BarStore:
+    """מאגר יחיד לכל התהליך (Streamlit/API/CLI) כדי שהנעילות לכל מפתח יהיו משותפות."""
+    global _default_store
+    with _default_guard:
+        if _default_store is None:
+            _default_store = BarStore()
+        return _default_store
@@ -3,20 +3,23 @@ from __future__ import annotations
 import os
 from io import StringIO
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 import pandas as pd
 import requests
-import yfinance as yf
+
+from stock_analysis.infrastructure.data_providers.yfinance_provider import governed_download
+from stock_analysis.infrastructure.utils.rate_limit import default_governor
 
 
 WIKI_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
 SYMBOLS_CACHE = "sp500_symbols.csv"        # Cache לרשימת הסימבולים
 PRICES_CSV_DEFAULT = "sp500_prices.csv"    # יעד ברירת מחדל לשמירת המחירים
+PRICE_SNAPSHOT_MAX_AGE_SEC = float(os.getenv("PRICE_SNAPSHOT_MAX_AGE_SEC", str(24 * 3600)))
 
 
-def _fetch_sp500_symbols_from_wikipedia() -> List[str]:
-    """מנסה להביא את רשימת הסימבולים מוויקיפדיה עם User-Agent תקין."""
+def _fetch_sp500_table_from_wikipedia() -> pd.DataFrame:
+    """מנסה להביא את טבלת החברות מוויקיפדיה עם User-Agent תקין (Symbol + GICS Sector)."""
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
     }
@@ -28,13 +31,16 @@ def _fetch_sp500_symbols_from_wikipedia() -> List[str]:
     # הטבלה הראשונה ברוב המקרים היא רשימת החברות
     df = tables[0]
     # עמודת Symbol קיימת שם; ממירים לפורמט של יאהו (BRK.B -> BRK-B)
-    symbols = (
-        df["Symbol"]
-        .astype(str)
-        .str.replace(".", "-", regex=False)
-        .tolist()
-    )
-    return symbols
+    out = pd.DataFrame({
+        "Symbol": df["Symbol"].astype(str).str.replace(".", "-", regex=False),
+    })
+    if "GICS Sector" in df.columns:
+        out["GICS Sector"] = df["GICS Sector"].astype(str)
+    return out
+
+
+def _fetch_sp500_symbols_from_wikipedia() -> List[str]:
+    return _fetch_sp500_table_from_wikipedia()["Symbol"].tolist()
 
 
 def _load_symbols_cache() -> List[str] | None:
@@ -47,8 +53,25 @@ def _load_symbols_cache() -> List[str] | None:
     return None
 
 
-def _save_symbols_cache(symbols: List[str]) -> None:
-    pd.DataFrame({"Symbol": symbols}).to_csv(SYMBOLS_CACHE, index=False)
+def _save_symbols_cache(symbols: List[str], sectors: List[str] | None = None) -> None:
+    df = pd.DataFrame({"Symbol": symbols})
+    if sectors is not None:
+        df["GICS Sector"] = sectors
+    df.to_csv(SYMBOLS_CACHE, index=False)
+
+
+def load_sp500_sectors() -> Dict[str, str]:
+    """מיפוי Symbol -> GICS Sector מה-Cache המקומי (ריק אם נשמר בלי סקטורים)."""
+    if not os.path.exists(SYMBOLS_CACHE):
+        return {}
+    try:
+        cached = pd.read_csv(SYMBOLS_CACHE)
+    except Exception:
+        return {}
+    if "GICS Sector" not in cached.columns:
+        return {}
+    cached = cached.dropna(subset=["Symbol", "GICS Sector"])
+    return dict(zip(cached["Symbol"].astype(str), cached["GICS Sector"].astype(str)))
 
 
 def _get_sp500_symbols() -> List[str]:
@@ -57,9 +80,11 @@ def _get_sp500_symbols() -> List[str]:
     אם אין Cache – זורק שגיאה מפורטת.
     """
     try:
-        symbols = _fetch_sp500_symbols_from_wikipedia()
+        table = _fetch_sp500_table_from_wikipedia()
+        symbols = table["Symbol"].tolist()
         if symbols:
-            _save_symbols_cache(symbols)
+            sectors = table["GICS Sector"].tolist() if "GICS Sector" in table.columns else None
+            _save_symbols_cache(symbols, sectors)
             return symbols
     except Exception:
         pass  # ננסה Cache
@@ -86,8 +111,8 @@ def _download_last_close_prices(symbols: List[str]) -> pd.DataFrame:
         chunk = symbols[i:i + CHUNK_SIZE]
         try:
             # period='2d' כדי לוודא שגם אם היום טרם היה Close נקבל את של אתמול
-            data = yf.download(
-                tickers=chunk,
+            data = governed_download(
+                default_governor(), chunk,
                 period="2d",
                 interval="1d",
                 auto_adjust=False,
@@ -138,6 +163,30 @@ def refresh_sp500_prices(csv_path: str = PRICES_CSV_DEFAULT) -> None:
     out.to_csv(csv_path, index=False)
 
 
+def last_close_snapshot(symbols: List[str], csv_path: str = PRICES_CSV_DEFAULT,
+                        max_age_sec: float = PRICE_SNAPSHOT_MAX_AGE_SEC) -> Dict[str, float]:
+    """
+    מחיר אחרון לכל סימבול לשער מחיר זול: קודם מקובץ ה-CSV (אם הוא טרי מספיק),
+    והחסרים – בהורדת BATCH אחת (yf.download במנות). בלי .info ובלי היסטוריה מלאה.
+    """
+    prices: Dict[str, float] = {}
+    try:
+        if os.path.exists(csv_path) and (datetime.now().timestamp() - os.path.getmtime(csv_path)) < max_age_sec:
+            df = pd.read_csv(csv_path)
+            if {"Symbol", "Price"} <= set(df.columns):
+                df = df.dropna(subset=["Price"])
+                prices = dict(zip(df["Symbol"].astype(str).str.upper(), df["Price"].astype(float)))
+    except Exception:
+        prices = {}
+
+    missing = [s for s in symbols if s.upper() not in prices]
+    if missing:
+        fetched = _download_last_close_prices(missing)
+        if not fetched.empty:
+            prices.update(dict(zip(fetched["Symbol"].astype(str).str.upper(), fetched["Price"].astype(float))))
+    return {s.upper(): prices[s.upper()] for s in symbols if s.upper() in prices}
+
+
 def get_last_update_date(csv_path: str = PRICES_CSV_DEFAULT) -> str:
     if os.path.exists(csv_path):
         mod_time = os.path.getmtime(csv_path)
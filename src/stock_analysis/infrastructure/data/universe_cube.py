@@ -0,0 +1,162 @@
+# src/stock_analysis/infrastructure/data/universe_cube.py
+from __future__ import annotations
+import json, os, threading, time
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis.infrastructure.data.bar_store import OHLCV
+
+# ===== הגדרות (ENV) =====
+CUBE_DIR = os.getenv("UNIVERSE_CUBE_DIR", "data/cubes")
+CUBE_MAX_AGE_SEC = float(os.getenv("CUBE_MAX_AGE_SEC", "900"))   # כמו ה-refresh היומי של BarStore
+
+
+def _utc_ns(idx: pd.DatetimeIndex) -> np.ndarray:
+    idx = pd.DatetimeIndex(idx)
+    naive = idx.tz_convert("UTC").tz_localize(None) if idx.tz is not None else idx
+    return np.asarray(naive, dtype="datetime64[ns]").view(np.int64)
+
+
+class UniverseCube:
+    """
+    קובייה של נרות מיושרים לכל ה-universe: מערך float32 אחד (fields × symbols × timestamps)
+    ב-memory map לקריאה בלבד, + אינדקס סימבולים ואינדקס זמנים.
+    כל שדה הוא מטריצה רציפה symbols × timestamps, כך שחישוב וקטורי על Close לא מעתיק כלום,
+    וכמה תהליכים (Streamlit/CLI/API) חולקים את אותם דפים דרך ה-page cache של מערכת ההפעלה.
+    """
+
+    def __init__(self, bars: np.ndarray, symbols: Sequence[str], ts_ns: np.ndarray, meta: Mapping) -> None:
+        self.bars = bars
+        self.symbols: List[str] = list(symbols)
+        self.ts_ns = ts_ns
+        self.meta = dict(meta)
+        self.fields: List[str] = list(self.meta.get("fields", OHLCV))
+        self._sym_index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self._field_index: Dict[str, int] = {f: i for i, f in enumerate(self.fields)}
+
+    # ---------- פתיחה ----------
+    @classmethod
+    def open(cls, name: str, root: str | Path = CUBE_DIR) -> "UniverseCube":
+        """פותח את הגרסה הנוכחית של הקובייה (mmap לקריאה בלבד)."""
+        base = Path(root) / name
+        meta = json.loads((base / "meta.json").read_text(encoding="utf-8"))
+        version = meta["version"]
+        bars = np.load(base / f"bars.{version}.npy", mmap_mode="r")
+        ts_ns = np.load(base / f"ts.{version}.npy", mmap_mode="r")
+        symbols = meta["symbols"]
+        return cls(bars, symbols, ts_ns, meta)
+
+    @staticmethod
+    def exists(name: str, root: str | Path = CUBE_DIR) -> bool:
+        return (Path(root) / name / "meta.json").exists()
+
+    # ---------- גישה ----------
+    @property
+    def shape(self) -> tuple:
+        return tuple(self.bars.shape)
+
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(np.asarray(self.ts_ns).view("datetime64[ns]")).tz_localize("UTC")
+        tz = self.meta.get("tz") or None
+        return idx.tz_convert(tz) if tz else idx
+
+    def index_of(self, symbol: str) -> Optional[int]:
+        return self._sym_index.get(symbol.upper())
+
+    def field(self, name: str) -> np.ndarray:
+        """מטריצה symbols × timestamps (view על ה-mmap, בלי העתקה)."""
+        return self.bars[self._field_index[name]]
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """DataFrame OHLCV לסימבול אחד (רק הזמנים שיש בהם נתונים) – תאימות לקוד שעובד לפי סימבול."""
+        i = self.index_of(symbol)
+        if i is None:
+            return pd.DataFrame(columns=self.fields)
+        values = np.asarray(self.bars[:, i, :], dtype=np.float64).T
+        df = pd.DataFrame(values, index=self.timestamps, columns=self.fields)
+        return df.dropna(how="all")
+
+    def age_sec(self) -> float:
+        return time.time() - float(self.meta.get("built_at", 0))
+
+
+def open_fresh(name: str, period: str, interval: str, max_age_sec: float = CUBE_MAX_AGE_SEC,
+               root: str | Path = CUBE_DIR) -> Optional[UniverseCube]:
+    """הקובייה של ה-universe רק אם נבנתה לאותם period/interval ולא ישנה מ-max_age_sec; אחרת None."""
+    if not UniverseCube.exists(name, root):
+        return None
+    try:
+        cube = UniverseCube.open(name, root)
+    except (OSError, ValueError, KeyError):
+        return None
+    if cube.meta.get("period") != period or cube.meta.get("interval") != interval:
+        return None
+    return cube if cube.age_sec() < max_age_sec else None
+
+
+# ---------- בנייה ----------
+_build_lock = threading.Lock()
+
+def build_universe_cube(name: str, frames: Mapping[str, pd.DataFrame], interval: str = "1d",
+                        period: str = "", root: str | Path = CUBE_DIR) -> UniverseCube:
+    """
+    מיישר DataFrames לפי סימבול לציר זמן משותף (איחוד; חסר = NaN) וכותב קובייה חדשה.
+    כתיבה לגרסה חדשה ואז החלפה אטומית של meta.json: קוראים פתוחים ממשיכים עם הגרסה הקודמת.
+    """
+    frames = {s.upper(): df for s, df in frames.items() if df is not None and not df.empty}
+    symbols = sorted(frames)
+    tz = ""
+    for df in frames.values():
+        if getattr(df.index, "tz", None) is not None:
+            tz = str(df.index.tz)
+            break
+    ts_ns = np.unique(np.concatenate([_utc_ns(df.index) for df in frames.values()])) if frames \
+        else np.empty(0, dtype=np.int64)
+
+    base = Path(root) / name
+    base.mkdir(parents=True, exist_ok=True)
+    version = f"{time.time_ns()}_{os.getpid()}"
+    bars_path = base / f"bars.{version}.npy"
+
+    with _build_lock:
+        bars = np.lib.format.open_memmap(bars_path, mode="w+", dtype=np.float32,
+                                         shape=(len(OHLCV), len(symbols), len(ts_ns)))
+        bars[:] = np.nan
+        for i, sym in enumerate(symbols):
+            df = frames[sym]
+            pos = np.searchsorted(ts_ns, _utc_ns(df.index))
+            values = df.reindex(columns=OHLCV).to_numpy(dtype=np.float32)
+            bars[:, i, pos] = values.T
+        bars.flush()
+        del bars
+        np.save(base / f"ts.{version}.npy", ts_ns)
+
+        meta = {
+            "version": version, "fields": OHLCV, "symbols": symbols, "tz": tz,
+            "interval": interval, "period": period, "built_at": time.time(),
+            "shape": [len(OHLCV), len(symbols), len(ts_ns)],
+        }
+        tmp = base / f"meta.json.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, base / "meta.json")
+
+        # גרסאות ישנות – מוחקים; תהליך שעדיין ממפה אותן שומר גישה (POSIX) עד שיסגור
+        for p in base.glob("*.npy"):
+            if version not in p.name:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    return UniverseCube.open(name, root)
+
+
+def refresh_universe_cube(name: str, symbols: Sequence[str], data_provider, period: str = "1y",
+                          interval: str = "1d", root: str | Path = CUBE_DIR) -> UniverseCube:
+    """בונה מחדש מה-DataProvider המוגדר (history_many -> bar store / yf.download במנות)."""
+    frames, _missing = data_provider.history_many(list(symbols), period=period, interval=interval)
+    return build_universe_cube(name, frames, interval=interval, period=period, root=root)
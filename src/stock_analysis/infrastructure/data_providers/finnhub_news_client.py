@@ -0,0 +1,245 @@
+# src/stock_analysis/infrastructure/data_providers/finnhub_news_client.py
+from __future__ import annotations
+import json, os, sqlite3, threading, time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from stock_analysis.infrastructure.persistent.sentiment_store import article_key
+from stock_analysis.infrastructure.utils.rate_limit import RateGovernor
+from stock_analysis.infrastructure.utils.single_flight import default_flight
+
+# ===== הגדרות (ENV) =====
+FINNHUB_RATE_PER_MIN = float(os.getenv("FINNHUB_RATE_PER_MIN", "55"))          # Free tier: 60/דקה, משאירים מרווח
+FINNHUB_NEWS_WORKERS = int(os.getenv("FINNHUB_NEWS_WORKERS", "4"))
+FINNHUB_NEWS_DB = os.getenv("FINNHUB_NEWS_DB", "data/news.db")                  # ריק = cache בזיכרון בלבד
+FINNHUB_NEWS_TTL_SEC = float(os.getenv("FINNHUB_NEWS_TTL_SEC", "900"))          # חלון שנבדק לאחרונה: בלי רשת
+FINNHUB_NEWS_RETENTION_DAYS = int(os.getenv("FINNHUB_NEWS_RETENTION_DAYS", "30"))
+
+COMPANY_NEWS_URL = "https://finnhub.io/api/v1/company-news"
+
+
+def _day(d: date) -> str:
+    return d.strftime("%Y-%m-%d")
+
+
+def _article_id(art: Mapping[str, Any]) -> str:
+    # אותו מפתח כמו ב-ArticleSentimentStore
+    text = f"{art.get('headline', '') or ''}. {art.get('summary', '') or ''}".strip()
+    return article_key(art, text)
+
+
+class NewsWindowStore:
+    """
+    כתבות שכבר נראו לכל סימבול + החלון [covered_from, covered_to] שכבר הורד.
+    SQLite כשיש db_path (שורד הפעלה מחדש של Streamlit), אחרת זיכרון בלבד.
+    """
+
+    def __init__(self, db_path: str = FINNHUB_NEWS_DB, retention_days: int = FINNHUB_NEWS_RETENTION_DAYS) -> None:
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._articles: Dict[str, Dict[str, Mapping[str, Any]]] = {}
+        self._coverage: Dict[str, Tuple[str, str, float]] = {}
+        if self.db_path:
+            self._ensure_schema()
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _ensure_schema(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("""
+            CREATE TABLE IF NOT EXISTS news_articles (
+                symbol TEXT NOT NULL, article_id TEXT NOT NULL,
+                ts INTEGER, payload TEXT NOT NULL,
+                PRIMARY KEY (symbol, article_id)
+            )
+            """)
+            con.execute("""
+            CREATE TABLE IF NOT EXISTS news_coverage (
+                symbol TEXT PRIMARY KEY,
+                covered_from TEXT NOT NULL, covered_to TEXT NOT NULL, fetched_at REAL NOT NULL
+            )
+            """)
+            con.commit()
+
+    def coverage(self, symbol: str) -> Optional[Tuple[str, str, float]]:
+        with self._lock:
+            cov = self._coverage.get(symbol)
+        if cov is not None or not self.db_path:
+            return cov
+        with self._conn() as con:
+            row = con.execute("SELECT covered_from, covered_to, fetched_at FROM news_coverage WHERE symbol=?",
+                              (symbol,)).fetchone()
+        if row is None:
+            return None
+        cov = (row[0], row[1], float(row[2]))
+        with self._lock:
+            self._coverage[symbol] = cov
+        return cov
+
+    def _load(self, symbol: str) -> Dict[str, Mapping[str, Any]]:
+        with self._lock:
+            arts = self._articles.get(symbol)
+        if arts is not None:
+            return arts
+        arts = {}
+        if self.db_path:
+            with self._conn() as con:
+                rows = con.execute("SELECT article_id, payload FROM news_articles WHERE symbol=?", (symbol,)).fetchall()
+            arts = {aid: json.loads(payload) for aid, payload in rows}
+        with self._lock:
+            return self._articles.setdefault(symbol, arts)
+
+    def articles(self, symbol: str, since_ts: int) -> List[Mapping[str, Any]]:
+        """כתבות מ-since_ts ואילך, מהחדשה לישנה (כמו התשובה של Finnhub)."""
+        loaded = self._load(symbol)
+        with self._lock:
+            arts = [a for a in loaded.values() if int(a.get("datetime") or 0) >= since_ts]
+        arts.sort(key=lambda a: int(a.get("datetime") or 0), reverse=True)
+        return arts
+
+    def merge(self, symbol: str, fresh: Sequence[Mapping[str, Any]], covered: Tuple[str, str]) -> int:
+        """ממזג כתבות חדשות (לפי מזהה) ומעדכן את החלון שכוסה; מחזיר כמה כתבות לא נראו קודם."""
+        arts = self._load(symbol)
+        cutoff = int(time.time()) - self.retention_days * 86400
+        now = time.time()
+        with self._lock:
+            new = {}
+            for a in fresh:
+                aid = _article_id(a)
+                if aid not in arts:
+                    new[aid] = a
+                arts[aid] = a
+            for aid in [k for k, a in arts.items() if int(a.get("datetime") or 0) < cutoff]:
+                arts.pop(aid, None)
+            self._coverage[symbol] = (covered[0], covered[1], now)
+        if self.db_path:
+            with self._conn() as con:
+                con.executemany(
+                    "INSERT OR REPLACE INTO news_articles(symbol,article_id,ts,payload) VALUES(?,?,?,?)",
+                    [(symbol, _article_id(a), int(a.get("datetime") or 0), json.dumps(a)) for a in fresh])
+                con.execute("DELETE FROM news_articles WHERE symbol=? AND ts<?", (symbol, cutoff))
+                con.execute("INSERT OR REPLACE INTO news_coverage(symbol,covered_from,covered_to,fetched_at) VALUES(?,?,?,?)",
+                            (symbol, covered[0], covered[1], now))
+                con.commit()
+        return len(new)
+
+
+class FinnhubNewsClient:
+    """
+    לקוח company-news של Finnhub:
+    - Session אחד עם connection pool (בלי TCP/TLS handshake לכל סימבול)
+    - מושל קצב נפרד מ-Yahoo, מכוון למכסת Finnhub (429 מוריד קצב, כמו ב-RateGovernor)
+    - cache לפי סימבול: קריאה חוזרת מורידה רק את הימים שמאז ה-fetch הקודם וממזגת
+    """
+
+    def __init__(self, api_key: str, timeout: float = 12, governor: Optional[RateGovernor] = None,
+                 store: Optional[NewsWindowStore] = None, ttl_sec: float = FINNHUB_NEWS_TTL_SEC,
+                 workers: int = FINNHUB_NEWS_WORKERS) -> None:
+        self.api_key = api_key
+        self.timeout = float(timeout)
+        self.governor = governor or default_finnhub_governor()
+        self.store = store or default_news_store()
+        self.ttl_sec = ttl_sec
+        self.workers = workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(4, workers * 2))
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.new_articles = 0
+
+    def _get(self, symbol: str, start: date, end: date, timeout: float) -> List[Mapping[str, Any]]:
+        params = {"symbol": symbol, "from": _day(start), "to": _day(end), "token": self.api_key}
+
+        def _do():
+            r = self.session.get(COMPANY_NEWS_URL, params=params, timeout=timeout)
+            r.raise_for_status()
+            return r.json()
+
+        data = self.governor.call(_do)
+        with self._lock:
+            self.requests += 1
+        return data if isinstance(data, list) else []
+
+    def _refresh(self, symbol: str, start: date, today: date, timeout: float) -> None:
+        cov = self.store.coverage(symbol)
+        if cov is not None:
+            cov_from, cov_to = date.fromisoformat(cov[0]), date.fromisoformat(cov[1])
+            if cov_from <= start and cov_to >= today and time.time() - cov[2] < self.ttl_sec:
+                with self._lock:
+                    self.cache_hits += 1
+                return
+        fresh: List[Mapping[str, Any]] = []
+        if cov is None or cov_to < start or cov_from > today:
+            # אין חפיפה – חלון מלא
+            fresh += self._get(symbol, start, today, timeout)
+            covered = (start, today)
+        else:
+            # היום האחרון שכוסה יכול היה להיות חלקי – מורידים אותו שוב יחד עם הימים שאחריו
+            fresh += self._get(symbol, cov_to, today, timeout)
+            if start < cov_from:
+                fresh += self._get(symbol, start, cov_from - timedelta(days=1), timeout)
+            covered = (min(start, cov_from), today)
+        added = self.store.merge(symbol, fresh, (_day(covered[0]), _day(covered[1])))
+        with self._lock:
+            self.new_articles += added
+
+    def fetch_news(self, symbol: str, days_back: int = 7, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """כתבות days_back ימים אחורה; חריגות רשת עוברות לקורא."""
+        symbol = (symbol or "").upper().strip()
+        if not symbol:
+            return []
+        today = datetime.utcnow().date()
+        start = today - timedelta(days=int(days_back))
+        # שני קוראים לאותו סימבול (צ'קליסט + סנטימנט) -> בקשה אחת
+        default_flight.do(("finnhub_news", symbol, int(days_back)),
+                          lambda: self._refresh(symbol, start, today, timeout or self.timeout))
+        since = int(datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp())
+        return [dict(a) for a in self.store.articles(symbol, since)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "cache_hits": self.cache_hits,
+                    "new_articles": self.new_articles, "governor": self.governor.stats()}
+
+
+_default_governor: Optional[RateGovernor] = None
+_default_store: Optional[NewsWindowStore] = None
+_default_clients: Dict[str, FinnhubNewsClient] = {}
+_default_guard = threading.Lock()
+
+def default_finnhub_governor() -> RateGovernor:
+    """מושל קצב אחד לכל הקריאות ל-Finnhub בתהליך (מכסה למפתח API, לא ללקוח)."""
+    global _default_governor
+    with _default_guard:
+        if _default_governor is None:
+            _default_governor = RateGovernor(rate_per_min=FINNHUB_RATE_PER_MIN,
+                                             min_rate=min(10.0, FINNHUB_RATE_PER_MIN),
+                                             max_rate=FINNHUB_RATE_PER_MIN)
+        return _default_governor
+
+def default_news_store() -> NewsWindowStore:
+    global _default_store
+    with _default_guard:
+        if _default_store is None:
+            _default_store = NewsWindowStore()
+        return _default_store
+
+def default_news_client(api_key: str) -> FinnhubNewsClient:
+    """לקוח אחד לכל מפתח API – ה-Session (וה-connection pool) משותף גם כשה-Screener נבנה מחדש לכל בקשה."""
+    with _default_guard:
+        client = _default_clients.get(api_key)
+    if client is None:
+        client = FinnhubNewsClient(api_key)
+        with _default_guard:
+            client = _default_clients.setdefault(api_key, client)
+    return client
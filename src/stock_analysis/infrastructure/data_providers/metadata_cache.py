@@ -0,0 +1,138 @@
+# src/stock_analysis/infrastructure/data_providers/metadata_cache.py
+from __future__ import annotations
+import os, threading, time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+# ===== TTL לפי סוג שדה (ENV) =====
+META_FUNDAMENTALS_TTL_SEC = float(os.getenv("META_FUNDAMENTALS_TTL_SEC", str(6 * 3600)))  # פנדמנטלס: שעות
+META_PRICE_TTL_SEC = float(os.getenv("META_PRICE_TTL_SEC", "15"))                         # מחיר: שניות
+
+# שדות .info שמשתנים כל הזמן – נחשבים "מחיר" ומקבלים TTL קצר
+PRICE_FIELDS = frozenset({
+    "currentPrice", "regularMarketPrice", "regularMarketChange", "regularMarketChangePercent",
+    "regularMarketVolume", "regularMarketDayHigh", "regularMarketDayLow",
+    "dayHigh", "dayLow", "volume", "bid", "ask", "bidSize", "askSize",
+})
+
+
+class TickerMetadataCache:
+    """
+    Cache משותף למטא-דאטה לפי סימבול עם TTL ברמת השדה:
+    פנדמנטלס (sector, trailingPE, ...) נשמרים לשעות, שדות מחיר לשניות בלבד.
+    """
+
+    def __init__(self, fundamentals_ttl: float = META_FUNDAMENTALS_TTL_SEC,
+                 price_ttl: float = META_PRICE_TTL_SEC) -> None:
+        self.fundamentals_ttl = fundamentals_ttl
+        self.price_ttl = price_ttl
+        self._lock = threading.Lock()
+        # symbol -> field -> (value, stored_at)
+        self._fields: Dict[str, Dict[str, Tuple[Any, float]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _ttl(self, field: str) -> float:
+        return self.price_ttl if field in PRICE_FIELDS else self.fundamentals_ttl
+
+    def _fresh(self, symbol: str, field: str, ttl: Optional[float] = None) -> Tuple[bool, Any]:
+        entry = self._fields.get(symbol, {}).get(field)
+        if entry is None:
+            return False, None
+        value, ts = entry
+        return (time.time() - ts) < (ttl if ttl is not None else self._ttl(field)), value
+
+    def _store_info(self, symbol: str, data: Mapping[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            fields = self._fields.setdefault(symbol, {})
+            for k, v in data.items():
+                fields[k] = (v, now)
+            fields["__info__"] = (True, now)
+
+    def info(self, symbol: str, fetch_info: Callable[[], Mapping[str, Any]],
+             fetch_price: Optional[Callable[[], Optional[float]]] = None) -> Dict[str, Any]:
+        """
+        מחזיר את ה-info השמור אם הפנדמנטלס עדיין טריים; אחרת מוריד מחדש.
+        שדות מחיר שפג תוקפם מרועננים: currentPrice דרך fetch_price (נתיב quote קל) אם סופק;
+        אם ה-quote נכשל – .info מלא מחדש, ואם גם הוא נכשל – ערכי המחיר האחרונים שנשמרו.
+        הפלט לעולם לא נשאר בלי currentPrice שהיה ב-cache.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            fresh, _ = self._fresh(symbol, "__info__")
+        if not fresh:
+            with self._lock:
+                self.misses += 1
+            self._store_info(symbol, dict(fetch_info() or {}))
+        else:
+            with self._lock:
+                self.hits += 1
+
+        with self._lock:
+            out: Dict[str, Any] = {}
+            stale: Dict[str, Any] = {}
+            for k, (v, ts) in self._fields.get(symbol, {}).items():
+                if k == "__info__" or k.startswith("_"):
+                    continue
+                if k in PRICE_FIELDS and time.time() - ts >= self.price_ttl:
+                    stale[k] = v
+                    continue
+                out[k] = v
+        if not stale:
+            return out
+        price = fetch_price() if fetch_price is not None else None
+        if price:
+            self.put_price(symbol, price)
+            out["currentPrice"] = price
+            return out
+        try:
+            data = dict(fetch_info() or {})
+        except Exception:
+            data = {}
+        if data.get("currentPrice"):
+            self._store_info(symbol, data)
+            out.update(data)
+            return out
+        # גם .info לא החזיר מחיר (למשל throttling): המחיר האחרון הידוע עדיף על כלום
+        return {**stale, **out}
+
+    def price(self, symbol: str) -> Optional[float]:
+        """מחיר אחרון מה-cache אם עדיין בתוקף (בלי רשת)."""
+        with self._lock:
+            fresh, value = self._fresh(symbol.upper(), "currentPrice")
+        return value if fresh and value else None
+
+    def put_price(self, symbol: str, price: float) -> None:
+        with self._lock:
+            self._fields.setdefault(symbol.upper(), {})["currentPrice"] = (float(price), time.time())
+
+    def get(self, symbol: str, field: str, fetch: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """שדה כללי (למשל מחזיקים מוסדיים) עם TTL משלו; מוריד רק כשפג תוקף."""
+        symbol = symbol.upper()
+        key = f"_{field}"
+        with self._lock:
+            fresh, value = self._fresh(symbol, key, ttl if ttl is not None else self.fundamentals_ttl)
+            if fresh:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = fetch()
+        with self._lock:
+            self._fields.setdefault(symbol, {})[key] = (value, time.time())
+        return value
+
+    def invalidate(self, symbol: str) -> None:
+        with self._lock:
+            self._fields.pop(symbol.upper(), None)
+
+
+_default_cache: Optional[TickerMetadataCache] = None
+_default_guard = threading.Lock()
+
+def default_metadata_cache() -> TickerMetadataCache:
+    """Cache יחיד לכל התהליך – Screener, FeatureExtractor ו-Holders חולקים אותו."""
+    global _default_cache
+    with _default_guard:
+        if _default_cache is None:
+            _default_cache = TickerMetadataCache()
+        return _default_cache
@@ -1,20 +1,236 @@
 # src/stock_analysis/infrastructure/data_providers/yfinance_provider.py
 from __future__ import annotations
+import os, sys, threading, time
 import pandas as pd
 import yfinance as yf
-from typing import Mapping, Any
+from typing import Mapping, Any, Optional, Sequence, Dict, List, Tuple
+
+from stock_analysis.infrastructure.data.bar_store import BarStore, is_intraday, period_window
+from stock_analysis.infrastructure.utils.single_flight import SingleFlight, default_flight
+from stock_analysis.infrastructure.utils.rate_limit import (
+    RateGovernor, default_governor, is_throttle_error, is_throttle_message,
+)
+from stock_analysis.infrastructure.data_providers.metadata_cache import TickerMetadataCache, default_metadata_cache
+
+# כמו ב-_download_last_close_prices: מנות כדי לא ליפול על מגבלות URL/Rate
+DOWNLOAD_CHUNK_SIZE = 120
+# נר יומי שרוענן בחלון הזה נחשב מספיק טרי כ-last_price (כמו ה-refresh של המאגר)
+LAST_PRICE_MAX_BAR_AGE_SEC = float(os.getenv("LAST_PRICE_MAX_BAR_AGE_SEC", "900"))
+
+def split_download(data: pd.DataFrame, chunk: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """מפרק פלט של yf.download(group_by="ticker") ל-DataFrame נפרד לכל סימבול."""
+    out: Dict[str, pd.DataFrame] = {}
+    if data is None or data.empty:
+        return out
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for sym in chunk:
+            if sym not in available:
+                continue
+            df = data[sym].dropna(how="all")
+            if not df.empty:
+                out[sym] = df
+    elif len(chunk) == 1:
+        # טיקר יחיד: עמודות שטוחות
+        df = data.dropna(how="all")
+        if not df.empty:
+            out[chunk[0]] = df
+    return out
+
+def _download_errors(chunk: Sequence[str]) -> Dict[str, str]:
+    """
+    yf.download לא זורק על 429: השגיאות לכל טיקר נרשמות ב-yf.shared._ERRORS (מתאפס בכל download)
+    והמסגרת חוזרת ריקה/חלקית. מחזיר {סימבול: הודעה} לסימבולים של המנה.
+    """
+    shared = sys.modules.get("yfinance.shared")
+    errors = getattr(shared, "_ERRORS", None) or {}
+    wanted = {s.upper() for s in chunk}
+    return {str(k).upper(): str(v) for k, v in dict(errors).items() if str(k).upper() in wanted}
+
+
+def governed_download(governor: RateGovernor, chunk: Sequence[str], **kwargs) -> pd.DataFrame:
+    """
+    yf.download למנה דרך המושל: yfinance שולח בקשת chart לכל טיקר, ולכן לוקחים len(chunk) טוקנים.
+    429 שנבלע ב-_ERRORS מדווח כ-throttled=True, כך שהקצב יורד גם במסלול הבאלק.
+    """
+    chunk = list(chunk)
+    governor.acquire(len(chunk))
+    t0 = time.perf_counter()
+    try:
+        data = yf.download(tickers=chunk, **kwargs)
+    except Exception as e:
+        governor.report(False, time.perf_counter() - t0, throttled=is_throttle_error(e))
+        raise
+    throttled = [sym for sym, msg in _download_errors(chunk).items() if is_throttle_message(msg)]
+    if throttled:
+        print(f"⚠️ yf.download throttled for {len(throttled)}/{len(chunk)} symbols (e.g. {throttled[0]})")
+    governor.report(not throttled, time.perf_counter() - t0, throttled=bool(throttled))
+    return data
+
 
 class YFinanceProvider:
+    def __init__(self, bar_store: Optional[BarStore] = None, auto_adjust: bool = True,
+                 prefetch_ttl_sec: float = 300.0, flight: Optional[SingleFlight] = None,
+                 metadata: Optional[TickerMetadataCache] = None,
+                 governor: Optional[RateGovernor] = None) -> None:
+        # bar_store=None -> התנהגות מקורית (הורדה מלאה בכל קריאה)
+        self.bar_store = bar_store
+        self.auto_adjust = auto_adjust
+        # קריאות זהות במקביל (Scanner/Streamlit/API) מאוחדות לבקשה אחת
+        self.flight = flight or default_flight
+        # info/מחיר משותפים לכל התהליך: פנדמנטלס לשעות, מחיר לשניות
+        self.metadata = metadata or default_metadata_cache()
+        # כל קריאה ל-Yahoo עוברת דרך מושל הקצב המשותף (אחרי ה-cache וה-single-flight)
+        self.governor = governor or default_governor()
+        # בלי bar_store: תוצאות history_many נשמרות בזיכרון עד שה-workers צורכים אותן
+        self.prefetch_ttl_sec = prefetch_ttl_sec
+        self._prefetched: Dict[Tuple[str, str, str], Tuple[float, pd.DataFrame]] = {}
+        self._prefetch_lock = threading.Lock()
+
+    def _fetch_info(self, symbol: str) -> Mapping[str, Any]:
+        def _do():
+            t = yf.Ticker(symbol)
+            return self.governor.call(lambda: t.info) or {}
+        return self.flight.do(("info", symbol.upper()), _do)
+
+    def _quote(self, symbol: str) -> float | None:
+        """נתיב מחיר קל: fast_info (בקשת chart קצרה) במקום .info המלא."""
+        def _do():
+            try:
+                price = self.governor.call(lambda: yf.Ticker(symbol).fast_info["lastPrice"])
+            except Exception:
+                return None
+            return float(price) if price is not None and price == price else None
+        return self.flight.do(("quote", symbol.upper()), _do)
+
     def info(self, symbol: str) -> Mapping[str, Any]:
+        return self.metadata.info(symbol, lambda: self._fetch_info(symbol), lambda: self._quote(symbol))
+
+    def _fetch_history(self, symbol: str, period: str | None = None, interval: str = "1d", start=None) -> pd.DataFrame:
         t = yf.Ticker(symbol)
-        return t.info or {}
+        if start is not None:
+            return self.governor.call(lambda: t.history(start=start, interval=interval, auto_adjust=self.auto_adjust))
+        return self.governor.call(lambda: t.history(period=period, interval=interval, auto_adjust=self.auto_adjust))
 
     def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
-        t = yf.Ticker(symbol)
-        df = t.history(period=period, interval=interval, auto_adjust=True)
-        return df
+        key = ("history", symbol.upper(), period, interval, self.auto_adjust)
+        return self.flight.do(key, lambda: self._history(symbol, period, interval))
+
+    def _history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        if self.bar_store is None:
+            with self._prefetch_lock:
+                hit = self._prefetched.get((symbol.upper(), period, interval))
+            if hit and time.time() - hit[0] < self.prefetch_ttl_sec:
+                return hit[1]
+            return self._fetch_history(symbol, period=period, interval=interval)
+        return self.bar_store.history(
+            symbol, period=period, interval=interval, adjusted=self.auto_adjust,
+            fetch=lambda period=None, start=None: self._fetch_history(symbol, period, interval, start),
+        )
+
+    def _download_chunks(self, symbols: List[str], period: str | None, interval: str,
+                         start=None) -> Dict[str, pd.DataFrame]:
+        """yf.download במנות: period (הורדה מלאה) או start (זנב משותף לכל המנה)."""
+        frames: Dict[str, pd.DataFrame] = {}
+        window = {"start": start} if start is not None else {"period": period}
+        for i in range(0, len(symbols), DOWNLOAD_CHUNK_SIZE):
+            chunk = symbols[i:i + DOWNLOAD_CHUNK_SIZE]
+            try:
+                data = governed_download(
+                    self.governor, chunk,
+                    **window,
+                    interval=interval,
+                    auto_adjust=self.auto_adjust,
+                    group_by="ticker",
+                    threads=True,
+                    progress=False,
+                    ignore_tz=False,   # אותו אינדקס tz-aware כמו Ticker.history
+                )
+            except Exception:
+                continue  # המנה כולה תדווח כחסרה
+            frames.update(split_download(data, chunk))
+        return frames
+
+    def history_many(self, symbols: Sequence[str], period: str = "1y",
+                     interval: str = "1d") -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+        """
+        הורדה מרוכזת (yf.download במנות) לכמה סימבולים.
+        מחזיר (frames לפי סימבול, סימבולים חסרים). התוצאות נשמרות כך ש-history() הבא לא יוריד שוב.
+        עם מאגר: טרי -> בלי רשת; מכוסה אבל ישן -> הורדת זנב מרוכזת אחת (מהנר האחרון הוותיק ביותר) ומיזוג;
+        רק סימבולים בלי כיסוי (או שההתאמה שלהם השתנתה) מקבלים הורדה מלאה של period.
+        """
+        wanted = list(dict.fromkeys(s.upper() for s in symbols if s))
+        frames: Dict[str, pd.DataFrame] = {}
+        to_fetch = wanted
+        if self.bar_store is not None:
+            to_fetch = []
+            stale: Dict[str, pd.Timestamp] = {}
+            for sym in wanted:
+                state, hit, last_ts = self.bar_store.status(sym, period, interval, self.auto_adjust)
+                if state == "fresh" and hit is not None and not hit.empty:
+                    frames[sym] = hit
+                elif state == "stale":
+                    stale[sym] = last_ts
+                else:
+                    to_fetch.append(sym)
+            if stale:
+                if is_intraday(interval):
+                    start = min(ts.tz_convert("UTC") if ts.tzinfo else ts.tz_localize("UTC")
+                                for ts in map(pd.Timestamp, stale.values()))
+                else:
+                    start = min(pd.Timestamp(ts).date() for ts in stale.values())
+                tails = self._download_chunks(list(stale), None, interval, start=start)
+                for sym in stale:
+                    if sym not in tails:
+                        # אין זנב (או שהמנה נכשלה): מה שבמאגר עדיין מכסה את period, בלי לסמן כמרוענן
+                        df, _meta = self.bar_store.load(sym, interval, self.auto_adjust)
+                        frames[sym] = period_window(df, period)
+                        continue
+                    merged = self.bar_store.put_tail(sym, interval, self.auto_adjust, tails[sym], period)
+                    if merged is None:
+                        to_fetch.append(sym)  # דיבידנד/ספליט: צריך את כל ה-period מחדש
+                    else:
+                        frames[sym] = merged
+
+        fetched = self._download_chunks(to_fetch, period, interval) if to_fetch else {}
+        now = time.time()
+        if self.bar_store is not None:
+            for sym, df in fetched.items():
+                frames[sym] = self.bar_store.put(sym, interval, self.auto_adjust, df, period)
+        else:
+            frames.update(fetched)
+            with self._prefetch_lock:
+                self._prefetched = {k: v for k, v in self._prefetched.items()
+                                    if now - v[0] < self.prefetch_ttl_sec}
+                for sym, df in fetched.items():
+                    self._prefetched[(sym, period, interval)] = (now, df)
+
+        missing = [s for s in wanted if s not in frames or frames[s].empty]
+        return {s: df for s, df in frames.items() if not df.empty}, missing
+
+    def _bar_price(self, symbol: str) -> float | None:
+        """Close של הנר היומי האחרון אם הוא הורד לאחרונה (מאגר או prefetch) – בלי רשת."""
+        now = time.time()
+        if self.bar_store is not None:
+            hit = self.bar_store.latest_close(symbol, "1d", self.auto_adjust)
+            if hit is not None and now - hit[1] < LAST_PRICE_MAX_BAR_AGE_SEC:
+                return hit[0]
+            return None
+        with self._prefetch_lock:
+            frames = [v for (sym, _, interval), v in self._prefetched.items()
+                      if sym == symbol.upper() and interval == "1d"]
+        for ts, df in sorted(frames, key=lambda v: v[0], reverse=True):
+            if now - ts < LAST_PRICE_MAX_BAR_AGE_SEC and "Close" in df and not df["Close"].dropna().empty:
+                return float(df["Close"].dropna().iloc[-1])
+        return None
 
     def last_price(self, symbol: str) -> float | None:
-        t = yf.Ticker(symbol)
-        info = t.info or {}
-        return info.get("currentPrice")
+        """מחיר אחרון: cache -> נר אחרון שמור -> fast_info -> .info (רק כמוצא אחרון)."""
+        price = self.metadata.price(symbol)
+        if price is None:
+            price = self._bar_price(symbol) or self._quote(symbol)
+            if price is None:
+                price = self.info(symbol).get("currentPrice")
+            if price is not None:
+                self.metadata.put_price(symbol, price)
+        return price
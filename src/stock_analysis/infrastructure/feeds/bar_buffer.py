@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytz
+
+US_EASTERN = pytz.timezone("US/Eastern")
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _utc_ns(idx: pd.DatetimeIndex) -> np.ndarray:
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    return np.asarray(idx.tz_localize(None), dtype="datetime64[ns]").view(np.int64)
+
+
+def _session_day(idx: pd.DatetimeIndex) -> np.ndarray:
+    # מספר היום (לפי שעון ניו-יורק) של כל נר – לחיתוך לפי sessions
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx
+    et = idx.tz_convert(US_EASTERN).tz_localize(None)
+    return np.asarray(et, dtype="datetime64[D]").astype(np.int64)
+
+
+class BarRingBuffer:
+    """
+    Buffer בזיכרון לנרות 5m של טיקר אחד: מערכי numpy רציפים (ts, OHLCV, יום מסחר).
+    merge() דורס מהנר הראשון של הזנב והלאה (הנר הפתוח מתעדכן) ומוסיף נרות חדשים.
+    frame() מוסר views ולא עותקים, ולכן שורה שכבר נמסרה לא נדרסת במקום: merge שנוגע בה
+    עובר קודם למערכים חדשים (copy-on-write) ו-views ישנים נשארים snapshot קבוע.
+    כשהמקום נגמר – דחיסה למערכים חדשים שמשאירה רק retain_days sessions אחרונים.
+    """
+
+    def __init__(self, retain_days: int = 12, capacity: int = 2048) -> None:
+        self.retain_days = retain_days
+        self._alloc(capacity)
+        self._start = 0
+        self._end = 0
+
+    def _alloc(self, capacity: int) -> None:
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._day = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((capacity, len(COLUMNS)), dtype=np.float64)
+        self._exposed = 0  # סוף הטווח שכבר נמסר ב-views (frame) מהמערכים הנוכחיים
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        return len(self._ts)
+
+    def sessions(self) -> int:
+        day = self._day[self._start:self._end]
+        return int(np.count_nonzero(np.diff(day)) + 1) if len(day) else 0
+
+    @property
+    def last_ts(self) -> Optional[pd.Timestamp]:
+        if not len(self):
+            return None
+        return pd.Timestamp(int(self._ts[self._end - 1]), tz="UTC").tz_convert(US_EASTERN)
+
+    def _first_of_last_sessions(self, lo: int, hi: int, days: int) -> int:
+        """אינדקס הנר הראשון של days ה-sessions האחרונים בטווח [lo, hi)."""
+        if hi <= lo or days <= 0:
+            return hi
+        starts = np.flatnonzero(np.diff(self._day[lo:hi])) + 1 + lo  # תחילת כל session חוץ מהראשון
+        if days > len(starts):
+            return lo
+        return int(starts[-days])
+
+    def replace(self, df: pd.DataFrame) -> None:
+        self._start = self._end = 0
+        self.merge(df)
+
+    def merge(self, df: pd.DataFrame) -> None:
+        if df is None or df.empty:
+            return
+        idx = pd.DatetimeIndex(df.index)
+        ts = _utc_ns(idx)
+        n = len(ts)
+        pos = self._start + int(np.searchsorted(self._ts[self._start:self._end], ts[0], side="left"))
+        if pos + n > self.capacity:
+            self._compact(pos, n)
+            pos = self._end
+        elif pos < self._exposed:
+            pos = self._detach(pos)
+        self._ts[pos:pos + n] = ts
+        self._day[pos:pos + n] = _session_day(idx)
+        self._values[pos:pos + n] = df.reindex(columns=COLUMNS).to_numpy(dtype=np.float64)
+        self._end = pos + n
+
+    def _compact(self, pos: int, incoming: int) -> None:
+        keep_from = self._first_of_last_sessions(self._start, pos, self.retain_days)
+        kept = pos - keep_from
+        capacity = self.capacity
+        while kept + incoming > capacity // 2:
+            capacity *= 2
+        ts, day, values = self._ts, self._day, self._values
+        self._alloc(capacity)
+        self._ts[:kept] = ts[keep_from:pos]
+        self._day[:kept] = day[keep_from:pos]
+        self._values[:kept] = values[keep_from:pos]
+        self._start, self._end = 0, kept
+
+    def _detach(self, pos: int) -> int:
+        """copy-on-write: מעתיק את [start, pos) למערכים חדשים באותו גודל; מחזיר את pos החדש."""
+        kept = pos - self._start
+        ts, day, values = self._ts, self._day, self._values
+        self._alloc(self.capacity)
+        self._ts[:kept] = ts[self._start:pos]
+        self._day[:kept] = day[self._start:pos]
+        self._values[:kept] = values[self._start:pos]
+        self._start, self._end = 0, kept
+        return kept
+
+    def frame(self, days: int) -> pd.DataFrame:
+        """
+        DataFrame מעל view לקריאה בלבד של days ה-sessions האחרונים (US/Eastern).
+        ה-view הוא snapshot: merge() מאוחר יותר לא משנה אותו (ראה copy-on-write ב-merge).
+        """
+        if not len(self):
+            return pd.DataFrame()
+        lo = self._first_of_last_sessions(self._start, self._end, int(days))
+        self._exposed = max(self._exposed, self._end)
+        values = self._values[lo:self._end].view()
+        values.flags.writeable = False
+        idx = pd.DatetimeIndex(self._ts[lo:self._end].view("datetime64[ns]")).tz_localize("UTC").tz_convert(US_EASTERN)
+        return pd.DataFrame(values, index=idx, columns=COLUMNS, copy=False)
@@ -1,61 +1,39 @@
 from __future__ import annotations
 import os, time, random, threading, asyncio, logging
-from typing import Optional
+from typing import Dict, Optional
 
 import pandas as pd
 import pytz
 import yfinance as yf
 
 from ...domain.ports import MarketDataFeed
+from ..utils.single_flight import default_flight
+from ..utils.rate_limit import default_governor
+from .bar_buffer import BarRingBuffer
 
 log = logging.getLogger(__name__)
 US_EASTERN = pytz.timezone("US/Eastern")
 
 # ===== הגדרות שניתנות לשליטה דרך ENV =====
-YF_RATE_PER_MIN   = int(os.getenv("YF_RATE_PER_MIN", "90"))   # קצב בקשות/דקה
 YF_MAX_RETRIES    = int(os.getenv("YF_MAX_RETRIES", "3"))     # כמה ניסיונות חוזרים
 YF_BASE_BACKOFF   = float(os.getenv("YF_BASE_BACKOFF", "1.5"))# שניות (אקספוננציאלי)
 YF_MAX_BACKOFF    = float(os.getenv("YF_MAX_BACKOFF", "10"))  # תקרת השהייה בין ניסיונות
 YF_ALLOW_PREPOST  = os.getenv("YF_ALLOW_PREPOST", "false").lower() == "true"
+FEED_RETAIN_DAYS  = int(os.getenv("FEED_RETAIN_DAYS", "12"))          # כמה sessions נשמרים ב-buffer
+FEED_MIN_REFRESH  = float(os.getenv("FEED_MIN_REFRESH_SEC", "10"))    # מתחת לזה – מגישים מה-buffer בלי רשת
 
-# ===== Rate Limiter בטוח ל-Threadים =====
-class RateLimiter:
-    """Token bucket פשוט לשמירה על קצב yfinance."""
-    def __init__(self, rate_per_minute: int = 60):
-        self.capacity = float(rate_per_minute)
-        self.tokens   = float(rate_per_minute)
-        self.rate     = float(rate_per_minute) / 60.0
-        self.last     = time.time()
-        self.lock     = threading.Lock()
-
-    def acquire(self):
-        # נחזור עד שנקבל 'טוקן'
-        while True:
-            with self.lock:
-                now = time.time()
-                delta = now - self.last
-                self.tokens = min(self.capacity, self.tokens + delta * self.rate)
-                self.last = now
-                if self.tokens >= 1.0:
-                    self.tokens -= 1.0
-                    return
-                # צריך לחכות
-                needed = (1.0 - self.tokens) / self.rate
-            # מחוץ לנעילה
-            time.sleep(needed + random.uniform(0, 0.25))
-
-_limiter = RateLimiter(rate_per_minute=YF_RATE_PER_MIN)
+# ===== קצב משותף: כל הקריאות ל-Yahoo עוברות דרך אותו Governor (AIMD) =====
+_governor = default_governor()
 
 def _with_backoff(callable_fn):
     """
-    מפעיל פונקציה סינכרונית עם RateLimit + retry/backoff.
+    מפעיל פונקציה סינכרונית דרך ה-Governor המשותף + retry/backoff.
     מחזיר את הערך, או מעלה את החריגה בניסיון האחרון כדי שתירשם בלוג.
     """
     last_exc: Optional[Exception] = None
     for attempt in range(YF_MAX_RETRIES + 1):
         try:
-            _limiter.acquire()
-            return callable_fn()
+            return _governor.call(callable_fn)
         except Exception as e:
             last_exc = e
             if attempt >= YF_MAX_RETRIES:
@@ -68,6 +46,21 @@ def _with_backoff(callable_fn):
     raise last_exc if last_exc else RuntimeError("yfinance call failed")
 
 class YFinanceFeed(MarketDataFeed):
+    """
+    כל טיקר מקבל BarRingBuffer בזיכרון: backfill מלא בפעם הראשונה,
+    ואחר כך כל poll מוריד רק זנב קצר (period=1d) וממזג אותו.
+    הקוראים מקבלים view לקריאה בלבד מעל ה-buffer, ולא DataFrame חדש מהרשת.
+    """
+
+    def __init__(self, retain_days: int = FEED_RETAIN_DAYS, min_refresh_sec: float = FEED_MIN_REFRESH) -> None:
+        self.retain_days = retain_days
+        self.min_refresh_sec = min_refresh_sec
+        self._buffers: Dict[str, BarRingBuffer] = {}
+        self._refreshed: Dict[str, float] = {}
+        self._backfilled: Dict[str, int] = {}   # כמה ימים הורדו ב-backfill האחרון
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
     async def get_5m_history(self, ticker: str, days: int = 10) -> pd.DataFrame:
         loop = asyncio.get_running_loop()
         # מפעיל את הפונקציה הסינכרונית ב-executor כדי לא לחסום את event loop
@@ -79,11 +72,56 @@ class YFinanceFeed(MarketDataFeed):
         ticker = (ticker or "").strip().upper()
         if not ticker:
             return pd.DataFrame()
+        # LiveEngine + RiskManager על אותו טיקר באותו רגע -> רענון אחד;
+        # days שונים מסונכרנים על נעילת הטיקר ומוצאים buffer טרי
+        default_flight.do(("5m", ticker, int(days)), lambda: self._refresh(ticker, int(days)))
+        with self._lock(ticker):
+            buf = self._buffers.get(ticker)
+            return buf.frame(days) if buf is not None else pd.DataFrame()
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _tail_period(self, buf: BarRingBuffer) -> Optional[str]:
+        """period לזנב לפי הפער מהנר האחרון; None = הפער גדול מדי, צריך backfill."""
+        gap = (pd.Timestamp.now(tz=US_EASTERN).date() - buf.last_ts.date()).days
+        if gap <= 0:
+            return "1d"
+        if gap <= 4:   # סוף שבוע / חג
+            return "5d"
+        return None
+
+    def _refresh(self, ticker: str, days: int) -> None:
+        with self._lock(ticker):
+            buf = self._buffers.get(ticker)
+            if buf is not None and len(buf) and self._backfilled.get(ticker, 0) >= days:
+                if time.time() - self._refreshed.get(ticker, 0.0) < self.min_refresh_sec:
+                    return
+                period = self._tail_period(buf)
+                if period is not None:
+                    tail = self._fetch_single(ticker, period)
+                    if not tail.empty:
+                        buf.merge(tail)
+                    self._refreshed[ticker] = time.time()
+                    return
+
+            df = self._fetch_single(ticker, f"{max(days, 1)}d")
+            if df.empty:
+                return
+            if buf is None:
+                buf = self._buffers[ticker] = BarRingBuffer(retain_days=max(self.retain_days, days))
+            buf.retain_days = max(buf.retain_days, days)
+            buf.replace(df)
+            self._backfilled[ticker] = days
+            self._refreshed[ticker] = time.time()
+
+    def _fetch_single(self, ticker: str, period: str) -> pd.DataFrame:
 
         def _do_fetch():
             t = yf.Ticker(ticker)
             return t.history(
-                period=f"{int(days)}d",
+                period=period,
                 interval="5m",
                 prepost=YF_ALLOW_PREPOST,   # ברירת המחדל False – RTH בלבד
                 actions=False,
@@ -93,7 +131,7 @@ class YFinanceFeed(MarketDataFeed):
         try:
             df = _with_backoff(_do_fetch)
         except Exception as e:
-            log.error("yfinance.history failed | %s | %sd 5m | %s", ticker, days, e)
+            log.error("yfinance.history failed | %s | %s 5m | %s", ticker, period, e)
             return pd.DataFrame()
 
         if df is None or df.empty:
@@ -1,8 +1,12 @@
 # src/stock_analysis/infrastructure/models/success_predictor_adapter.py
-from stock_analysis.ml.periodic_models import predict_success_single
+from typing import List, Mapping, Any, Sequence
+from stock_analysis.ml.periodic_models import predict_success_single, predict_success_single_batch
 
 class SuccessPredictorAdapter:
     def __init__(self, horizon: str = "1mo"):
         self.horizon = horizon
     def predict_success(self, stock_features: dict) -> float:
         return float(predict_success_single(stock_features, preferred=self.horizon))
+    def predict_success_many(self, rows: Sequence[Mapping[str, Any]]) -> List[float]:
+        # מטריצה אחת ו-predict_proba אחד לאופק – לסריקות
+        return predict_success_single_batch(rows, preferred=self.horizon)
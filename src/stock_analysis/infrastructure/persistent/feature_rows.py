@@ -0,0 +1,97 @@
+# src/stock_analysis/infrastructure/persistent/feature_rows.py
+from __future__ import annotations
+import json, os, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# ===== הגדרות (ENV) =====
+FEATURE_ROWS_DB = os.getenv("FEATURE_ROWS_DB", "data/feature_rows.db")                     # ריק = בלי שמירה
+FEATURE_ROWS_MAX_AGE_SEC = float(os.getenv("FEATURE_ROWS_MAX_AGE_SEC", str(12 * 3600)))     # שורה "טרייה" לאימון
+
+_SQLITE_MAX_VARS = 900
+
+
+class FeatureRowStore:
+    """
+    שורות אימון שחולצו (FeatureExtractor.extract) לפי (ticker, as_of) – as_of = תאריך הנר האחרון.
+    אימון חוזר באותו יום (או על תאריך היסטורי) נבנה מכאן בלי להוריד שוב את ה-S&P 500.
+    """
+
+    def __init__(self, db_path: str = FEATURE_ROWS_DB) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.writes = 0
+        self._ensure_schema()
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _ensure_schema(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("""
+            CREATE TABLE IF NOT EXISTS feature_rows (
+                ticker TEXT NOT NULL, as_of TEXT NOT NULL,
+                payload TEXT NOT NULL, stored_at REAL NOT NULL,
+                PRIMARY KEY (ticker, as_of)
+            )
+            """)
+            con.commit()
+
+    def put(self, as_of: str, row: Mapping[str, Any]) -> None:
+        with self._conn() as con:
+            con.execute("INSERT OR REPLACE INTO feature_rows(ticker,as_of,payload,stored_at) VALUES(?,?,?,?)",
+                        (str(row["Ticker"]).upper(), as_of, json.dumps(dict(row), default=float), time.time()))
+            con.commit()
+        with self._lock:
+            self.writes += 1
+
+    def rows(self, tickers: Sequence[str], as_of: Optional[str] = None,
+             max_age_sec: Optional[float] = None) -> Dict[str, dict]:
+        """
+        השורה האחרונה לכל ticker (או בדיוק ל-as_of אם צוין).
+        max_age_sec: רק שורות שנשמרו בחלון הזה (0 = אף אחת).
+        """
+        if max_age_sec is not None and max_age_sec <= 0:
+            return {}
+        wanted = list(dict.fromkeys(t.upper() for t in tickers if t))
+        since = time.time() - max_age_sec if max_age_sec is not None else 0.0
+        found: Dict[str, dict] = {}
+        with self._conn() as con:
+            for i in range(0, len(wanted), _SQLITE_MAX_VARS):
+                chunk = wanted[i:i + _SQLITE_MAX_VARS]
+                marks = ",".join("?" * len(chunk))
+                sql = (f"SELECT ticker, payload FROM feature_rows WHERE ticker IN ({marks}) AND stored_at >= ?"
+                       + (" AND as_of = ?" if as_of else "") + " ORDER BY as_of")
+                params: List[Any] = [*chunk, since] + ([as_of] if as_of else [])
+                for ticker, payload in con.execute(sql, params).fetchall():
+                    found[ticker] = json.loads(payload)  # ORDER BY as_of -> האחרונה גוברת
+        with self._lock:
+            self.hits += len(found)
+        return found
+
+    def dates(self) -> List[str]:
+        with self._conn() as con:
+            return [d for (d,) in con.execute("SELECT DISTINCT as_of FROM feature_rows ORDER BY as_of").fetchall()]
+
+    def stats(self) -> dict:
+        with self._conn() as con:
+            n, tickers = con.execute("SELECT COUNT(*), COUNT(DISTINCT ticker) FROM feature_rows").fetchone()
+        with self._lock:
+            return {"db": self.db_path, "rows": n, "tickers": tickers, "hits": self.hits, "writes": self.writes}
+
+
+_default_store: Optional[FeatureRowStore] = None
+_default_guard = threading.Lock()
+
+def default_feature_rows() -> Optional[FeatureRowStore]:
+    """Store אחד לתהליך (None אם FEATURE_ROWS_DB ריק)."""
+    global _default_store
+    if not FEATURE_ROWS_DB:
+        return None
+    with _default_guard:
+        if _default_store is None:
+            _default_store = FeatureRowStore()
+        return _default_store
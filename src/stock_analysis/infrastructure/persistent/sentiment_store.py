@@ -0,0 +1,120 @@
+# src/stock_analysis/infrastructure/persistent/sentiment_store.py
+from __future__ import annotations
+import hashlib, os, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+# ===== הגדרות (ENV) =====
+SENTIMENT_STORE_DB = os.getenv("SENTIMENT_STORE_DB", "data/sentiment.db")   # ריק = בלי שמירה
+SENTIMENT_STORE_MEMO_MAX = int(os.getenv("SENTIMENT_STORE_MEMO_MAX", "200000"))
+
+_SQLITE_MAX_VARS = 900  # מתחת למגבלת הפרמטרים של SQLite לשאילתה
+
+
+def article_key(article: Mapping[str, Any], text: str) -> str:
+    """מזהה כתבה: ה-id של Finnhub אם קיים (אותה כתבה חוזרת לכל טיקר שהיא מזכירה), אחרת hash של הטקסט."""
+    art_id = article.get("id")
+    if art_id not in (None, "", 0):
+        return f"id:{art_id}"
+    return "sha1:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ArticleSentimentStore:
+    """
+    ציון סנטימנט לכל כתבה, לפי (engine, article_key), ב-SQLite + memo בזיכרון.
+    ציון תלוי במנוע (hf / vader / rule) – לכן המנוע חלק מהמפתח.
+    """
+
+    def __init__(self, db_path: str = SENTIMENT_STORE_DB, memo_max: int = SENTIMENT_STORE_MEMO_MAX) -> None:
+        self.db_path = db_path
+        self.memo_max = memo_max
+        self._lock = threading.Lock()
+        self._memo: Dict[Tuple[str, str], float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._ensure_schema()
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _ensure_schema(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("""
+            CREATE TABLE IF NOT EXISTS article_sentiment (
+                engine TEXT NOT NULL, article_key TEXT NOT NULL,
+                score REAL NOT NULL, stored_at REAL NOT NULL,
+                PRIMARY KEY (engine, article_key)
+            )
+            """)
+            con.commit()
+
+    def _remember(self, engine: str, scores: Mapping[str, float]) -> None:
+        with self._lock:
+            if len(self._memo) + len(scores) > self.memo_max:
+                self._memo.clear()  # פשוט וזול: ה-DB נשאר מקור האמת
+            for k, v in scores.items():
+                self._memo[(engine, k)] = v
+
+    def get_many(self, engine: str, keys: Sequence[str]) -> Dict[str, float]:
+        """ציונים שמורים למפתחות שנמצאו; מפתחות חסרים פשוט לא מופיעים בתוצאה."""
+        found: Dict[str, float] = {}
+        with self._lock:
+            for k in keys:
+                v = self._memo.get((engine, k))
+                if v is not None:
+                    found[k] = v
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        from_db: Dict[str, float] = {}
+        if missing:
+            with self._conn() as con:
+                for i in range(0, len(missing), _SQLITE_MAX_VARS):
+                    chunk = missing[i:i + _SQLITE_MAX_VARS]
+                    marks = ",".join("?" * len(chunk))
+                    rows = con.execute(
+                        f"SELECT article_key, score FROM article_sentiment WHERE engine=? AND article_key IN ({marks})",
+                        (engine, *chunk)).fetchall()
+                    from_db.update({k: float(s) for k, s in rows})
+            if from_db:
+                self._remember(engine, from_db)
+        found.update(from_db)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, engine: str, scores: Mapping[str, float]) -> None:
+        if not scores:
+            return
+        now = time.time()
+        with self._conn() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO article_sentiment(engine,article_key,score,stored_at) VALUES(?,?,?,?)",
+                [(engine, k, float(v), now) for k, v in scores.items()])
+            con.commit()
+        self._remember(engine, scores)
+        with self._lock:
+            self.writes += len(scores)
+
+    def stats(self) -> dict:
+        with self._conn() as con:
+            rows = con.execute("SELECT engine, COUNT(*) FROM article_sentiment GROUP BY engine").fetchall()
+        with self._lock:
+            return {"db": self.db_path, "memo": len(self._memo), "hits": self.hits,
+                    "misses": self.misses, "writes": self.writes, "articles": dict(rows)}
+
+
+_default_store: Optional[ArticleSentimentStore] = None
+_default_guard = threading.Lock()
+
+def default_sentiment_store() -> Optional[ArticleSentimentStore]:
+    """Store אחד לתהליך – כל מופעי FinnhubNewsAnalyzer חולקים אותו (None אם SENTIMENT_STORE_DB ריק)."""
+    global _default_store
+    if not SENTIMENT_STORE_DB:
+        return None
+    with _default_guard:
+        if _default_store is None:
+            _default_store = ArticleSentimentStore()
+        return _default_store
@@ -0,0 +1,157 @@
+from __future__ import annotations
+import asyncio, json, os, pickle, sqlite3, threading, time, zlib
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# ===== מצב הקלטה/ניגון דרך ENV =====
+RECORD_PATH = os.getenv("STOCK_ANALYSIS_RECORD", "")          # נתיב archive להקלטה
+REPLAY_PATH = os.getenv("STOCK_ANALYSIS_REPLAY", "")          # נתיב archive לניגון
+REPLAY_LATENCY = os.getenv("STOCK_ANALYSIS_REPLAY_LATENCY", "false").lower() == "true"
+
+
+class ReplayMiss(LookupError):
+    """אין תשובה מוקלטת לקריאה הזו."""
+
+
+def make_key(*args: Any, **kwargs: Any) -> str:
+    # מפתח יציב וקריא: ארגומנטים + kwargs ממוינים
+    return json.dumps([list(args), sorted(kwargs.items())], default=str, separators=(",", ":"))
+
+
+class ResponseArchive:
+    """
+    Archive מקומי (SQLite) לתשובות של שירותים חיצוניים: pickle דחוס ב-zlib + latency מקורי.
+    אותו מפתח יכול להיות מוקלט כמה פעמים (למשל polls של feed) – seq שומר את הסדר,
+    וה-replay מגיש אותן לפי הסדר ונשאר על האחרונה.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._cursor: Dict[Tuple[str, str], int] = {}
+        self._ensure_schema()
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _ensure_schema(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as con:
+            con.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                ns TEXT, key TEXT, seq INTEGER,
+                payload BLOB, is_error INTEGER, latency REAL, recorded_at REAL,
+                PRIMARY KEY (ns, key, seq)
+            )
+            """)
+            con.commit()
+
+    def put(self, ns: str, key: str, value: Any, latency: float, is_error: bool = False) -> None:
+        try:
+            raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            if not is_error:
+                raise
+            # חריגות עם שדות שלא ניתנים ל-pickle (sessions וכו') – שומרים רק את ההודעה
+            raw = pickle.dumps(RuntimeError(f"{type(value).__name__}: {value}"))
+        blob = zlib.compress(raw, 6)
+        with self._lock, self._conn() as con:
+            row = con.execute("SELECT COALESCE(MAX(seq), -1) FROM responses WHERE ns=? AND key=?", (ns, key)).fetchone()
+            con.execute(
+                "INSERT INTO responses(ns,key,seq,payload,is_error,latency,recorded_at) VALUES(?,?,?,?,?,?,?)",
+                (ns, key, int(row[0]) + 1, sqlite3.Binary(blob), 1 if is_error else 0, float(latency), time.time()),
+            )
+            con.commit()
+
+    def get(self, ns: str, key: str) -> Tuple[Any, float, bool]:
+        """(value, latency, is_error) של ההקלטה הבאה למפתח; ReplayMiss אם אין."""
+        with self._lock:
+            seq = self._cursor.get((ns, key), 0)
+            with self._conn() as con:
+                row = con.execute(
+                    "SELECT payload, latency, is_error, seq FROM responses WHERE ns=? AND key=? AND seq<=? "
+                    "ORDER BY seq DESC LIMIT 1", (ns, key, seq),
+                ).fetchone()
+            if row is None:
+                raise ReplayMiss(f"{ns} {key}")
+            self._cursor[(ns, key)] = seq + 1
+        return pickle.loads(zlib.decompress(row[0])), float(row[1] or 0.0), bool(row[2])
+
+    def stats(self) -> dict:
+        with self._conn() as con:
+            rows = con.execute(
+                "SELECT ns, COUNT(*), SUM(LENGTH(payload)), SUM(latency) FROM responses GROUP BY ns"
+            ).fetchall()
+        return {ns: {"responses": n, "bytes": int(b or 0), "recorded_latency_sec": round(lat or 0.0, 2)}
+                for ns, n, b, lat in rows}
+
+
+class Recorder:
+    """מריץ את הקריאה האמיתית ושומר את התוצאה (או החריגה) ב-archive."""
+
+    def __init__(self, archive: ResponseArchive) -> None:
+        self.archive = archive
+
+    def __call__(self, ns: str, key: str, fn: Callable[[], Any]) -> Any:
+        t0 = time.perf_counter()
+        try:
+            value = fn()
+        except Exception as e:
+            self.archive.put(ns, key, e, time.perf_counter() - t0, is_error=True)
+            raise
+        self.archive.put(ns, key, value, time.perf_counter() - t0)
+        return value
+
+    async def acall(self, ns: str, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        t0 = time.perf_counter()
+        try:
+            value = await fn()
+        except Exception as e:
+            self.archive.put(ns, key, e, time.perf_counter() - t0, is_error=True)
+            raise
+        self.archive.put(ns, key, value, time.perf_counter() - t0)
+        return value
+
+
+class Replayer:
+    """מגיש תשובות מה-archive בלי רשת; with_latency=True משחזר גם את זמני התגובה המקוריים."""
+
+    def __init__(self, archive: ResponseArchive, with_latency: bool = False) -> None:
+        self.archive = archive
+        self.with_latency = with_latency
+
+    def __call__(self, ns: str, key: str, fn: Optional[Callable[[], Any]] = None) -> Any:
+        value, latency, is_error = self.archive.get(ns, key)
+        if self.with_latency and latency > 0:
+            time.sleep(latency)
+        if is_error:
+            raise value
+        return value
+
+    async def acall(self, ns: str, key: str, fn: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        value, latency, is_error = self.archive.get(ns, key)
+        if self.with_latency and latency > 0:
+            await asyncio.sleep(latency)
+        if is_error:
+            raise value
+        return value
+
+
+_archives: Dict[str, ResponseArchive] = {}
+_archives_guard = threading.Lock()
+
+def recording_from_env() -> Optional[Recorder | Replayer]:
+    """
+    STOCK_ANALYSIS_REPLAY=path -> Replayer (עדיפות), STOCK_ANALYSIS_RECORD=path -> Recorder, אחרת None.
+    archive אחד לכל נתיב בתהליך, כך שכל העטיפות כותבות/קוראות מאותו מקום.
+    """
+    path = REPLAY_PATH or RECORD_PATH
+    if not path:
+        return None
+    with _archives_guard:
+        archive = _archives.get(path)
+        if archive is None:
+            archive = _archives[path] = ResponseArchive(path)
+    if REPLAY_PATH:
+        return Replayer(archive, with_latency=REPLAY_LATENCY)
+    return Recorder(archive)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+import pandas as pd
+
+from stock_analysis.domain.interfaces import CompetitorClient, HoldersProvider, WikipediaClient
+from stock_analysis.domain.ports import MarketDataFeed
+from stock_analysis.infrastructure.recording.archive import ReplayMiss, Replayer, make_key, recording_from_env
+
+# call = Recorder (קריאה אמיתית + שמירה) או Replayer (מה-archive בלי רשת) – אותה עטיפה לשני המצבים
+Call = Callable[..., Any]
+
+
+class RecordedDataProvider:
+    """עוטף DataProvider: כל info/history/history_many/last_price עובר דרך ה-archive."""
+
+    def __init__(self, inner, call: Call) -> None:
+        self.inner = inner
+        self.call = call
+
+    def __getattr__(self, name: str) -> Any:
+        # שדות של ה-provider הפנימי (bar_store, metadata...) נשארים נגישים
+        return getattr(self.inner, name)
+
+    def info(self, symbol: str) -> Mapping[str, Any]:
+        return self.call("info", make_key(symbol.upper()), lambda: self.inner.info(symbol))
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        return self.call("history", make_key(symbol.upper(), period, interval),
+                         lambda: self.inner.history(symbol, period=period, interval=interval))
+
+    def history_many(self, symbols: Sequence[str], period: str = "1y",
+                     interval: str = "1d") -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+        wanted = sorted({s.upper() for s in symbols if s})
+        key = make_key(wanted, period, interval)
+        try:
+            return self.call("history_many", key,
+                             lambda: self.inner.history_many(symbols, period=period, interval=interval))
+        except ReplayMiss:
+            if not isinstance(self.call, Replayer):
+                raise
+        # ניגון של universe אחר: מרכיבים מהקלטות history בודדות
+        frames: Dict[str, pd.DataFrame] = {}
+        for sym in wanted:
+            try:
+                df = self.history(sym, period=period, interval=interval)
+            except Exception:
+                continue
+            if df is not None and not df.empty:
+                frames[sym] = df
+        return frames, [s for s in wanted if s not in frames]
+
+    def last_price(self, symbol: str) -> float | None:
+        return self.call("last_price", make_key(symbol.upper()), lambda: self.inner.last_price(symbol))
+
+
+class RecordedFeed(MarketDataFeed):
+    """עוטף MarketDataFeed (5m): כל poll נשמר, וה-replay מגיש אותם לפי הסדר."""
+
+    def __init__(self, inner: MarketDataFeed | None, call: Call) -> None:
+        self.inner = inner
+        self.call = call
+
+    async def get_5m_history(self, ticker: str, days: int = 10) -> pd.DataFrame:
+        key = make_key((ticker or "").strip().upper(), int(days))
+        return await self.call.acall("5m", key, lambda: self.inner.get_5m_history(ticker, days=days))
+
+
+def feed_from_env(feed: MarketDataFeed) -> MarketDataFeed:
+    """עוטף feed לפי STOCK_ANALYSIS_RECORD / STOCK_ANALYSIS_REPLAY; אחרת מחזיר אותו כמו שהוא."""
+    call = recording_from_env()
+    return RecordedFeed(feed, call) if call is not None else feed
+
+
+class RecordedWikipediaClient(WikipediaClient):
+    def __init__(self, inner: WikipediaClient, call: Call) -> None:
+        self.inner = inner
+        self.call = call
+
+    def page_summary(self, title: str) -> Mapping[str, Any] | None:
+        return self.call("wiki", make_key(title), lambda: self.inner.page_summary(title))
+
+
+class RecordedCompetitorClient(CompetitorClient):
+    def __init__(self, inner: CompetitorClient, call: Call) -> None:
+        self.inner = inner
+        self.call = call
+
+    def similar_symbols(self, symbol: str) -> list[str]:
+        return self.call("tipranks", make_key(symbol.upper()), lambda: self.inner.similar_symbols(symbol))
+
+
+class RecordedHoldersProvider(HoldersProvider):
+    def __init__(self, inner: HoldersProvider, call: Call) -> None:
+        self.inner = inner
+        self.call = call
+
+    def top_institutional_holders(self, symbol: str, top_n: int = 5) -> list[str]:
+        return self.call("holders", make_key(symbol.upper(), int(top_n)),
+                         lambda: self.inner.top_institutional_holders(symbol, top_n=top_n))
+
+
+def record_news(analyzer, call: Call):
+    """
+    מחליף את fetch_news של המופע (לא של המחלקה), כך שגם run_full_analysis –
+    שקורא ל-self.fetch_news – עובר דרך ה-archive. הסנטימנט עצמו מחושב מקומית כרגיל.
+    """
+    original = analyzer.fetch_news
+
+    def fetch_news(symbol: str, days_back: int = 7):
+        return call("news", make_key((symbol or "").upper().strip(), int(days_back)),
+                    lambda: original(symbol, days_back))
+
+    analyzer.fetch_news = fetch_news
+    return analyzer
@@ -1,28 +1,181 @@
 # src/stock_analysis/infrastructure/utils/rate_limit.py
-import time, random
+from __future__ import annotations
+import os, time, random, threading
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# ===== הגדרות Governor (ENV) =====
+YF_RATE_PER_MIN     = float(os.getenv("YF_RATE_PER_MIN", "90"))       # קצב התחלתי
+YF_RATE_MIN_PER_MIN = float(os.getenv("YF_RATE_MIN_PER_MIN", "20"))   # רצפה אחרי throttling
+YF_RATE_MAX_PER_MIN = float(os.getenv("YF_RATE_MAX_PER_MIN", "600"))  # תקרה לעלייה הדרגתית
+YF_LATENCY_TARGET   = float(os.getenv("YF_LATENCY_TARGET", "4.0"))    # שניות; מעל זה = עומס
+YF_BURST            = float(os.getenv("YF_BURST", "10"))              # כמה בקשות מותר לשלוח ברצף, בלי קשר לקצב
+
 
 class RateLimiter:
     """
-    לא יותר מ-rate_per_minute בקשות לדקה, refill רציף.
+    לא יותר מ-rate_per_minute בקשות לדקה, refill רציף. בטוח ל-Threadים.
+    burst (גודל הדלי) נפרד מהקצב: קצב גבוה לא מתיר פרץ של מאות בקשות בבת אחת.
     שימוש:
       limiter = RateLimiter(90)
       limiter.acquire() לפני כל קריאה ל-yfinance
     """
-    def __init__(self, rate_per_minute: int = 60):
-        self.capacity = int(rate_per_minute)
-        self.tokens = float(rate_per_minute)
+    def __init__(self, rate_per_minute: float = 60, burst: Optional[float] = None):
+        self.lock = threading.Lock()
+        self.capacity = float(burst if burst is not None else rate_per_minute)
+        self.tokens = self.capacity
         self.rate_per_sec = float(rate_per_minute) / 60.0
         self.last = time.time()
 
-    def acquire(self):
-        now = time.time()
-        delta = now - self.last
-        self.tokens = min(self.capacity, self.tokens + delta * self.rate_per_sec)
+    def set_rate(self, rate_per_minute: float) -> None:
+        with self.lock:
+            self._refill(time.time())
+            self.rate_per_sec = float(rate_per_minute) / 60.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate_per_sec)
         self.last = now
-        if self.tokens < 1.0:
-            wait = (1.0 - self.tokens) / self.rate_per_sec
-            time.sleep(wait + random.uniform(0, 0.25))  # jitter
-            self.tokens = 0.0
-            self.last = time.time()
-        else:
-            self.tokens -= 1.0
+
+    def acquire(self, n: int = 1) -> float:
+        """
+        ממתין ל-n טוקנים; מחזיר כמה שניות חיכינו בסך הכול.
+        n גדול מהדלי (מנת yf.download): מחכים לדלי מלא ונכנסים ל"חוב" – הבאים בתור מחכים שיוחזר.
+        """
+        need = min(float(n), self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill(time.time())
+                if self.tokens >= need:
+                    self.tokens -= float(n)
+                    return waited
+                needed = (need - self.tokens) / self.rate_per_sec
+            # מחוץ לנעילה, עם jitter
+            sleep = needed + random.uniform(0, 0.25)
+            time.sleep(sleep)
+            waited += sleep
+
+
+def is_throttle_message(msg: str) -> bool:
+    """טקסט שגיאה (למשל מ-yf.shared._ERRORS) שמעיד על 429 / YFRateLimitError."""
+    msg = (msg or "").lower()
+    return "ratelimit" in msg or "too many requests" in msg or "429" in msg or "rate limit" in msg
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """429 / YFRateLimitError / 'Too Many Requests' – סימן שהשרת מגביל אותנו."""
+    return "ratelimit" in type(exc).__name__.lower() or is_throttle_message(str(exc))
+
+
+class RateGovernor:
+    """
+    מושל קצב יחיד לכל הקריאות ל-Yahoo (AIMD):
+    הצלחות מעלות את הקצב לכל היותר ב-increase_per_min לדקה (לפי זמן, לא לפי מספר קריאות);
+    throttling מוריד אותו בחצי; latency גבוה מוריד מעט.
+    acquire(n) לפני כל קריאה (n = מספר הבקשות שהיא שולחת), report() אחריה – או call(fn) שעושה את שניהם.
+    """
+
+    def __init__(self, rate_per_min: float = YF_RATE_PER_MIN, min_rate: float = YF_RATE_MIN_PER_MIN,
+                 max_rate: float = YF_RATE_MAX_PER_MIN, latency_target: float = YF_LATENCY_TARGET,
+                 increase_per_min: float = 1.0, decrease_factor: float = 0.5,
+                 latency_factor: float = 0.9, cooldown_sec: float = 5.0, burst: float = YF_BURST) -> None:
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max(max_rate, min_rate))
+        self.rate = float(min(max(rate_per_min, self.min_rate), self.max_rate))
+        self.latency_target = latency_target
+        self.increase_per_min = increase_per_min
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.cooldown_sec = cooldown_sec
+        self._bucket = RateLimiter(self.rate, burst=max(1.0, float(burst)))
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        self._last_increase = time.time()
+        self._waiting = 0
+        self.calls = 0
+        self.errors = 0
+        self.throttle_events = 0
+        self.total_wait = 0.0
+        self._latency_ewma: Optional[float] = None
+
+    def acquire(self, n: int = 1) -> None:
+        with self._lock:
+            self._waiting += 1
+        try:
+            waited = self._bucket.acquire(n)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                self.calls += n
+        if waited:
+            with self._lock:
+                self.total_wait += waited
+
+    def _decrease(self, factor: float, now: float) -> None:
+        # ירידה אחת לכל cooldown – גל שגיאות מאותו פרץ לא ימוטט את הקצב לרצפה
+        if now - self._last_decrease < self.cooldown_sec:
+            return
+        self._last_decrease = self._last_increase = now
+        self.rate = max(self.min_rate, self.rate * factor)
+        self._bucket.set_rate(self.rate)
+
+    def report(self, ok: bool, latency: float | None = None, throttled: bool = False) -> None:
+        now = time.time()
+        with self._lock:
+            if latency is not None:
+                self._latency_ewma = latency if self._latency_ewma is None else (
+                    0.8 * self._latency_ewma + 0.2 * latency
+                )
+            if throttled:
+                self.throttle_events += 1
+                self.errors += 1
+                self._decrease(self.decrease_factor, now)
+            elif not ok:
+                self.errors += 1
+            elif latency is not None and latency > self.latency_target:
+                self._decrease(self.latency_factor, now)
+            elif self.rate < self.max_rate:
+                # תוספת יחסית לזמן מאז ההעלאה הקודמת (עד דקה) – פרץ הצלחות לא מקפיץ את הקצב לתקרה
+                elapsed = min(60.0, now - self._last_increase)
+                self._last_increase = now
+                self.rate = min(self.max_rate, self.rate + self.increase_per_min * elapsed / 60.0)
+                self._bucket.set_rate(self.rate)
+            else:
+                self._last_increase = now
+
+    def call(self, fn: Callable[[], T], n: int = 1) -> T:
+        """acquire(n) -> fn() -> report; חריגות עוברות הלאה לקורא."""
+        self.acquire(n)
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self.report(False, time.perf_counter() - t0, throttled=is_throttle_error(e))
+            raise
+        self.report(True, time.perf_counter() - t0)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate_per_min": round(self.rate, 2),
+                "queue_depth": self._waiting,
+                "throttle_events": self.throttle_events,
+                "calls": self.calls,
+                "errors": self.errors,
+                "total_wait_sec": round(self.total_wait, 2),
+                "latency_ewma_sec": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+            }
+
+
+_default_governor: Optional[RateGovernor] = None
+_default_guard = threading.Lock()
+
+def default_governor() -> RateGovernor:
+    """Governor יחיד לכל התהליך – Provider, Feed, S&P500 ו-Holders חולקים אותו קצב."""
+    global _default_governor
+    with _default_guard:
+        if _default_governor is None:
+            _default_governor = RateGovernor()
+        return _default_governor
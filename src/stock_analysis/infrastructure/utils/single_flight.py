@@ -0,0 +1,86 @@
+# src/stock_analysis/infrastructure/utils/single_flight.py
+from __future__ import annotations
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _private_copy(value: Any) -> Any:
+    # הממתינים מקבלים עותק כדי שלא ישנו בטעות את האובייקט של הקורא הראשון
+    if hasattr(value, "copy"):
+        try:
+            return value.copy()
+        except Exception:
+            return value
+    return value
+
+
+class SingleFlight:
+    """
+    איחוד קריאות זהות שרצות במקביל (single-flight):
+    הקורא הראשון למפתח מבצע את הבקשה; קוראים נוספים עם אותו מפתח ממתינים לתוצאה שלו.
+    מפתח הוא tuple שהאיבר הראשון בו הוא namespace (למשל "history") – לסטטיסטיקה.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, _Call] = {}
+        self._executed: Counter = Counter()
+        self._coalesced: Counter = Counter()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        ns = key[0] if isinstance(key, tuple) and key else "default"
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+                self._executed[ns] += 1
+            else:
+                self._coalesced[ns] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return _private_copy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = sorted(set(self._executed) | set(self._coalesced))
+            return {
+                "executed": sum(self._executed.values()),
+                "coalesced": sum(self._coalesced.values()),
+                "in_flight": len(self._inflight),
+                "by_namespace": {
+                    ns: {"executed": self._executed[ns], "coalesced": self._coalesced[ns]}
+                    for ns in namespaces
+                },
+            }
+
+
+# מופע יחיד לכל התהליך: ה-Scanner, Streamlit וה-API חולקים אותו
+default_flight = SingleFlight()
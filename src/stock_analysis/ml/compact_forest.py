@@ -0,0 +1,179 @@
+# src/stock_analysis/ml/compact_forest.py
+# יער (RandomForestClassifier) שטוח במערכי NumPy רציפים + evaluator וקטורי שנותן אותן הסתברויות בדיוק.
+# חיזוי של שורה אחת ב-sklearn משלם על validation ו-joblib לכל קריאה; כאן זה כמה פעולות numpy לכל עומק.
+from __future__ import annotations
+import json, os, threading, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# מערכים לכל הצמתים של כל העצים (מזהה צומת גלובלי = offset של העץ + מזהה מקומי).
+# children שטוח: [2*i] = ימין, [2*i+1] = שמאל -> הצומת הבא הוא children[2*i + go_left], gather אחד לרמה.
+_ARRAYS = ("feature", "threshold", "children", "missing_left", "value", "roots")
+
+
+def compact_dir(artifacts_dir: str | Path, period: str) -> Path:
+    return Path(artifacts_dir) / f"forest_{period}"
+
+
+def file_signature(path: str | Path) -> Optional[List[int]]:
+    """(mtime_ns, size) של קובץ המודל – הייצוא תקף רק ל-pickle שממנו נוצר."""
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class CompactForest:
+    """
+    predict_proba זהה ל-RandomForestClassifier.predict_proba (X מומר ל-float32 כמו ב-sklearn,
+    השוואה מול threshold ב-float64, NaN לפי missing_go_to_left, סכימה סדרתית לפי סדר העצים).
+    נטען עם np.load(mmap_mode="r") – אין unpickle, והדפים משותפים בין תהליכים.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+        self.arrays = arrays
+        self.meta = meta
+        self.feature_names: List[str] = list(meta["feature_names"])
+        self.classes_ = np.asarray(meta["classes"])
+        self.n_estimators = int(meta["n_trees"])
+        self.max_depth = int(meta["max_depth"])
+        self._feature = arrays["feature"]
+        self._threshold = arrays["threshold"]
+        self._children = arrays["children"]
+        self._missing_left = arrays["missing_left"]
+        self._value = arrays["value"]
+        self._roots = arrays["roots"]
+
+    @classmethod
+    def open(cls, path: str | Path, mmap: bool = True) -> "CompactForest":
+        base = Path(path)
+        meta = json.loads((base / "meta.json").read_text(encoding="utf-8"))
+        version = meta["version"]
+        arrays = {k: np.load(base / f"{k}.{version}.npy", mmap_mode="r" if mmap else None) for k in _ARRAYS}
+        return cls(arrays, meta)
+
+    @staticmethod
+    def exists(path: str | Path) -> bool:
+        return (Path(path) / "meta.json").exists()
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(a.nbytes for a in self.arrays.values()))
+
+    def _matrix(self, X: Any) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names].to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(f"X has {X.shape[1]} features, forest expects {len(self.feature_names)}")
+        return X
+
+    def apply(self, X: Any) -> np.ndarray:
+        """מזהה העלה (גלובלי) לכל שורה ולכל עץ: (n_rows, n_trees). כל העצים מתקדמים יחד, רמה אחרי רמה."""
+        X = self._matrix(X)
+        n, k = X.shape
+        flat = np.ascontiguousarray(X).ravel()
+        base = (np.arange(n, dtype=np.intp) * k)[:, None]
+        node = np.repeat(np.asarray(self._roots)[None, :], n, axis=0)
+        has_nan = bool(np.isnan(flat).any())
+        for _ in range(self.max_depth):
+            x = flat.take(base + self._feature.take(node))
+            go_left = x <= self._threshold.take(node)
+            if has_nan:
+                go_left = np.where(np.isnan(x), self._missing_left.take(node), go_left)
+            node = self._children.take(node * 2 + go_left)  # עלה מצביע על עצמו
+        return node
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        leaves = self.apply(X)
+        per_tree = self._value.take(leaves, axis=0)  # (n_rows, n_trees, n_classes)
+        # cumsum סדרתי = אותו סדר חיבור כמו all_proba += proba ב-sklearn (sum של numpy הוא pairwise)
+        return np.cumsum(per_tree, axis=1)[:, -1, :] / self.n_estimators
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def flatten_forest(model: Any) -> Tuple[Dict[str, np.ndarray], int]:
+    """מערכים רציפים מכל estimators_ של היער + העומק המקסימלי."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be exported")
+    n_classes = int(model.n_classes_)
+    parts: Dict[str, List[np.ndarray]] = {k: [] for k in _ARRAYS if k != "roots"}
+    roots: List[int] = []
+    offset, depth = 0, 0
+    for est in model.estimators_:
+        t = est.tree_
+        n = int(t.node_count)
+        ids = np.arange(n, dtype=np.int64)
+        leaf = t.children_left[:n] == -1
+        parts["feature"].append(np.where(leaf, 0, t.feature[:n]).astype(np.int32))
+        parts["threshold"].append(np.where(leaf, 0.0, t.threshold[:n]).astype(np.float64))
+        right = np.where(leaf, ids, t.children_right[:n]) + offset
+        left = np.where(leaf, ids, t.children_left[:n]) + offset
+        parts["children"].append(np.stack([right, left], axis=1).ravel().astype(np.int32))
+        missing = getattr(t, "missing_go_to_left", None)
+        parts["missing_left"].append(np.asarray(missing[:n], dtype=bool) if missing is not None
+                                     else np.zeros(n, dtype=bool))
+        parts["value"].append(np.asarray(t.value[:n, 0, :n_classes], dtype=np.float64))
+        roots.append(offset)
+        offset += n
+        depth = max(depth, int(t.max_depth))
+    arrays = {k: np.ascontiguousarray(np.concatenate(v)) if v else np.empty(0) for k, v in parts.items()}
+    if not roots:
+        arrays["value"] = np.empty((0, n_classes))
+    arrays["roots"] = np.asarray(roots, dtype=np.int32)
+    return arrays, depth
+
+
+_export_lock = threading.Lock()
+
+def export_forest(model: Any, feature_names: Sequence[str], out_dir: str | Path,
+                  source: Optional[str | Path] = None) -> CompactForest:
+    """
+    כותב גרסה חדשה של המערכים ואז מחליף את meta.json אטומית (כמו UniverseCube):
+    קורא שפתח את הגרסה הקודמת ממשיך איתה. source: קובץ ה-pickle – החתימה שלו נשמרת ב-meta.
+    """
+    arrays, depth = flatten_forest(model)
+    base = Path(out_dir)
+    base.mkdir(parents=True, exist_ok=True)
+    version = f"{time.time_ns()}_{os.getpid()}"
+    with _export_lock:
+        for k, a in arrays.items():
+            np.save(base / f"{k}.{version}.npy", a)
+        meta = {
+            "version": version, "feature_names": list(map(str, feature_names)),
+            "classes": np.asarray(model.classes_).tolist(), "n_trees": len(arrays["roots"]),
+            "n_nodes": int(len(arrays["feature"])), "max_depth": depth,
+            "source": str(source) if source is not None else None,
+            "source_signature": file_signature(source) if source is not None else None,
+            "exported_at": time.time(),
+        }
+        tmp = base / f"meta.json.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, base / "meta.json")
+        for p in base.glob("*.npy"):
+            if version not in p.name:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+    return CompactForest.open(base)
+
+
+def open_matching(model_path: str | Path, out_dir: str | Path) -> Optional[CompactForest]:
+    """הייצוא רק אם נוצר מאותו קובץ מודל (mtime/size); אחרת None – ה-registry נופל ל-pickle."""
+    base = Path(out_dir)
+    if not CompactForest.exists(base):
+        return None
+    forest = CompactForest.open(base)
+    sig = file_signature(model_path)
+    if sig is None or forest.meta.get("source_signature") != sig:
+        return None
+    return forest
@@ -1,34 +1,56 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Iterable, Optional, List, Dict
+from typing import Iterable, Mapping, Any, Optional, List, Dict
 
 import pandas as pd
 
 # Clean-arch: עובדים מול DataProvider, ברירת מחדל YFinance
 from stock_analysis.domain.interfaces import DataProvider
 from stock_analysis.infrastructure.data_providers.yfinance_provider import YFinanceProvider
+from stock_analysis.infrastructure.data.bar_store import default_bar_store, period_window
+from stock_analysis.infrastructure.persistent.feature_rows import (
+    FEATURE_ROWS_MAX_AGE_SEC, FeatureRowStore, default_feature_rows,
+)
 
-# שכבת התאימות – שומר על אותה לוגיקה של חישובי אינדיקטורים
-from stock_utils import compute_rsi, compute_macd, analyze_volume
+from stock_analysis.features.pipeline import Pipeline
+from stock_analysis.features.cache import FeatureCache, default_feature_cache
+from stock_analysis.features.daily import default_daily_pipeline
+from stock_analysis.features.sma import last_sma
+
+
+def _as_of(hist: pd.DataFrame) -> str:
+    """תאריך הנר האחרון – מפתח השורה ב-FeatureRowStore."""
+    return pd.Timestamp(hist.index[-1]).strftime("%Y-%m-%d")
 
 
 @dataclass
 class FeatureExtractor:
-    data_provider: DataProvider = YFinanceProvider()
-
-    def extract(self, ticker: str) -> Optional[Dict]:
+    # נרות דרך מאגר הנרות: הורדה מרוכזת פעם אחת, ואז רק זנב חסר
+    data_provider: DataProvider = field(default_factory=lambda: YFinanceProvider(bar_store=default_bar_store()))
+    # אותו Pipeline ואותו cache כמו ה-Screener: RSI/MACD/SMA/Volume לא מחושבים פעמיים לאותם נרות
+    pipeline: Pipeline = field(default_factory=default_daily_pipeline)
+    features: FeatureCache = field(default_factory=default_feature_cache)
+    # שורות שחולצו לפי (ticker, as_of) – אימון חוזר נבנה מכאן בלי רשת
+    rows: Optional[FeatureRowStore] = field(default_factory=default_feature_rows)
+
+    def extract(self, ticker: str, hist: Optional[pd.DataFrame] = None,
+                info: Optional[Mapping[str, Any]] = None) -> Optional[Dict]:
         """
         ממיר את ML/feature_extractor.extract_features הישן למחלקה מודולרית.
         מחזיר dict עם אותם מפתחות בדיוק.
+        הורדת היסטוריה אחת (1y); חלונות 2d ו-1mo נחתכים ממנה כמו ש-yfinance היה מחזיר.
+        hist/info יכולים להגיע מבחוץ (batch עם history_many).
         """
         try:
-            info = self.data_provider.info(ticker)
+            if info is None:
+                info = self.data_provider.info(ticker)
 
-            # Daily frames לפי התקופה
-            hist_1d  = self.data_provider.history(ticker, period="2d",  interval="1d")
-            hist_1mo = self.data_provider.history(ticker, period="1mo", interval="1d")
-            hist_1y  = self.data_provider.history(ticker, period="1y",  interval="1d")
+            if hist is None:
+                hist = self.data_provider.history(ticker, period="1y", interval="1d")
+            hist_1y = period_window(hist, "1y")
+            hist_1d = period_window(hist_1y, "2d")
+            hist_1mo = period_window(hist_1y, "1mo")
 
             if hist_1y.empty or len(hist_1y) < 200:
                 return None
@@ -38,12 +60,13 @@ class FeatureExtractor:
                 return None
 
             # ממוצעים נעים + אינדיקטורים (לפי הלוגיקה שלך)
-            ma20  = hist_1y["Close"].rolling(window=20).mean().iloc[-1]
-            ma50  = hist_1y["Close"].rolling(window=50).mean().iloc[-1]
-            ma200 = hist_1y["Close"].rolling(window=200).mean().iloc[-1]
-            rsi   = compute_rsi(hist_1y["Close"])
-            macd  = compute_macd(hist_1y["Close"])
-            volume_ratio, _ = analyze_volume(hist_1y)
+            feats = self.features.run(ticker, hist_1y, self.pipeline)
+            ma20  = last_sma(feats, 20)
+            ma50  = last_sma(feats, 50)
+            ma200 = last_sma(feats, 200)
+            rsi   = float(feats["RSI"].iloc[-1])
+            macd  = float(feats["MACD Value"].iloc[-1])
+            volume_ratio = float(feats["Volume Ratio"].iloc[-1])
 
             # Success labels
             success_1d = 0
@@ -92,11 +115,46 @@ class FeatureExtractor:
             print(f"❌ Error in {ticker}: {e}")
             return None
 
-    def batch(self, symbols: Iterable[str], max_threads: int = 5) -> pd.DataFrame:
-        print(f"🚀 Extracting features for {len(list(symbols))} symbols...")
-        results: List[Dict] = []
-        with ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = {executor.submit(self.extract, sym): sym for sym in symbols}
+    def _extract_and_store(self, ticker: str, hist: Optional[pd.DataFrame]) -> Optional[Dict]:
+        if hist is None:
+            try:
+                hist = self.data_provider.history(ticker, period="1y", interval="1d")
+            except Exception as e:
+                print(f"❌ Error in {ticker}: {e}")
+                return None
+        row = self.extract(ticker, hist=hist)
+        if row is not None and self.rows is not None and not hist.empty:
+            try:
+                self.rows.put(_as_of(hist), row)
+            except Exception as e:
+                print(f"⚠️ Could not cache features for {ticker}: {e}")
+        return row
+
+    def batch(self, symbols: Iterable[str], max_threads: int = 8,
+              max_age_sec: float = FEATURE_ROWS_MAX_AGE_SEC) -> pd.DataFrame:
+        """
+        שורות אימון לכל הסימבולים: שורות טריות (max_age_sec) מה-FeatureRowStore,
+        והשאר דרך history_many (הורדה מרוכזת) + חילוץ במקביל. max_age_sec=0 -> חילוץ מחדש לכולם.
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        print(f"🚀 Extracting features for {len(symbols)} symbols...")
+        cached = self.rows.rows(symbols, max_age_sec=max_age_sec) if self.rows is not None else {}
+        todo = [s for s in symbols if s not in cached]
+        if cached:
+            print(f"♻️ {len(cached)} rows from feature cache, {len(todo)} to extract")
+
+        frames: Dict[str, pd.DataFrame] = {}
+        bulk = getattr(self.data_provider, "history_many", None)
+        if todo and bulk is not None:
+            try:
+                frames, missing = bulk(todo, period="1y", interval="1d")
+                todo = [s for s in todo if s not in set(missing)]
+            except Exception as e:
+                print(f"⚠️ Bulk download failed, falling back to per-symbol history: {e}")
+
+        results: List[Dict] = list(cached.values())
+        with ThreadPoolExecutor(max_workers=max(1, max_threads)) as executor:
+            futures = {executor.submit(self._extract_and_store, sym, frames.get(sym)): sym for sym in todo}
             for fut in as_completed(futures):
                 r = fut.result()
                 if r:
@@ -112,5 +170,6 @@ class FeatureExtractor:
 def extract_features(ticker: str):
     return FeatureExtractor().extract(ticker)
 
-def batch_extract(symbols: Iterable[str], max_threads: int = 5) -> pd.DataFrame:
-    return FeatureExtractor().batch(list(symbols), max_threads=max_threads)
+def batch_extract(symbols: Iterable[str], max_threads: int = 8,
+                  max_age_sec: float = FEATURE_ROWS_MAX_AGE_SEC) -> pd.DataFrame:
+    return FeatureExtractor().batch(list(symbols), max_threads=max_threads, max_age_sec=max_age_sec)
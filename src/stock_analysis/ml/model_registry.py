@@ -0,0 +1,194 @@
+# src/stock_analysis/ml/model_registry.py
+from __future__ import annotations
+import os, pickle, threading, time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+
+from stock_analysis.ml.compact_forest import compact_dir, open_matching
+
+# ===== הגדרות (ENV) =====
+MODEL_REGISTRY_CHECK_SEC = float(os.getenv("MODEL_REGISTRY_CHECK_SEC", "2"))   # כל כמה זמן בודקים mtime של הקבצים
+MODEL_COMPACT = os.getenv("MODEL_COMPACT", "1") == "1"                         # יער מיוצא (forest_<period>/) במקום pickle
+
+# (mtime_ns, size) של קובץ המודל, של קובץ הפיצ'רים ושל meta.json של היער המיוצא ((0, 0) אם אין)
+Signature = Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int]]
+
+
+def artifact_paths(period: str, artifacts_dir: str | Path = "artifacts", legacy_dir: str | Path = "ML") -> Tuple[Path, Path]:
+    """מאפשר תאימות: קודם מחפש ב-artifacts/, ואם לא קיים – ב-ML/ הישן."""
+    artifacts_dir = Path(artifacts_dir)
+    legacy_dir = Path(legacy_dir)
+    model_a = artifacts_dir / f"model_{period}.pkl"
+    feats_a = artifacts_dir / f"features_{period}.pkl"
+    model_l = legacy_dir / f"model_{period}.pkl"
+    feats_l = legacy_dir / f"features_{period}.pkl"
+    model_path = model_a if model_a.exists() else model_l
+    feats_path = feats_a if feats_a.exists() else feats_l
+    return model_path, feats_path
+
+
+def _signature(model_path: Path, feats_path: Path, period: str) -> Optional[Signature]:
+    try:
+        m, f = model_path.stat(), feats_path.stat()
+    except OSError:
+        return None
+    try:
+        c = (compact_dir(model_path.parent, period) / "meta.json").stat()
+        compact = (c.st_mtime_ns, c.st_size)
+    except OSError:
+        compact = (0, 0)
+    return (m.st_mtime_ns, m.st_size), (f.st_mtime_ns, f.st_size), compact
+
+
+def model_bytes(model: Any) -> int:
+    """הערכת זיכרון: מערכי העצים ביער (nodes + values); אחרת גודל ה-pickle."""
+    if isinstance(getattr(model, "nbytes", None), int):
+        return model.nbytes  # CompactForest
+    trees = getattr(model, "estimators_", None)
+    if trees is not None:
+        total = 0
+        for est in trees:
+            tree = getattr(est, "tree_", None)
+            if tree is None:
+                continue
+            state = tree.__getstate__()
+            total += sum(getattr(state.get(k), "nbytes", 0) for k in ("nodes", "values"))
+        if total:
+            return total
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+@dataclass
+class LoadedModel:
+    period: str
+    model: Any
+    feature_names: List[str]
+    model_path: Path
+    signature: Signature
+    loaded_at: float
+    load_seconds: float
+    bytes: int
+    kind: str = "sklearn"
+
+
+class ModelRegistry:
+    """
+    מודל + רשימת פיצ'רים לכל אופק, נטענים פעם אחת לתהליך ומשותפים בין threads.
+    קבצים שהשתנו ב-artifacts/ (mtime/size) נטענים מחדש אוטומטית; טעינה שנכשלה
+    (למשל קובץ שעדיין נכתב) משאירה את המודל הקודם ומנסה שוב בבדיקה הבאה.
+    """
+
+    def __init__(self, artifacts_dir: str | Path = "artifacts", legacy_dir: str | Path = "ML",
+                 check_sec: float = MODEL_REGISTRY_CHECK_SEC) -> None:
+        self.artifacts_dir = artifacts_dir
+        self.legacy_dir = legacy_dir
+        self.check_sec = check_sec
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._models: Dict[str, LoadedModel] = {}
+        self._checked: Dict[str, float] = {}
+        self.loads = 0
+        self.reloads = 0
+        self.errors = 0
+
+    def _period_lock(self, period: str) -> threading.Lock:
+        with self._lock:
+            return self._loading.setdefault(period, threading.Lock())
+
+    def get(self, period: str) -> Optional[LoadedModel]:
+        """המודל הטעון לאופק; None אם אין קבצים. טעינה מהדיסק רק בפעם הראשונה או אחרי שינוי."""
+        now = time.time()
+        with self._lock:
+            current = self._models.get(period)
+            if current is not None and now - self._checked.get(period, 0.0) < self.check_sec:
+                return current
+        with self._period_lock(period):
+            with self._lock:
+                current = self._models.get(period)
+                if current is not None and time.time() - self._checked.get(period, 0.0) < self.check_sec:
+                    return current  # thread אחר כבר בדק/טען בזמן שחיכינו
+            model_path, feats_path = artifact_paths(period, self.artifacts_dir, self.legacy_dir)
+            sig = _signature(model_path, feats_path, period)
+            if sig is None:
+                with self._lock:
+                    self._models.pop(period, None)
+                    self._checked[period] = time.time()
+                return None
+            if current is not None and current.signature == sig:
+                with self._lock:
+                    self._checked[period] = time.time()
+                return current
+            loaded = self._load(period, model_path, feats_path, sig)
+            with self._lock:
+                self._checked[period] = time.time()
+                if loaded is None:
+                    return current
+                self._models[period] = loaded
+                if current is None:
+                    self.loads += 1
+                else:
+                    self.reloads += 1
+            return loaded
+
+    def _load(self, period: str, model_path: Path, feats_path: Path, sig: Signature) -> Optional[LoadedModel]:
+        t0 = time.perf_counter()
+        try:
+            # יער מיוצא שנוצר מאותו pickle: mmap במקום unpickle, ו-predict_proba זהה בלי התקורה של sklearn
+            model = open_matching(model_path, compact_dir(model_path.parent, period)) if MODEL_COMPACT else None
+            kind = "compact" if model is not None else "sklearn"
+            if model is None:
+                model = joblib.load(model_path)
+            feature_names: List[str] = list(joblib.load(feats_path))
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"❌ Model load error for {period}: {e}")
+            return None
+        # הקבצים השתנו בזמן הטעינה (אימון באמצע כתיבה) -> לא שומרים חתימה, כדי שהבדיקה הבאה תטען שוב
+        if _signature(model_path, feats_path, period) != sig:
+            sig = ((0, 0), (0, 0), (0, 0))
+        elapsed = time.perf_counter() - t0
+        print(f"📦 Loaded model {period} ({kind}) from {model_path} in {elapsed:.2f}s")
+        return LoadedModel(period=period, model=model, feature_names=feature_names, model_path=model_path,
+                           signature=sig, loaded_at=time.time(), load_seconds=elapsed, bytes=model_bytes(model),
+                           kind=kind)
+
+    def invalidate(self, period: Optional[str] = None) -> None:
+        with self._lock:
+            if period is None:
+                self._models.clear()
+                self._checked.clear()
+            else:
+                self._models.pop(period, None)
+                self._checked.pop(period, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loads": self.loads, "reloads": self.reloads, "errors": self.errors,
+                "models": {
+                    p: {"path": str(m.model_path), "kind": m.kind, "features": len(m.feature_names),
+                        "load_ms": round(m.load_seconds * 1000.0, 1), "bytes": m.bytes,
+                        "loaded_at": m.loaded_at}
+                    for p, m in self._models.items()
+                },
+            }
+
+
+_registries: Dict[Tuple[str, str], ModelRegistry] = {}
+_default_guard = threading.Lock()
+
+def default_model_registry(artifacts_dir: str | Path = "artifacts", legacy_dir: str | Path = "ML") -> ModelRegistry:
+    """Registry אחד לכל זוג תיקיות בתהליך – Screener, Scanner, API ו-Streamlit חולקים אותו."""
+    key = (str(artifacts_dir), str(legacy_dir))
+    with _default_guard:
+        reg = _registries.get(key)
+        if reg is None:
+            reg = _registries[key] = ModelRegistry(artifacts_dir, legacy_dir)
+        return reg
@@ -1,34 +1,13 @@
 # src/stock_analysis/ml/periodic_models.py
 from __future__ import annotations
-import os
 from pathlib import Path
-from typing import Dict, List
-import joblib
+from typing import Any, Dict, List, Mapping, Sequence
+import numpy as np
 import pandas as pd
 
-_PERIODS: List[str] = ["1d", "1mo", "1y"]
-
-def _artifact_paths(period: str, artifacts_dir: str | Path = "artifacts", legacy_dir: str | Path = "ML"):
-    """מאפשר תאימות: קודם מחפש ב-artifacts/, ואם לא קיים – ב-ML/ הישן."""
-    artifacts_dir = Path(artifacts_dir)
-    legacy_dir = Path(legacy_dir)
-    model_a = artifacts_dir / f"model_{period}.pkl"
-    feats_a = artifacts_dir / f"features_{period}.pkl"
-    model_l = legacy_dir / f"model_{period}.pkl"
-    feats_l = legacy_dir / f"features_{period}.pkl"
-    model_path = model_a if model_a.exists() else model_l
-    feats_path = feats_a if feats_a.exists() else feats_l
-    return model_path, feats_path
+from stock_analysis.ml.model_registry import default_model_registry
 
-def _one_hot_sector(raw: dict, feature_names: List[str]) -> dict:
-    # אפס לכל תכונת מגזר (Sector_*)
-    for col in feature_names:
-        if col.startswith("Sector_"):
-            raw[col] = 0
-    sector_col = f"Sector_{raw.get('Sector', 'Other')}"
-    if sector_col in feature_names:
-        raw[sector_col] = 1
-    return raw
+_PERIODS: List[str] = ["1d", "1mo", "1y"]
 
 def _raw_row_from_stock(stock: dict) -> dict:
     return {
@@ -48,39 +27,74 @@ def _raw_row_from_stock(stock: dict) -> dict:
         "Sentiment Score": stock.get("Sentiment Score", 0),
     }
 
-def predict_success(stock: dict,
-                    periods: List[str] | None = None,
-                    artifacts_dir: str | Path = "artifacts",
-                    legacy_dir: str | Path = "ML") -> Dict[str, float | None]:
+def _feature_matrix(raw: pd.DataFrame, feature_names: List[str]) -> pd.DataFrame:
+    """מטריצת פיצ'רים לכל השורות בבת אחת: reindex לפי רשימת המודל + one-hot וקטורי של Sector_*."""
+    X = raw.reindex(columns=feature_names, fill_value=0)
+    sector = raw["Sector"].astype(str)
+    for col in feature_names:
+        if col.startswith("Sector_"):
+            X[col] = (sector == col[len("Sector_"):]).astype(int)
+    return X
+
+def predict_success_batch(stocks: Sequence[Mapping[str, Any]],
+                          periods: List[str] | None = None,
+                          artifacts_dir: str | Path = "artifacts",
+                          legacy_dir: str | Path = "ML") -> pd.DataFrame:
     """
-    תואם ל-ML/model_predictor.py המקורי: מחזיר dict עם {"1d": %, "1mo": %, "1y": %}.
-    טוען את המודל ואת רשימת הפיצ'רים לכל אופק ומריץ predict_proba.
+    חיזוי לכל השורות ולכל האופקים: DataFrame עם עמודה לכל אופק (%), שורה לכל מניה (לפי הסדר).
+    מטריצה אחת וקריאת predict_proba אחת לאופק. אופק בלי מודל -> None;
+    שורה עם ערך לא-מספרי -> 0.0 (כמו שגיאת חיזוי ב-predict_success המקורי).
     """
     periods = periods or _PERIODS
-    results: Dict[str, float | None] = {}
-    base_row = _raw_row_from_stock(stock)
+    out = pd.DataFrame(index=range(len(stocks)), columns=periods, dtype=object)
+    if not len(stocks):
+        return out
+    raw = pd.DataFrame([_raw_row_from_stock(dict(s)) for s in stocks])
+    # המרה מספרית פעם אחת לכל האופקים; ערך שקיים אבל לא מספרי מסמן את השורה כשגויה
+    values = raw.drop(columns=["Sector"])
+    numeric = values.apply(pd.to_numeric, errors="coerce")
+    invalid = values.notna() & numeric.isna()
+    numeric["Sector"] = raw["Sector"]
+    registry = default_model_registry(artifacts_dir, legacy_dir)
 
     for period in periods:
-        model_path, feats_path = _artifact_paths(period, artifacts_dir, legacy_dir)
-        if (not model_path.exists()) or (not feats_path.exists()):
-            results[period] = None
-            continue
+        loaded = registry.get(period)
+        if loaded is None:
+            continue  # None לכל השורות
 
         try:
-            model = joblib.load(model_path)
-            feature_names: List[str] = joblib.load(feats_path)
-
-            raw = dict(base_row)  # copy
-            raw = _one_hot_sector(raw, feature_names)
-
-            X = pd.DataFrame([raw]).reindex(columns=feature_names, fill_value=0)
-            prob = float(model.predict_proba(X)[0][1])
-            results[period] = round(prob * 100.0, 2)
+            X = _feature_matrix(numeric, loaded.feature_names)
+            used = [c for c in loaded.feature_names if c in invalid.columns]
+            bad = invalid[used].any(axis=1).to_numpy()
+            if bad.any():
+                print(f"❌ Prediction error for {period}: non-numeric features in {int(bad.sum())} rows")
+            col = np.zeros(len(raw))
+            if (~bad).any():
+                prob = loaded.model.predict_proba(X[~bad])[:, 1]
+                col[~bad] = np.round(prob * 100.0, 2)
+            out[period] = col
         except Exception as e:
             print(f"❌ Prediction error for {period}: {e}")
-            results[period] = 0.0
+            out[period] = 0.0
 
-    return results
+    return out
+
+def predict_success(stock: dict,
+                    periods: List[str] | None = None,
+                    artifacts_dir: str | Path = "artifacts",
+                    legacy_dir: str | Path = "ML") -> Dict[str, float | None]:
+    """
+    תואם ל-ML/model_predictor.py המקורי: מחזיר dict עם {"1d": %, "1mo": %, "1y": %}.
+    עטיפה של שורה אחת ל-predict_success_batch.
+    """
+    row = predict_success_batch([stock], periods, artifacts_dir, legacy_dir).iloc[0]
+    return {p: (None if v is None or pd.isna(v) else float(v)) for p, v in row.items()}
+
+def _preferred(res: Mapping[str, float | None], preferred: str) -> float:
+    if res.get(preferred) is not None:
+        return float(res[preferred] or 0.0)
+    vals = [v for v in res.values() if v is not None]
+    return float(sum(vals) / len(vals)) if vals else 0.0
 
 def predict_success_single(stock: dict,
                            preferred: str = "1mo",
@@ -89,8 +103,13 @@ def predict_success_single(stock: dict,
     """
     מחזיר מספר יחיד (ל־UI/סקרינר): קודם ניסיון לפי preferred, ואם אין – ממוצע על הקיימים.
     """
-    res = predict_success(stock, artifacts_dir=artifacts_dir, legacy_dir=legacy_dir)
-    if res.get(preferred) is not None:
-        return float(res[preferred] or 0.0)
-    vals = [v for v in res.values() if v is not None]
-    return float(sum(vals) / len(vals)) if vals else 0.0
+    return _preferred(predict_success(stock, artifacts_dir=artifacts_dir, legacy_dir=legacy_dir), preferred)
+
+def predict_success_single_batch(stocks: Sequence[Mapping[str, Any]],
+                                 preferred: str = "1mo",
+                                 artifacts_dir: str | Path = "artifacts",
+                                 legacy_dir: str | Path = "ML") -> List[float]:
+    """predict_success_single לכל השורות, על גבי predict_success_batch אחד."""
+    batch = predict_success_batch(stocks, artifacts_dir=artifacts_dir, legacy_dir=legacy_dir)
+    return [_preferred({p: (None if v is None or pd.isna(v) else float(v)) for p, v in row.items()}, preferred)
+            for _, row in batch.iterrows()]
@@ -3,9 +3,6 @@ from __future__ import annotations
 from pathlib import Path
 import os
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report
-import joblib
 
 # תאימות לשכבת הדאטה שלך:
 from stock_utils import refresh_sp500_prices  # compat
@@ -16,42 +13,52 @@ try:
 except Exception:
     from ML.feature_extractor import batch_extract  # type: ignore
 
-def train_models(artifacts_dir: str | Path = "artifacts",
-                 save_legacy_copy: bool = True) -> None:
-    """מכשיר מודלים לכל אופק ושומר:
-       artifacts/model_{period}.pkl + artifacts/features_{period}.pkl
-       ואם save_legacy_copy=True אז גם ב-ML/ לשמירת תאימות."""
-    artifacts_dir = Path(artifacts_dir)
-    legacy_dir = Path("ML")
-    artifacts_dir.mkdir(parents=True, exist_ok=True)
-    legacy_dir.mkdir(parents=True, exist_ok=True)
+from stock_analysis.ml.training_dataset import FEATURE_COLUMNS, TrainingDataset
+from stock_analysis.ml.training_runner import TRAIN_WORKERS, HorizonJob, train_horizons
+
+_PERIODS = ["1d", "1mo", "1y"]
 
-    refresh_sp500_prices()
+
+def _snapshot_jobs(use_cache: bool) -> list[HorizonJob]:
+    """שורה לכל מניה מ-batch_extract (ההתנהגות המקורית) – אותה מטריצה לכל האופקים."""
+    if not use_cache or not os.path.exists("sp500_prices.csv"):
+        refresh_sp500_prices()
     symbols_df = pd.read_csv("sp500_prices.csv")
     symbols = symbols_df["Symbol"].tolist()
 
-    df = batch_extract(symbols)  # מצופה לכלול: Ticker, Sector, Success_1d/1mo/1y + פיצ'רים
+    # מצופה לכלול: Ticker, Sector, Success_1d/1mo/1y + פיצ'רים
+    df = batch_extract(symbols) if use_cache else batch_extract(symbols, max_age_sec=0)
     df = pd.get_dummies(df, columns=["Sector"])
-
     X_all = df.drop(columns=["Ticker", "Success_1d", "Success_1mo", "Success_1y"])
-    y_map = {"1d": df["Success_1d"], "1mo": df["Success_1mo"], "1y": df["Success_1y"]}
-
-    for period, y in y_map.items():
-        model = RandomForestClassifier(n_estimators=150, random_state=42, max_depth=6)
-        model.fit(X_all, y.astype(int))
-
-        print(f"📊 [{period}] Classification Report:")
-        print(classification_report(y, model.predict(X_all)))
-
-        # save artifacts/
-        model_p = artifacts_dir / f"model_{period}.pkl"
-        feats_p = artifacts_dir / f"features_{period}.pkl"
-        joblib.dump(model, model_p)
-        joblib.dump(list(X_all.columns), feats_p)
-        print(f"✅ Saved {model_p.name}, {feats_p.name} in {artifacts_dir}")
-
-        # optional legacy copies in ML/
-        if save_legacy_copy:
-            joblib.dump(model, legacy_dir / f"model_{period}.pkl")
-            joblib.dump(list(X_all.columns), legacy_dir / f"features_{period}.pkl")
-            print(f"↩️  Also saved legacy copies in {legacy_dir}")
+    return [HorizonJob(p, X_all, df[f"Success_{p}"]) for p in _PERIODS]
+
+
+def _dataset_jobs(name: str) -> list[HorizonJob]:
+    """שורות point-in-time מ-TrainingDataset – לכל אופק רק השורות שהתווית שלהן כבר ידועה."""
+    ds = TrainingDataset.open(name)
+    jobs = []
+    for p in _PERIODS:
+        df = ds.frame(period=p, columns=FEATURE_COLUMNS + ["Sector", f"Success_{p}"])
+        X = pd.get_dummies(df.drop(columns=[f"Success_{p}"]), columns=["Sector"])
+        jobs.append(HorizonJob(p, X, df[f"Success_{p}"]))
+    return jobs
+
+
+def train_models(artifacts_dir: str | Path = "artifacts",
+                 save_legacy_copy: bool = True,
+                 use_cache: bool = True,
+                 dataset: str | None = None,
+                 workers: int = TRAIN_WORKERS,
+                 add_trees: int = 0,
+                 force: bool = False) -> dict:
+    """מכשיר מודלים לכל אופק ושומר:
+       artifacts/model_{period}.pkl + artifacts/features_{period}.pkl
+       ואם save_legacy_copy=True אז גם ב-ML/ לשמירת תאימות.
+       use_cache=True: שורות שחולצו לאחרונה (FeatureRowStore) לא מורדות ומחושבות שוב.
+       dataset: שם TrainingDataset (data/datasets/<name>) במקום צילום מצב של batch_extract.
+       האופקים מאומנים במקביל; אופק שהדאטה שלו לא השתנה מדולג (force=True מאמן הכול),
+       add_trees>0 מוסיף עצים למודל הקיים. מחזיר את הדוח (נשמר גם ב-artifacts/train_report.json)."""
+    jobs = _dataset_jobs(dataset) if dataset else _snapshot_jobs(use_cache)
+    return train_horizons(jobs, artifacts_dir=artifacts_dir,
+                          legacy_dir="ML" if save_legacy_copy else None,
+                          workers=workers, add_trees=add_trees, force=force)
@@ -0,0 +1,256 @@
+# src/stock_analysis/ml/training_dataset.py
+from __future__ import annotations
+import json, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis.infrastructure.data.bar_store import BarStore, default_bar_store
+from stock_analysis.features.pipeline import Pipeline
+from stock_analysis.features.daily import default_daily_pipeline
+from stock_analysis.features.volume import VolumeStatus
+
+# ===== הגדרות (ENV) =====
+DATASET_DIR = os.getenv("TRAINING_DATASET_DIR", "data/datasets")
+DATASET_WORKERS = int(os.getenv("TRAINING_DATASET_WORKERS", "8"))
+
+# אותם ספים כמו ב-FeatureExtractor.extract – אבל קדימה בזמן: מחיר באופק מול מחיר ה-as_of
+HORIZONS: Dict[str, Tuple[Optional[pd.DateOffset], float]] = {
+    "1d": (None, 1.03),                         # הנר הבא
+    "1mo": (pd.DateOffset(months=1), 1.05),     # הנר האחרון עד as_of + חודש
+    "1y": (pd.DateOffset(years=1), 1.15),
+}
+MIN_BARS_1Y = 200  # כמו extract: פחות מ-200 נרות בשנה האחרונה -> אין שורה
+
+# עמודות הפיצ'רים בשמות של extract / _raw_row_from_stock (+ Sector כקוד)
+FEATURE_COLUMNS = ["RSI", "MACD", "MA20_gt_MA200", "MA50_gt_MA200", "VolumeRatio"]
+_DTYPES: Dict[str, str] = {
+    "Ticker": "int32", "Date": "int64", "Sector": "int16",
+    "RSI": "float32", "MACD": "float32", "MA20_gt_MA200": "int8", "MA50_gt_MA200": "int8",
+    "VolumeRatio": "float32",
+    **{f"Return_{p}": "float32" for p in HORIZONS},
+    **{f"Success_{p}": "int8" for p in HORIZONS},
+}
+
+
+def _price_pipeline() -> Pipeline:
+    """ה-Pipeline היומי בלי VolumeStatus (שמחזיר ערך אחד ל-frame) – RSI/MACD/SMA הם סיבתיים,
+    כך שהערך בשורה t על כל ההיסטוריה זהה לערך ש-extract היה מחשב על הנרות עד t."""
+    return Pipeline([s for s in default_daily_pipeline().steps if not isinstance(s, VolumeStatus)], shared=True)
+
+
+def _session_dates(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """תאריך המסחר (לפי אזור הזמן של הבורסה) של כל נר, בלי אזור זמן, ברזולוציית ns."""
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.normalize().as_unit("ns")
+
+
+def symbol_rows(bars: pd.DataFrame, pipeline: Optional[Pipeline] = None, step: int = 1,
+                start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> Dict[str, np.ndarray]:
+    """
+    כל השורות של סימבול אחד, וקטורית: as_of = כל נר step-י שיש לפניו שנה מלאה (MIN_BARS_1Y).
+    פיצ'רים רק מנרות עד as_of; Return_/Success_ מהנרות שאחריו. אופק שעוד לא הגיע -> NaN / -1.
+    """
+    empty = {c: np.empty(0, dtype=_DTYPES[c]) for c in _DTYPES if c not in ("Ticker", "Sector")}
+    if bars is None or bars.empty:
+        return empty
+    bars = bars[bars["Close"].notna()]
+    n = len(bars)
+    if n < MIN_BARS_1Y:
+        return empty
+
+    feats = (pipeline or _price_pipeline()).run(bars)
+    dates = _session_dates(bars.index)
+    d_ns = dates.asi8
+    close = bars["Close"].to_numpy(dtype=np.float64)
+
+    # חלון שנה לכל as_of (כמו period_window "1y"): מספר הנרות + ממוצע נפח מצטבר
+    first = np.searchsorted(d_ns, (dates - pd.DateOffset(years=1)).as_unit("ns").asi8, side="left")
+    pos = np.arange(n)
+    count = pos + 1 - first
+    vol = bars["Volume"].to_numpy(dtype=np.float64)
+    valid = np.isfinite(vol)
+    vol_cs = np.concatenate([[0.0], np.cumsum(np.where(valid, vol, 0.0))])
+    cnt_cs = np.concatenate([[0], np.cumsum(valid)])
+    vol_n = cnt_cs[pos + 1] - cnt_cs[first]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_vol = (vol_cs[pos + 1] - vol_cs[first]) / vol_n
+        ratio = np.where(avg_vol > 0, np.round(vol / avg_vol, 2), 0.0)
+
+    rsi = feats["RSI"].to_numpy(dtype=np.float64)
+    macd = feats["MACD Value"].to_numpy(dtype=np.float64)
+    ma20, ma50, ma200 = (feats[f"SMA_{w}"].to_numpy(dtype=np.float64) for w in (20, 50, 200))
+
+    keep = (count >= MIN_BARS_1Y) & np.isfinite(rsi) & np.isfinite(macd) & np.isfinite(ratio)
+    if start is not None:
+        keep &= d_ns >= pd.Timestamp(start).value
+    if end is not None:
+        keep &= d_ns <= pd.Timestamp(end).value
+    if step > 1:
+        keep &= (pos % step) == ((n - 1) % step)  # תמיד כולל את הנר האחרון
+    rows = pos[keep]
+
+    out: Dict[str, np.ndarray] = {
+        "Date": d_ns[rows],
+        "RSI": rsi[rows].astype(np.float32),
+        "MACD": macd[rows].astype(np.float32),
+        "MA20_gt_MA200": (ma20[rows] > ma200[rows]).astype(np.int8),
+        "MA50_gt_MA200": (ma50[rows] > ma200[rows]).astype(np.int8),
+        "VolumeRatio": ratio[rows].astype(np.float32),
+    }
+    for period, (offset, threshold) in HORIZONS.items():
+        if offset is None:
+            target = rows + 1
+            known = target < n
+        else:
+            target = np.searchsorted(d_ns, (dates[rows] + offset).as_unit("ns").asi8, side="right") - 1
+            known = d_ns[-1] >= (dates[rows] + offset).as_unit("ns").asi8
+        future = close[np.minimum(target, n - 1)]
+        ret = np.where(known, future / close[rows] - 1.0, np.nan)
+        out[f"Return_{period}"] = ret.astype(np.float32)
+        out[f"Success_{period}"] = np.where(known, future > close[rows] * threshold, -1).astype(np.int8)
+    return out
+
+
+class TrainingDataset:
+    """
+    Dataset עמודתי (ticker × as_of) על הדיסק: קובץ npy לכל עמודה, נפתח ב-memory map לקריאה בלבד.
+    Ticker/Sector נשמרים כקודים (int) עם טבלאות שמות ב-meta.json; Date = ns של תאריך המסחר.
+    """
+
+    def __init__(self, columns: Mapping[str, np.ndarray], meta: Mapping) -> None:
+        self.columns = dict(columns)
+        self.meta = dict(meta)
+        self.symbols: List[str] = list(self.meta.get("symbols", []))
+        self.sectors: List[str] = list(self.meta.get("sectors", []))
+
+    @classmethod
+    def open(cls, name: str, root: str | Path = DATASET_DIR) -> "TrainingDataset":
+        base = Path(root) / name
+        meta = json.loads((base / "meta.json").read_text(encoding="utf-8"))
+        version = meta["version"]
+        cols = {c: np.load(base / f"{c}.{version}.npy", mmap_mode="r") for c in meta["columns"]}
+        return cls(cols, meta)
+
+    @staticmethod
+    def exists(name: str, root: str | Path = DATASET_DIR) -> bool:
+        return (Path(root) / name / "meta.json").exists()
+
+    def __len__(self) -> int:
+        return int(self.meta.get("rows", 0))
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def frame(self, period: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+              start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        DataFrame בפורמט של batch_extract (Ticker/Sector כשמות, Date כ-datetime).
+        period: רק שורות שהתווית שלהן לאופק הזה כבר ידועה.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if period is not None:
+            mask &= np.asarray(self.columns[f"Success_{period}"]) >= 0
+        if start is not None:
+            mask &= np.asarray(self.columns["Date"]) >= pd.Timestamp(start).value
+        if end is not None:
+            mask &= np.asarray(self.columns["Date"]) <= pd.Timestamp(end).value
+        names = list(columns) if columns is not None else list(self.meta["columns"])
+        data = {}
+        for c in names:
+            values = np.asarray(self.columns[c])[mask]
+            if c == "Ticker":
+                values = pd.Categorical.from_codes(values, categories=self.symbols)
+            elif c == "Sector":
+                values = pd.Categorical.from_codes(values, categories=self.sectors)
+            elif c == "Date":
+                values = values.view("datetime64[ns]")
+            data[c] = values
+        return pd.DataFrame(data)
+
+    def age_sec(self) -> float:
+        return time.time() - float(self.meta.get("built_at", 0))
+
+
+# ---------- בנייה ----------
+_build_lock = threading.Lock()
+
+def build_training_dataset(name: str, symbols: Optional[Sequence[str]] = None,
+                           store: Optional[BarStore] = None, sectors: Optional[Mapping[str, str]] = None,
+                           step: int = 1, start: Optional[str] = None, end: Optional[str] = None,
+                           workers: int = DATASET_WORKERS, root: str | Path = DATASET_DIR) -> TrainingDataset:
+    """
+    עובר על הנרות היומיים השמורים ב-BarStore (בלי רשת) ובונה שורה לכל (סימבול, as_of).
+    symbols=None -> כל מה שיש במאגר. sectors: Symbol -> Sector (חסר = "Other").
+    כתיבה לגרסה חדשה ואז החלפה אטומית של meta.json, כמו ב-UniverseCube.
+    """
+    store = store or default_bar_store()
+    symbols = sorted(dict.fromkeys(s.upper() for s in (symbols if symbols is not None else store.symbols("1d")) if s))
+    sectors = {k.upper(): str(v) for k, v in (sectors or {}).items()}
+    start_ts = pd.Timestamp(start) if start else None
+    end_ts = pd.Timestamp(end) if end else None
+    pipeline = _price_pipeline()
+    t0 = time.time()
+
+    def one(sym: str) -> Dict[str, np.ndarray]:
+        try:
+            bars, _meta = store.load(sym, "1d", True)
+            return symbol_rows(bars, pipeline, step=step, start=start_ts, end=end_ts)
+        except Exception as e:
+            print(f"❌ Dataset rows failed for {sym}: {e}")
+            return {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        parts = list(ex.map(one, symbols))
+
+    sector_names = sorted({sectors.get(s, "Other") for s in symbols}) or ["Other"]
+    sector_code = {s: i for i, s in enumerate(sector_names)}
+    used = [(i, p) for i, p in enumerate(parts) if p and len(p["Date"])]
+    columns = list(_DTYPES)
+    total = sum(len(p["Date"]) for _, p in used)
+
+    base = Path(root) / name
+    base.mkdir(parents=True, exist_ok=True)
+    version = f"{time.time_ns()}_{os.getpid()}"
+
+    with _build_lock:
+        for c in columns:
+            out = np.lib.format.open_memmap(base / f"{c}.{version}.npy", mode="w+",
+                                            dtype=_DTYPES[c], shape=(total,))
+            at = 0
+            for i, p in used:
+                k = len(p["Date"])
+                if c == "Ticker":
+                    out[at:at + k] = i
+                elif c == "Sector":
+                    out[at:at + k] = sector_code[sectors.get(symbols[i], "Other")]
+                else:
+                    out[at:at + k] = p[c]
+                at += k
+            out.flush()
+            del out
+
+        meta = {
+            "version": version, "columns": columns, "dtypes": _DTYPES, "rows": total,
+            "symbols": symbols, "sectors": sector_names, "features": FEATURE_COLUMNS,
+            "horizons": {p: thr for p, (_o, thr) in HORIZONS.items()},
+            "step": step, "start": start, "end": end, "built_at": time.time(),
+        }
+        tmp = base / f"meta.json.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, base / "meta.json")
+
+        for p in base.glob("*.npy"):
+            if version not in p.name:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    print(f"✅ Dataset {name}: {total} rows from {len(used)}/{len(symbols)} symbols in {time.time() - t0:.1f}s")
+    return TrainingDataset.open(name, root)
@@ -0,0 +1,202 @@
+# src/stock_analysis/ml/training_runner.py
+from __future__ import annotations
+import hashlib, json, os, resource, sys, threading, time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from stock_analysis.ml.compact_forest import compact_dir, export_forest
+from stock_analysis.ml.model_registry import model_bytes
+
+# ===== הגדרות (ENV) =====
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", "0"))                  # 0 = אופק לכל ליבה (עד מספר האופקים)
+TRAIN_N_ESTIMATORS = int(os.getenv("TRAIN_N_ESTIMATORS", "150"))
+TRAIN_MAX_DEPTH = int(os.getenv("TRAIN_MAX_DEPTH", "6"))
+TRAIN_LATENCY_BATCH = int(os.getenv("TRAIN_LATENCY_BATCH", "500"))    # גודל batch למדידת latency (כמו סריקה)
+
+STATE_FILE = "train_state.json"
+REPORT_FILE = "train_report.json"
+
+
+@dataclass
+class HorizonJob:
+    period: str
+    X: pd.DataFrame
+    y: pd.Series
+
+
+def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+    """hash של העמודות, הערכים והתוויות – אופק שהדאטה שלו לא השתנה לא מאומן מחדש."""
+    h = hashlib.sha1("|".join(map(str, X.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    h.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y, dtype=np.int64)), index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def atomic_dump(obj: Any, path: Path) -> int:
+    """joblib.dump לקובץ זמני באותה תיקייה ואז os.replace – האפליקציה לעולם לא טוענת pickle חצי-כתוב."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        joblib.dump(obj, tmp)
+        size = tmp.stat().st_size
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return size
+
+
+def _atomic_json(data: dict, path: Path) -> None:
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+
+
+def _fit_horizon(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    רץ בתהליך נפרד לכל אופק (max_tasks_per_child=1), כך ש-peak RSS הוא של האופק הזה בלבד.
+    כותב את ה-artifacts בעצמו (אטומית) ומחזיר שורת דוח.
+    """
+    period, X, y = task["period"], task["X"], task["y"]
+    t0 = time.perf_counter()
+    if task["mode"] == "warm":
+        model = joblib.load(task["model_path"])
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + task["add_trees"],
+                         n_jobs=task["n_jobs"])
+    else:
+        model = RandomForestClassifier(n_estimators=task["n_estimators"], random_state=42,
+                                       max_depth=task["max_depth"], n_jobs=task["n_jobs"])
+    model.fit(X, y)
+    fit_sec = time.perf_counter() - t0
+    model.set_params(n_jobs=None, warm_start=False)  # חיזוי באפליקציה: thread אחד לבקשה
+
+    # latency כמו באפליקציה: שורה אחת (ניתוח מניה) ו-batch (סריקה, predict_success_batch)
+    one = X.iloc[:1]
+    batch = X.iloc[:min(len(X), task["latency_batch"])]
+    model.predict_proba(one)  # חימום
+    t1 = time.perf_counter()
+    for _ in range(5):
+        model.predict_proba(one)
+    predict_1_ms = (time.perf_counter() - t1) / 5 * 1000.0
+    t1 = time.perf_counter()
+    model.predict_proba(batch)
+    predict_batch_ms = (time.perf_counter() - t1) * 1000.0
+
+    sizes = {}
+    for target in task["targets"]:
+        model_path = Path(target) / f"model_{period}.pkl"
+        atomic_dump(list(X.columns), Path(target) / f"features_{period}.pkl")
+        sizes[target] = atomic_dump(model, model_path)
+        # יער שטוח ל-ModelRegistry (נטען ב-mmap, חיזוי שורה אחת בלי התקורה של sklearn)
+        compact = export_forest(model, list(X.columns), compact_dir(target, period), source=model_path)
+    compact.predict_proba(one)
+    t1 = time.perf_counter()
+    for _ in range(5):
+        compact.predict_proba(one)
+    compact_1_ms = (time.perf_counter() - t1) / 5 * 1000.0
+
+    return {
+        "period": period, "mode": task["mode"], "rows": int(len(X)), "features": int(X.shape[1]),
+        "positive_rate": round(float(np.mean(y)), 4) if len(y) else 0.0,
+        "n_estimators": int(model.n_estimators), "max_depth": model.max_depth,
+        "fit_sec": round(fit_sec, 3), "peak_rss_mb": _peak_rss_mb(),
+        "model_file_bytes": sizes[task["targets"][0]], "model_tree_bytes": model_bytes(model),
+        "predict_1_ms": round(predict_1_ms, 3), "predict_batch_ms": round(predict_batch_ms, 3),
+        "predict_batch_rows": int(len(batch)),
+        "compact_bytes": compact.nbytes, "compact_predict_1_ms": round(compact_1_ms, 3),
+        "fingerprint": task["fingerprint"],
+    }
+
+
+def train_horizons(jobs: Sequence[HorizonJob], artifacts_dir: str | Path = "artifacts",
+                   legacy_dir: Optional[str | Path] = "ML", workers: int = TRAIN_WORKERS,
+                   n_estimators: int = TRAIN_N_ESTIMATORS, max_depth: int = TRAIN_MAX_DEPTH,
+                   add_trees: int = 0, force: bool = False) -> dict:
+    """
+    מאמן את האופקים במקביל (תהליך לכל אופק, הליבות מתחלקות ביניהם) ומחזיר/כותב דוח JSON.
+    אינקרמנטלי: אופק שה-fingerprint של הדאטה והפרמטרים שלו לא השתנו – מדולג;
+    add_trees>0 ואותן עמודות -> מוסיפים עצים (warm_start) על הדאטה החדש במקום אימון מלא.
+    """
+    artifacts_dir = Path(artifacts_dir)
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    targets = [str(artifacts_dir)] + ([str(legacy_dir)] if legacy_dir else [])
+    state = _read_json(artifacts_dir / STATE_FILE)
+    started = time.time()
+
+    report: Dict[str, Any] = {}
+    tasks: List[Dict[str, Any]] = []
+    for job in jobs:
+        fp = data_fingerprint(job.X, job.y)
+        prev = state.get(job.period, {})
+        model_path = artifacts_dir / f"model_{job.period}.pkl"
+        same_params = prev.get("max_depth") == max_depth and prev.get("base_estimators") == n_estimators
+        if not force and prev.get("fingerprint") == fp and same_params and model_path.exists():
+            report[job.period] = {**prev.get("report", {}), "period": job.period, "mode": "unchanged"}
+            continue
+        warm = add_trees > 0 and same_params and model_path.exists() \
+            and prev.get("columns") == list(map(str, job.X.columns))
+        tasks.append({
+            "period": job.period, "X": job.X, "y": job.y.astype(int), "fingerprint": fp,
+            "mode": "warm" if warm else "full", "model_path": str(model_path), "add_trees": add_trees,
+            "n_estimators": n_estimators, "max_depth": max_depth, "targets": targets,
+            "latency_batch": TRAIN_LATENCY_BATCH,
+        })
+
+    cpus = os.cpu_count() or 1
+    n_workers = max(1, min(workers or cpus, len(tasks) or 1))
+    for t in tasks:
+        t["n_jobs"] = max(1, cpus // n_workers)  # כל אופק מקבל חלק שווה מהליבות לבניית העצים
+
+    if tasks:
+        print(f"🏋️ Training {[t['period'] for t in tasks]} on {n_workers} workers × {tasks[0]['n_jobs']} jobs")
+        if n_workers == 1:
+            results = [_fit_horizon(t) for t in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, max_tasks_per_child=1) as ex:
+                results = list(ex.map(_fit_horizon, tasks))
+        for task, res in zip(tasks, results):
+            report[task["period"]] = res
+            state[task["period"]] = {
+                "fingerprint": res["fingerprint"], "columns": list(map(str, task["X"].columns)),
+                "max_depth": max_depth, "base_estimators": n_estimators,
+                "trained_at": time.time(), "report": res,
+            }
+            print(f"✅ [{res['period']}] {res['mode']}: {res['n_estimators']} trees on {res['rows']} rows "
+                  f"in {res['fit_sec']:.1f}s, {res['model_file_bytes'] / 1e6:.1f}MB, "
+                  f"predict {res['predict_1_ms']:.1f}ms/row")
+        _atomic_json(state, artifacts_dir / STATE_FILE)
+    else:
+        print("♻️ All horizons unchanged – nothing to train")
+
+    out = {
+        "started_at": started, "total_sec": round(time.time() - started, 3),
+        "workers": n_workers, "cpus": cpus, "targets": targets,
+        "horizons": {job.period: report[job.period] for job in jobs},
+    }
+    _atomic_json(out, artifacts_dir / REPORT_FILE)
+    return out
+
+
+def last_report(artifacts_dir: str | Path = "artifacts") -> dict:
+    """הדוח של ריצת האימון האחרונה ({} אם עוד לא רץ)."""
+    return _read_json(Path(artifacts_dir) / REPORT_FILE)
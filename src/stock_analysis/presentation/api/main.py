@@ -1,21 +1,31 @@
 # src/stock_analysis/presentation/api/main.py
 from __future__ import annotations
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
-from stock_analysis.ml.periodic_models import predict_success as predict_success_all
+from stock_analysis.ml.periodic_models import predict_success as predict_success_all, predict_success_batch
 from stock_analysis.ml.feature_explainer import explain_features
+from stock_analysis.ml.model_registry import default_model_registry
+from stock_analysis.ml.training_runner import last_report
 
 from stock_analysis.infrastructure.data_providers.yfinance_provider import YFinanceProvider
+from stock_analysis.infrastructure.data.bar_store import default_bar_store
+from stock_analysis.infrastructure.recording.archive import recording_from_env
+from stock_analysis.infrastructure.recording.wrappers import RecordedDataProvider, record_news
+from stock_analysis.infrastructure.utils.rate_limit import default_governor
+from stock_analysis.infrastructure.utils.single_flight import default_flight
 from stock_analysis.infrastructure.models.success_predictor_adapter import SuccessPredictorAdapter
 from stock_analysis.infrastructure.business.checklist_adapter import BusinessChecklistAdapter
+from stock_analysis.infrastructure.business.business_cache import default_business_cache
+from stock_analysis.infrastructure.data_providers.finnhub_news_client import default_news_client
+from stock_analysis.infrastructure.persistent.sentiment_store import default_sentiment_store
+from stock_analysis.services.business.checklist_service import CHECKLIST_DEADLINE_SEC, CHECKLIST_QUEUE_SEC, default_source_latency
 from stock_analysis.services.screener import Screener, ScreenerConfig
-from stock_analysis.features.pipeline import Pipeline
-from stock_analysis.features.rsi import RSI
-from stock_analysis.features.macd import MACD
-from stock_analysis.features.sma import SMA
-from stock_analysis.features.volume import VolumeStatus
+from stock_analysis.features.daily import default_daily_pipeline
+from stock_analysis.features.cache import default_feature_cache
 from stock_analysis.strategies import registry as strategy_registry
 
 # Your existing analyzer
@@ -24,16 +34,16 @@ from finnhub_news import FinnhubNewsAnalyzer
 app = FastAPI(title="StockAnalysis API", version="1.0")
 
 def build_screener(min_price=8.0, max_price=14.0) -> Screener:
-    dp = YFinanceProvider()
+    dp = YFinanceProvider(bar_store=default_bar_store())
     analyzer = FinnhubNewsAnalyzer(api_key=os.getenv("FINNHUB_API_KEY", ""))
+    # STOCK_ANALYSIS_RECORD / STOCK_ANALYSIS_REPLAY: הקלטה או ניגון אופליין של כל הקריאות החיצוניות
+    call = recording_from_env()
+    if call is not None:
+        dp = RecordedDataProvider(dp, call)
+        analyzer = record_news(analyzer, call)
     checklist = BusinessChecklistAdapter()
     success = SuccessPredictorAdapter()
-    pipeline = Pipeline([
-        RSI(period=14, out_col="RSI"),
-        MACD(span_fast=12, span_slow=26, out_col="MACD Value"),
-        SMA(window=20), SMA(window=50), SMA(window=200),
-        VolumeStatus(out_ratio_col="Volume Ratio", out_status_col="Volume Status"),
-    ])
+    pipeline = default_daily_pipeline()
     cfg = ScreenerConfig(min_price=min_price, max_price=max_price)
     return Screener(dp, analyzer, checklist, success, daily_pipeline=pipeline, cfg=cfg)
 
@@ -42,6 +52,11 @@ class DailyReq(BaseModel):
     min_price: float = 8.0
     max_price: float = 14.0
 
+class BatchReq(BaseModel):
+    symbols: List[str]
+    min_price: float = 8.0
+    max_price: float = 14.0
+
 class IntradayReq(BaseModel):
     symbol: str
     strategy: str = "OpeningBell"
@@ -50,6 +65,36 @@ class IntradayReq(BaseModel):
 def strategies():
     return {"strategies": strategy_registry.available()}
 
+@app.get("/stats/yahoo")
+def yahoo_stats():
+    # מצב חי של מושל הקצב (rate, תור, throttling) ושל איחוד הקריאות
+    return {"governor": default_governor().stats(), "single_flight": default_flight.stats()}
+
+@app.get("/stats/features")
+def feature_stats():
+    # FeatureCache משותף ל-/daily, /predict/horizons ו-/explain
+    return default_feature_cache().stats()
+
+@app.get("/stats/models")
+def model_stats():
+    # מודלי האופקים הטעונים: זמן טעינה, זיכרון, וכמה פעמים נטענו מחדש אחרי אימון
+    # + דוח ריצת האימון האחרונה (זמן fit, זיכרון שיא, גודל ו-latency לכל אופק)
+    return {**default_model_registry().stats(), "training": last_report()}
+
+@app.get("/stats/news")
+def news_stats():
+    # Finnhub: בקשות מול cache של חלונות תאריכים, מושל הקצב, וכתבות שכבר נוקדו
+    store = default_sentiment_store()
+    return {"finnhub": default_news_client(os.getenv("FINNHUB_API_KEY", "")).stats(),
+            "sentiment": store.stats() if store is not None else None}
+
+@app.get("/stats/checklist")
+def checklist_stats():
+    # מקורות חיצוניים של הצ'קליסט: כמה זמן כל אחד לוקח וכמה פעמים פספס את ה-deadline
+    cache = default_business_cache()
+    return {"deadline_sec": CHECKLIST_DEADLINE_SEC, "queue_sec": CHECKLIST_QUEUE_SEC, "sources": default_source_latency().stats(),
+            "cache": cache.stats() if cache is not None else None}
+
 @app.post("/daily")
 def daily(req: DailyReq):
     sc = build_screener(req.min_price, req.max_price)
@@ -79,6 +124,19 @@ def predict_horizons(req: DailyReq):
         raise HTTPException(status_code=404, detail="Symbol not found or conditions not met")
     return predict_success_all(res)
 
+@app.post("/predict/horizons/batch")
+def predict_horizons_batch(req: BatchReq):
+    # ניתוח במקביל (בלי מודל לשורה), ואז מטריצה אחת ו-predict_proba אחד לכל אופק.
+    # enrich=False: סנטימנט/צ'קליסט לא נכנסים לפיצ'רים של מודלי האופקים – חוסך את קריאות הרשת
+    sc = build_screener(req.min_price, req.max_price)
+    symbols = list(dict.fromkeys(s.upper() for s in req.symbols if s))
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(symbols)))) as ex:
+        analyzed = list(ex.map(lambda sym: sc.analyze_daily(sym, enrich=False, predict=False), symbols))
+    found = [res for res in analyzed if res is not None]
+    horizons = predict_success_batch(found).astype(object).where(lambda d: d.notna(), None)
+    out = {res["Symbol"]: row for res, row in zip(found, horizons.to_dict(orient="records"))}
+    return {"predictions": out, "missing": [s for s in symbols if s not in out]}
+
 @app.post("/explain")
 def explain(req: DailyReq):
     sc = build_screener(req.min_price, req.max_price)
@@ -3,14 +3,13 @@ import os
 from dataclasses import dataclass
 
 from stock_analysis.infrastructure.data_providers.yfinance_provider import YFinanceProvider
+from stock_analysis.infrastructure.data.bar_store import default_bar_store
+from stock_analysis.infrastructure.recording.archive import recording_from_env
+from stock_analysis.infrastructure.recording.wrappers import RecordedDataProvider, record_news
 from stock_analysis.infrastructure.models.success_predictor_adapter import SuccessPredictorAdapter
 from stock_analysis.infrastructure.business.checklist_adapter import BusinessChecklistAdapter
 from stock_analysis.services.screener import Screener, ScreenerConfig
-from stock_analysis.features.pipeline import Pipeline
-from stock_analysis.features.rsi import RSI
-from stock_analysis.features.macd import MACD
-from stock_analysis.features.sma import SMA
-from stock_analysis.features.volume import VolumeStatus
+from stock_analysis.features.daily import default_daily_pipeline
 
 from finnhub_news import FinnhubNewsAnalyzer
 
@@ -20,17 +19,17 @@ class AppConfig:
     max_price: float = 14.0
 
 def build_screener(min_price: float, max_price: float) -> Screener:
-    dp = YFinanceProvider()
+    dp = YFinanceProvider(bar_store=default_bar_store())
     analyzer = FinnhubNewsAnalyzer(api_key=os.getenv("FINNHUB_API_KEY", ""))
+    # STOCK_ANALYSIS_RECORD / STOCK_ANALYSIS_REPLAY: הקלטה או ניגון אופליין של כל הקריאות החיצוניות
+    call = recording_from_env()
+    if call is not None:
+        dp = RecordedDataProvider(dp, call)
+        analyzer = record_news(analyzer, call)
     checklist = BusinessChecklistAdapter()
     success = SuccessPredictorAdapter(horizon="1mo")
 
-    pipeline = Pipeline([
-        RSI(period=14, out_col="RSI"),
-        MACD(span_fast=12, span_slow=26, out_col="MACD Value"),
-        SMA(window=20), SMA(window=50), SMA(window=200),
-        VolumeStatus(out_ratio_col="Volume Ratio", out_status_col="Volume Status"),
-    ])
+    pipeline = default_daily_pipeline()
 
     cfg = ScreenerConfig(
         min_price=min_price, max_price=max_price,
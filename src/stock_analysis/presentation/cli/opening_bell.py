@@ -9,6 +9,7 @@ from ...application.config import AppConfig
 from ...application.services.live_engine import LiveEngine, EngineConfig
 from ...application.strategies.opening_bell_strategy import OpeningBellStrategy
 from ...infrastructure.feeds.yfinance_feed import YFinanceFeed
+from ...infrastructure.recording.wrappers import feed_from_env
 from ...infrastructure.sinks.console_sink import ConsoleSink
 from ...infrastructure.sinks.streamlit_sink import StreamlitSink
 from ...infrastructure.sinks.multi_sink import MultiSink
@@ -86,7 +87,7 @@ async def main() -> None:
     sink = MultiSink(sinks)
 
     engine = LiveEngine(
-        feed=YFinanceFeed(),  # עם RateLimiter בפנים
+        feed=feed_from_env(YFinanceFeed()),  # דרך ה-RateGovernor המשותף; הקלטה/ניגון לפי ENV
         sink=sink,
         strategy=OpeningBellStrategy(),
         cfg=EngineConfig(
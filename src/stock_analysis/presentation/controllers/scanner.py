@@ -1,15 +1,22 @@
 from __future__ import annotations
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from typing import List, Dict, Tuple, Optional
 import streamlit as st
 import pandas as pd
 
 from stock_utils import load_sp500_symbols, load_nasdaq_symbols
-from stock_analysis.ml.periodic_models import predict_success as predict_success_all
+from stock_analysis.ml.periodic_models import predict_success_batch
 from stock_analysis.presentation.ui.components.table import render_table
 from stock_analysis.presentation.ui.components.expanders import render_stock_expander
 from stock_analysis.presentation.plotting import plot_intraday_openingbell
 from stock_analysis.strategies import registry as strategy_registry
+from stock_analysis.strategies.benchmarks import BenchmarkCache
+from stock_analysis.infrastructure.data.sp500 import PRICES_CSV_DEFAULT, last_close_snapshot, load_sp500_sectors
+from stock_analysis.infrastructure.utils.rate_limit import default_governor
+from stock_analysis.services.staged_scan import ScanReport, StagedDailyScan
+from stock_analysis.services.enrichment import LAZY_ENRICH_TOP_N, LazyEnricher, is_deferred
 
 from stock_analysis.services.risk import build_trade_plan
 from stock_analysis.domain.entities import StrategySignal
@@ -31,8 +38,9 @@ def classify_quality(q: float | None) -> str:
 
 
 class ScannerController:
-    def __init__(self, screener) -> None:
+    def __init__(self, screener, enricher: Optional[LazyEnricher] = None) -> None:
         self.screener = screener
+        self.enricher = enricher or LazyEnricher(screener)
         self.signal_repo = SignalRepository("signals.db")
 
     # ========= Cached universes (Daily/Intraday) =========
@@ -44,8 +52,51 @@ class ScannerController:
     def _nasdaq_symbols(_self) -> List[str]:
         return load_nasdaq_symbols()
 
+    # ========= Bulk prefetch (מנות yf.download במקום בקשה לכל סימבול) =========
+    def _prefetch(self, symbols: List[str], period: str, interval: str, status) -> Tuple[List[str], Dict[str, pd.DataFrame]]:
+        """מוריד את כל ההיסטוריות מראש דרך history_many ומחזיר (סימבולים שיש להם נתונים, frames)."""
+        bulk = getattr(self.screener.data_provider, "history_many", None)
+        if bulk is None:
+            return symbols, {}
+        status.write(f"Prefetching {len(symbols)} symbols ({period} @ {interval})...")
+        try:
+            frames, missing = bulk(symbols, period=period, interval=interval)
+        except Exception:
+            return symbols, {}  # ניפול חזרה להורדה לכל סימבול
+        if missing:
+            st.caption(f"ℹ️ {len(missing)} סימבולים ללא נתונים דולגו: {', '.join(missing[:20])}")
+            skip = set(missing)
+            symbols = [s for s in symbols if s.upper() not in skip]
+        return symbols, frames
+
+    @staticmethod
+    def _rate_line() -> str:
+        g = default_governor().stats()
+        return f"Yahoo {g['rate_per_min']:.0f}/min · queue {g['queue_depth']} · throttled {g['throttle_events']}"
+
+    @staticmethod
+    def _render_report(report: ScanReport) -> None:
+        line = " → ".join(f"{s.name} {s.passed}/{s.entered} ({s.seconds:.1f}s)" for s in report.stages)
+        if line:
+            st.caption(f"📊 {line}")
+
+    @staticmethod
+    def _add_horizons(rows: List[Dict]) -> None:
+        """אופקי AI לכל השורות: מטריצה אחת ו-predict_proba אחד לכל אופק."""
+        if not rows:
+            return
+        batch = predict_success_batch(rows)
+        for res, (_, pred) in zip(rows, batch.iterrows()):
+            horizons = {p: (None if v is None or pd.isna(v) else float(v)) for p, v in pred.items()}
+            res["AI Success by Horizon (%)"] = horizons
+            res["AI 1d"] = horizons.get("1d")
+            res["AI 1mo"] = horizons.get("1mo")
+            res["AI 1y"] = horizons.get("1y")
+
     # ========= DAILY SCAN (כפי שהיה) =========
-    def _scan(self, symbols: List[str], limit: int, workers: int) -> Tuple[pd.DataFrame, List[Dict]] | Tuple[None, None]:
+    def _scan(self, symbols: List[str], limit: int, workers: int,
+              engine: str = "per_symbol", prices_csv: str = PRICES_CSV_DEFAULT,
+              lazy: bool = False, universe: Optional[str] = None) -> Tuple[pd.DataFrame, List[Dict]] | Tuple[None, None]:
         if not symbols:
             st.warning("לא נמצאו סימבולים לסריקה.")
             return None, None
@@ -56,34 +107,72 @@ class ScannerController:
         progress = st.progress(0.0)
         status = st.empty()
 
+        cfg = self.screener.cfg
+        # universe: קובייה מ-tools/build_universe_cube.py (data/cubes/<universe>) אם טרייה
+        staged = StagedDailyScan(self.screener, price_source=partial(last_close_snapshot, csv_path=prices_csv),
+                                 cube_name=universe)
         results: List[Dict] = []
-        total = len(symbols)
-        done = 0
 
-        with ThreadPoolExecutor(max_workers=workers) as ex:
-            futures = {ex.submit(self.screener.analyze_daily, sym): sym for sym in symbols}
-            for fut in as_completed(futures):
-                try:
-                    res = fut.result()
-                    if res:
-                        horizons = predict_success_all(res)
-                        res["AI Success by Horizon (%)"] = horizons
-                        res["AI 1d"] = horizons.get("1d")
-                        res["AI 1mo"] = horizons.get("1mo")
-                        res["AI 1y"] = horizons.get("1y")
-                        results.append(res)
-                except Exception:
-                    pass
-                done += 1
-                progress.progress(done / total)
-                status.write(f"Analyzed {done}/{total}")
+        if engine == "vector":
+            # שלבים: שער מחיר (snapshot) -> נרות -> טכני וקטורי -> Smart Score -> העשרה רק לשורדים
+            def _on_stage(name: str) -> None:
+                status.write(f"Stage: {name} | {self._rate_line()}")
+
+            def _on_progress(n: int, of: int) -> None:
+                progress.progress(n / max(of, 1))
+                status.write(f"Enriched {n}/{of} | {self._rate_line()}")
+
+            analyzed, report = staged.run(symbols, workers=workers, progress=_on_progress,
+                                          on_stage=_on_stage, deferred=lazy)
+            results.extend(analyzed)
+        else:
+            report = ScanReport()
+            symbols = staged.price_gate(symbols, report)
+            symbols, _ = self._prefetch(symbols, cfg.history_period, cfg.history_interval, status)
+            if not symbols:
+                progress.empty(); status.empty()
+                self._render_report(report)
+                st.warning("לא התקבלו נתוני היסטוריה לאף סימבול.")
+                return None, None
+
+            total = len(symbols)
+            done = 0
+            analyze = report.stage("analyze_daily", total)
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                futures = {ex.submit(self.screener.analyze_daily, sym, not lazy, False): sym for sym in symbols}
+                for fut in as_completed(futures):
+                    try:
+                        res = fut.result()
+                        if res:
+                            results.append(res)
+                    except Exception:
+                        pass
+                    done += 1
+                    progress.progress(done / total)
+                    status.write(f"Analyzed {done}/{total} | {self._rate_line()}")
+            analyze.passed = len(results)
+            analyze.seconds = time.perf_counter() - t0
 
         progress.empty(); status.empty()
+        self._render_report(report)
 
         if not results:
             st.warning("לא התקבלו תוצאות (ייתכן שרובן מחוץ לטווח המחיר בסיידבר).")
             return None, None
 
+        # אופקי AI לכל התוצאות בבת אחת (ולא שורה-שורה בלולאת as_completed)
+        try:
+            if engine != "vector":
+                self.screener.predict_many(results)  # ה-vector engine כבר עשה את זה בסוף enrich_many
+            self._add_horizons(results)
+        except Exception as e:
+            print(f"❌ Prediction error: {e}")
+
+        return self._results_frame(results), results
+
+    @staticmethod
+    def _results_frame(results: List[Dict]) -> pd.DataFrame:
         df = pd.DataFrame([{
             "Symbol": r.get("Symbol"),
             "Name": r.get("Name"),
@@ -113,15 +202,41 @@ class ScannerController:
 
         df = df.sort_values(by=["AI 1mo", "Smart Score", "Price (USD)"],
                             ascending=[False, False, True], na_position="last").reset_index(drop=True)
-        return df, results
+        return df
 
-    def run_sp500(self, limit: int, workers: int):
+    def run_sp500(self, limit: int, workers: int, engine: str = "per_symbol", lazy: bool = False):
         syms = self._sp500_symbols()
-        return self._scan(syms, limit, workers)
+        return self._remember(*self._scan(syms, limit, workers, engine, prices_csv=PRICES_CSV_DEFAULT, lazy=lazy,
+                                         universe="sp500"))
 
-    def run_nasdaq(self, limit: int, workers: int):
+    def run_nasdaq(self, limit: int, workers: int, engine: str = "per_symbol", lazy: bool = False):
         syms = self._nasdaq_symbols()
-        return self._scan(syms, limit, workers)
+        return self._remember(*self._scan(syms, limit, workers, engine, prices_csv="nasdaq_all.csv", lazy=lazy,
+                                         universe="nasdaq"))
+
+    # ========= תוצאות אחרונות (שורדות rerun – נדרש להעשרה לפי דרישה) =========
+    @staticmethod
+    def _remember(df: Optional[pd.DataFrame], results: Optional[List[Dict]]):
+        if df is not None and results is not None:
+            st.session_state["daily_scan"] = (df, results)
+        return df, results
+
+    @staticmethod
+    def last_results() -> Tuple[pd.DataFrame, List[Dict]] | Tuple[None, None]:
+        return st.session_state.get("daily_scan", (None, None))
+
+    def _enrich_rows(self, rows: List[Dict]) -> List[Dict]:
+        """סנטימנט + צ'קליסט לשורות deferred (במקביל, עם memo), ואז אופקי AI מחדש."""
+        pending = [r for r in rows if is_deferred(r)]
+        if not pending:
+            return []
+        with st.spinner(f"Loading sentiment + checklist for {len(pending)} symbols..."):
+            changed = self.enricher.ensure_many(pending)
+        try:
+            self._add_horizons(changed)
+        except Exception:
+            pass
+        return changed
 
     # ========= Filters + sector options (Daily) =========
     @staticmethod
@@ -151,13 +266,27 @@ class ScannerController:
 
         ai_map = {"יומי": "AI 1d", "חודשי (מחיר)": "AI 1mo", "שנתי": "AI 1y"}
         ai_col = ai_map[ai_label]
-        filtered = self.apply_filters(
-            df,
-            st.session_state.get("sector_dynamic", "הצג הכל"),
-            min_smart,
-            float(min_ai),
-            ai_col,
-        )
+
+        def _filtered(frame: pd.DataFrame) -> pd.DataFrame:
+            return self.apply_filters(
+                frame,
+                st.session_state.get("sector_dynamic", "הצג הכל"),
+                min_smart,
+                float(min_ai),
+                ai_col,
+            )
+
+        filtered = _filtered(df)
+        by_symbol = {r.get("Symbol"): r for r in results}
+        lazy = any(is_deferred(r) for r in results)
+
+        # העשרה לפי דרישה: רק ה-top N אחרי סינון (והשורות שנפתחות למטה)
+        if lazy:
+            top_syms = filtered["Symbol"].head(max(LAZY_ENRICH_TOP_N, 10)).tolist()
+            if self._enrich_rows([by_symbol[s] for s in top_syms if s in by_symbol]):
+                df = self._results_frame(results)
+                self._remember(df, results)
+                filtered = _filtered(df)
 
         render_table(filtered.drop(columns=["Business Checklist"], errors="ignore"))
         csv = filtered.to_csv(index=False).encode("utf-8-sig")
@@ -167,10 +296,19 @@ class ScannerController:
         st.markdown("---")
         for i in range(top_n):
             sym = filtered.iloc[i]["Symbol"]
-            match = next((r for r in results if r.get("Symbol") == sym), None)
+            match = by_symbol.get(sym)
             if match:
                 render_stock_expander(match)
 
+        rest = filtered["Symbol"].iloc[top_n:].tolist()
+        if lazy and rest:
+            pick = st.selectbox("🔍 פרטים על מניה נוספת (סנטימנט + צ'קליסט נטענים לפי דרישה)",
+                                ["—"] + rest, key="lazy_enrich_pick")
+            match = by_symbol.get(pick)
+            if match:
+                self._enrich_rows([match])
+                render_stock_expander(match, expanded=True)
+
     # ========= BULK INTRADAY STRATEGY SCAN =========
     def scan_strategy_universe(
         self,
@@ -199,15 +337,27 @@ class ScannerController:
         progress = st.progress(0.0)
         status = st.empty()
 
+        dp = self.screener.data_provider
+        period = getattr(self.screener.cfg, "intraday_period", "30d")
+        interval = getattr(self.screener.cfg, "intraday_interval", "5m")
+
+        symbols, _ = self._prefetch(symbols, period, interval, status)
+        if not symbols:
+            progress.empty(); status.empty()
+            st.warning("לא התקבלו נתוני אינטראדיי לאף סימבול.")
+            return None, None
+
+        # בנצ'מרקים (SPY / ETF סקטוריאלי) – פעם אחת לכל הסריקה במקום פעם לכל סימבול
+        if hasattr(strat, "with_benchmarks"):
+            benchmarks = BenchmarkCache(dp, sectors=load_sp500_sectors())
+            benchmarks.prefetch(symbols, period, interval, use_sector=getattr(strat, "sector_benchmark", False))
+            strat = strat.with_benchmarks(benchmarks)
+
         results_rows: List[Dict] = []
         raw_for_charts: List[Dict] = []
         total = len(symbols)
         done = 0
 
-        dp = self.screener.data_provider
-        period = getattr(self.screener.cfg, "intraday_period", "30d")
-        interval = getattr(self.screener.cfg, "intraday_interval", "5m")
-
         # Late reclaim detector
         try:
             from stock_analysis.strategies.openingbell_plus import detect_late_reclaim
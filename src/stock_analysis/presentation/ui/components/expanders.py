@@ -31,12 +31,13 @@ def _targeted_insights(stock: dict) -> List[Tuple[str, str]]:
     out.append(("Strategy", "Entry: MA20 pullbacks; stop < MA50; targets at swing highs."))
     return out
 
-def render_stock_expander(stock: dict) -> None:
+def render_stock_expander(stock: dict, expanded: bool = False) -> None:
     symbol = stock.get("Symbol")
     smart = stock.get("Smart Score", 0)
-    with st.expander(f"📌 {symbol} – {smart} :ציון חכם", expanded=False):
+    with st.expander(f"📌 {symbol} – {smart} :ציון חכם", expanded=expanded):
         st.caption(f"**תחזית**: {stock.get('Forecast', '—')}")
-        st.caption(f"**מדד סנטימנט**: {stock.get('Sentiment Score', 0):.2f}")
+        sentiment = stock.get("Sentiment Score")
+        st.caption(f"**מדד סנטימנט**: {sentiment:.2f}" if sentiment is not None else "**מדד סנטימנט**: —")
 
         st.markdown("**AI Success by Horizon (%)**")
         st.json(stock.get("AI Success by Horizon (%)", {}))
@@ -21,6 +21,8 @@ class UISettings:
 class ScanControls:
     max_to_scan: int
     workers: int
+    engine: str
+    lazy_enrich: bool
     run_sp500: bool
     run_nasdaq: bool
     # NEW: bulk intraday strategy controls
@@ -62,6 +64,9 @@ def sidebar() -> tuple[UISettings, ScanControls]:
         max_to_scan = st.number_input("כמות מקסימלית לסריקה", value=150, step=50, min_value=10)
         default_workers = min(8, max(2, (os.cpu_count() or 4) // 2))
         workers = st.slider("Parallel workers", 1, 16, default_workers)
+        engine_label = st.radio("מנוע סריקה", ["Per-symbol", "Vectorized"], index=0, horizontal=True)
+        lazy_enrich = st.toggle("סנטימנט + צ'קליסט לפי דרישה", value=True,
+                                help="הסריקה מחזירה טכני + ציון + AI; סנטימנט וצ'קליסט נטענים רק ל-Top N ולמניות שנפתחות")
         run_sp500 = st.button("⬇️ טען S&P 500")
         run_nasdaq = st.button("⬇️ טען NASDAQ")
 
@@ -83,6 +88,8 @@ def sidebar() -> tuple[UISettings, ScanControls]:
     scan = ScanControls(
         max_to_scan=int(max_to_scan),
         workers=int(workers),
+        engine="vector" if engine_label == "Vectorized" else "per_symbol",
+        lazy_enrich=bool(lazy_enrich),
         run_sp500=run_sp500,
         run_nasdaq=run_nasdaq,
         # NEW:
@@ -29,7 +29,7 @@ def style_bulk_df(df: pd.DataFrame):
                       "AI 1d": "{:.2f}",
                       "AI 1mo": "{:.2f}",
                       "AI 1y": "{:.2f}",
-                      "Smart Score": "{:.0f}"})
+                      "Smart Score": "{:.0f}"}, na_rep="—")
          )
     return sty
 
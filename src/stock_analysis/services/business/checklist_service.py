@@ -1,17 +1,97 @@
 # src/stock_analysis/services/business/checklist_service.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Mapping, Any, Sequence
+import os, threading, time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
 
 from stock_analysis.domain.interfaces import (
     SentimentAnalyzer, WikipediaClient, CompetitorClient, HoldersProvider
 )
 
+# ===== הגדרות (ENV) =====
+CHECKLIST_DEADLINE_SEC = float(os.getenv("CHECKLIST_DEADLINE_SEC", "6"))   # תקרה כוללת לכל המקורות החיצוניים של סימבול
+CHECKLIST_WORKERS = int(os.getenv("CHECKLIST_WORKERS", "16"))             # threads משותפים לכל הצ'קליסטים בתהליך
+CHECKLIST_QUEUE_SEC = float(os.getenv("CHECKLIST_QUEUE_SEC", "6"))         # כמה מקור יכול לחכות בתור ה-pool לפני שמוותרים עליו
+
+NA = "N/A"
+
+
+class SourceLatency:
+    """
+    מדדי latency לכל מקור חיצוני של הצ'קליסט (news / holders / competitors / wiki).
+    קריאה שחרגה מה-deadline נספרת כ-timeout, וה-latency שלה נרשם כשהיא מסתיימת בפועל –
+    כך רואים גם כמה זמן המקור האיטי באמת לוקח.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_source: Dict[str, Dict[str, float]] = {}
+
+    def _row(self, source: str) -> Dict[str, float]:
+        row = self._by_source.get(source)
+        if row is None:
+            row = {"calls": 0, "timeouts": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+            self._by_source[source] = row
+        return row
+
+    def record(self, source: str, seconds: float, error: bool = False) -> None:
+        ms = seconds * 1000.0
+        with self._lock:
+            row = self._row(source)
+            row["calls"] += 1
+            row["errors"] += int(error)
+            row["total_ms"] += ms
+            row["last_ms"] = ms
+            row["max_ms"] = max(row["max_ms"], ms)
+
+    def timeout(self, source: str) -> None:
+        with self._lock:
+            self._row(source)["timeouts"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for source, row in self._by_source.items():
+                calls = row["calls"]
+                out[source] = {
+                    "calls": int(calls), "timeouts": int(row["timeouts"]), "errors": int(row["errors"]),
+                    "avg_ms": round(row["total_ms"] / calls, 1) if calls else None,
+                    "max_ms": round(row["max_ms"], 1), "last_ms": round(row["last_ms"], 1),
+                }
+            return out
+
+
+_default_latency: Optional[SourceLatency] = None
+_pool: Optional[ThreadPoolExecutor] = None
+_default_guard = threading.Lock()
+
+def default_source_latency() -> SourceLatency:
+    """מדדי מקורות אחד לתהליך – משותף לכל מופעי ChecklistService."""
+    global _default_latency
+    with _default_guard:
+        if _default_latency is None:
+            _default_latency = SourceLatency()
+        return _default_latency
+
+def _shared_pool() -> ThreadPoolExecutor:
+    # pool משותף ולא `with ThreadPoolExecutor` לכל קריאה: יציאה מ-with מחכה למקור האיטי,
+    # וזה בדיוק מה שה-deadline אמור למנוע. קריאה שחרגה ממשיכה ברקע ומשחררת thread כשתסתיים.
+    global _pool
+    with _default_guard:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(4, CHECKLIST_WORKERS), thread_name_prefix="checklist")
+        return _pool
+
+
 @dataclass
 class ChecklistService:
     wiki: WikipediaClient
     competitors: CompetitorClient
     holders: HoldersProvider
+    deadline_sec: float = CHECKLIST_DEADLINE_SEC
+    queue_sec: float = CHECKLIST_QUEUE_SEC
+    latency: SourceLatency = field(default_factory=default_source_latency)
 
     # ---------- מודולים זהים שלך, עטופים כפונקציות פרטיות ----------
     def _analyze_basic_info(self, info: Mapping[str, Any]) -> dict:
@@ -117,19 +197,97 @@ class ChecklistService:
         except Exception:
             return "N/A"
 
+    # ---------- מקורות חיצוניים במקביל, תחת deadline ----------
+    @staticmethod
+    def _missing(source: str) -> dict:
+        """ערכי ברירת מחדל למקור שלא חזר בזמן (או נכשל)."""
+        if source == "news":
+            return {"Acquisitions / Mergers": NA, "Recent Strategic Moves": NA}
+        if source == "holders":
+            return {"Top Holders": NA, "Institutional Holdings": NA, "Recent Insider Changes": "N/A (manual or SEC API)"}
+        if source == "competitors":
+            return {"Competitors": NA}
+        return {"Background": NA, "Founded": NA}
+
+    def _timed(self, source: str, fn: Callable[[], dict], started: Dict[str, float]) -> Callable[[], dict]:
+        def call() -> dict:
+            started[source] = time.monotonic()  # שעון ה-deadline מתחיל כשהמקור באמת רץ, לא כשנכנס לתור
+            t0 = time.perf_counter()
+            try:
+                out = fn()
+            except Exception:
+                self.latency.record(source, time.perf_counter() - t0, error=True)
+                raise
+            self.latency.record(source, time.perf_counter() - t0)
+            return out
+        return call
+
+    def _fetch_external(self, symbol: str | None, news_analyzer: SentimentAnalyzer | None) -> Dict[str, dict]:
+        """
+        news / holders / competitors / wiki רצים במקביל על ה-pool המשותף.
+        כל מקור מקבל deadline_sec מהרגע שהתחיל לרוץ (סריקה עמוסה לא "אוכלת" לו את הזמן בתור),
+        ומקור שלא יצא מהתור תוך queue_sec מוותר. מקור שלא הספיק מקבל "N/A" ונספר כ-timeout;
+        מה שעוד בתור מבוטל כדי לא לתפוס thread לתוצאה שאף אחד לא יקרא.
+        """
+        if not symbol:
+            return {"competitors": {"Competitors": self._competitors(symbol)}}
+        jobs: Dict[str, Callable[[], dict]] = {}
+        if news_analyzer:
+            jobs["news"] = lambda: self._analyze_strategic_moves(symbol, news_analyzer)
+        jobs["holders"] = lambda: self._analyze_shareholders(symbol)
+        jobs["competitors"] = lambda: {"Competitors": self._competitors(symbol)}
+        jobs["wiki"] = lambda: self._wiki_data(symbol)
+
+        pool = _shared_pool()
+        started: Dict[str, float] = {}
+        queued_until = time.monotonic() + self.queue_sec
+        futures: Dict[str, Future] = {name: pool.submit(self._timed(name, fn, started)) for name, fn in jobs.items()}
+
+        expired: Dict[str, str] = {}
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            for name in list(pending):
+                running = name in started
+                if (started[name] + self.deadline_sec if running else queued_until) <= now:
+                    # עוד בתור -> cancel מוציא אותו; כבר רץ -> ימשיך ברקע וה-latency שלו יירשם כשיסתיים
+                    if futures[name].cancel() or not futures[name].done():
+                        expired[name] = f"לא הגיב תוך {self.deadline_sec:.1f}s" if running \
+                            else f"חיכה בתור {self.queue_sec:.1f}s"
+                    pending.discard(name)
+            if not pending:
+                break
+            next_due = min(started[n] + self.deadline_sec if n in started else queued_until for n in pending)
+            done, _ = wait([futures[n] for n in pending], timeout=max(0.0, next_due - now),
+                           return_when=FIRST_COMPLETED)
+            pending -= {name for name in pending if futures[name] in done}
+
+        results: Dict[str, dict] = {}
+        for name, fut in futures.items():
+            if name in expired:
+                self.latency.timeout(name)
+                print(f"⏱️ {name} {expired[name]} עבור {symbol} – N/A")
+                results[name] = self._missing(name)
+            elif fut.exception() is not None:
+                results[name] = self._missing(name)
+            else:
+                results[name] = fut.result()
+        return results
+
     # ---------- נקודת הכניסה השירותית (המקבילה ל-run_full_analysis) ----------
     def run(self, info: Mapping[str, Any], news_sentiment_score: float, symbol: str | None, news_analyzer: SentimentAnalyzer | None) -> dict:
+        external = self._fetch_external(symbol, news_analyzer)
         out = {
             **self._analyze_basic_info(info),
             **self._analyze_market(info),
             **self._analyze_management(info),
             **self._analyze_clients_suppliers(),
             **self._analyze_financials(info),
-            **(self._analyze_strategic_moves(symbol, news_analyzer) if symbol and news_analyzer else {}),
-            **(self._analyze_shareholders(symbol) if symbol else {}),
+            **external.get("news", {}),
+            **external.get("holders", {}),
             **self._analyze_sentiment_external(news_sentiment_score),
-            "Competitors": self._competitors(symbol),
-            **self._wiki_data(symbol),
+            **external["competitors"],
+            **external.get("wiki", {}),
         }
         print("✅ ניתוח צ'קליסט הושלם")
         return out
@@ -0,0 +1,89 @@
+# src/stock_analysis/services/enrichment.py
+from __future__ import annotations
+import os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from stock_analysis.infrastructure.utils.single_flight import default_flight
+
+# ===== הגדרות (ENV) =====
+LAZY_ENRICH_TTL_SEC = float(os.getenv("LAZY_ENRICH_TTL_SEC", "1800"))   # סנטימנט/צ'קליסט "טריים" לחצי שעה
+LAZY_ENRICH_TOP_N = int(os.getenv("LAZY_ENRICH_TOP_N", "10"))           # כמה שורות מובילות מעשירים אחרי סינון
+
+DEFERRED = "deferred"
+
+
+def is_deferred(row: Mapping[str, Any]) -> bool:
+    return row.get("Enrichment") == DEFERRED
+
+
+class LazyEnricher:
+    """
+    העשרה לפי דרישה לשורות שנסרקו עם deferred: סנטימנט + צ'קליסט רק לשורות שנפתחות
+    או ל-top N אחרי סינון, במקביל. התוצאה נשמרת בזיכרון לפי סימבול (TTL),
+    כך שפתיחה חוזרת של expander (או סריקה חוזרת) לא עולה אף קריאת רשת.
+    """
+
+    def __init__(self, screener, ttl_sec: float = LAZY_ENRICH_TTL_SEC, workers: int = 8) -> None:
+        self.screener = screener
+        self.ttl_sec = ttl_sec
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._memo: Dict[str, Tuple[float, Mapping[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, symbol: str) -> Optional[Mapping[str, Any]]:
+        with self._lock:
+            hit = self._memo.get(symbol)
+            if hit is not None and time.time() - hit[0] < self.ttl_sec:
+                self.hits += 1
+                return hit[1]
+            self.misses += 1
+            return None
+
+    def _fields(self, symbol: str) -> Mapping[str, Any]:
+        fields = self._cached(symbol)
+        if fields is None:
+            # שתי בקשות לאותו סימבול במקביל (שני expanders / top N) -> קריאת רשת אחת
+            fields = default_flight.do(("enrich", symbol), lambda: self.screener.enrichment_fields(symbol))
+            with self._lock:
+                self._memo[symbol] = (time.time(), fields)
+        return fields
+
+    def ensure(self, row: dict) -> bool:
+        """מעשיר שורה אחת במקום אם היא עדיין deferred. True אם השורה השתנתה."""
+        if not is_deferred(row):
+            return False
+        symbol = str(row.get("Symbol") or "").upper()
+        try:
+            self.screener.enrich(row, fields=self._fields(symbol))
+        except Exception as e:
+            print(f"❌ שגיאה בהעשרת {symbol}: {e}")
+            return False
+        return True
+
+    def ensure_many(self, rows: Sequence[dict]) -> List[dict]:
+        """מעשיר במקביל את השורות שעדיין deferred; מחזיר את אלה שהועשרו."""
+        pending = [r for r in rows if is_deferred(r)]
+        if not pending:
+            return []
+        with self._lock:
+            now = time.time()
+            cold = [str(r.get("Symbol") or "").upper() for r in pending
+                    if now - self._memo.get(str(r.get("Symbol") or "").upper(), (0.0, None))[0] >= self.ttl_sec]
+        self.screener.prefetch_news(cold)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(pending)))) as ex:
+            changed = list(ex.map(self.ensure, pending))
+        return [r for r, ok in zip(pending, changed) if ok]
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(symbol.upper(), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"memo": len(self._memo), "hits": self.hits, "misses": self.misses}
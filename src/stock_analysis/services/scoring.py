@@ -1,5 +1,9 @@
 # src/stock_analysis/services/scoring.py
 from __future__ import annotations
+from typing import Mapping
+import numpy as np
+
+SCORED_SECTORS = ["Technology", "Healthcare", "Communication Services"]
 
 class ScoringPolicy:
     """מחשב 'Smart Score' לפי הקריטריונים המקוריים שלך."""
@@ -20,10 +24,28 @@ class ScoringPolicy:
             score += 10
         if stock.get("Free Cash Flow", 0) and stock["Free Cash Flow"] > 0:
             score += 10
-        if stock.get("Sector") in ["Technology", "Healthcare", "Communication Services"]:
+        if stock.get("Sector") in SCORED_SECTORS:
             score += 10
         pe = stock.get("P/E Ratio")
         if pe is not None and pe < 20:
             score += 10
         # הדפסה מפורטת נשארת אופציונלית בשכבת ה-CLI/UI
         return score
+
+    def score_vector(self, cols: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        אותם קריטריונים כמו score(), כמסכות על מערכים (שורה לכל מניה).
+        ערך חסר = NaN (או False בעמודות בוליאניות) ולא מקבל נקודות – כמו None/NaN ב-score().
+        """
+        with np.errstate(invalid="ignore"):
+            rsi = np.asarray(cols["RSI"], dtype=float)
+            score = np.where((rsi >= 30) & (rsi <= 50), 10, 0)
+            score += np.where(np.asarray(cols["MACD Positive"], dtype=bool), 10, 0)
+            score += np.where(np.asarray(cols["MA20 > MA200"], dtype=bool), 15, 0)
+            score += np.where(np.asarray(cols["MA50 > MA200"], dtype=bool), 10, 0)
+            score += np.where(np.asarray(cols["Revenue Growth (%)"], dtype=float) > 10, 15, 0)
+            score += np.where(np.asarray(cols["Profit Margin (%)"], dtype=float) > 5, 10, 0)
+            score += np.where(np.asarray(cols["Free Cash Flow"], dtype=float) > 0, 10, 0)
+            score += np.where(np.isin(np.asarray(cols["Sector"], dtype=object), SCORED_SECTORS), 10, 0)
+            score += np.where(np.asarray(cols["P/E Ratio"], dtype=float) < 20, 10, 0)
+        return score.astype(int)
@@ -1,12 +1,14 @@
 # src/stock_analysis/services/screener.py
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Mapping, Any, Optional
+from typing import Mapping, Any, List, Optional, Sequence
 import pandas as pd
 
 from stock_analysis.domain.interfaces import DataProvider, SentimentAnalyzer, BusinessChecklist, SuccessPredictor
 from stock_analysis.services.scoring import ScoringPolicy
 from stock_analysis.features.pipeline import Pipeline
+from stock_analysis.features.sma import last_sma
+from stock_analysis.features.cache import FeatureCache, default_feature_cache
 
 # שימוש בשכבת התאימות כדי לא לשבור כלום
 from stock_utils import generate_forecast  # compat layer (ממפה ל-utils/forecast)
@@ -31,10 +33,16 @@ class Screener:
     daily_pipeline: Optional[Pipeline] = None
     scoring: ScoringPolicy = field(default_factory=ScoringPolicy)
     cfg: ScreenerConfig = field(default_factory=ScreenerConfig)
+    features: FeatureCache = field(default_factory=default_feature_cache)
 
 
     # ---------- DAILY ANALYZE (כמו stock_analysis_engine הישן) ----------
-    def analyze_daily(self, symbol: str) -> dict | None:
+    def analyze_daily(self, symbol: str, enrich: bool = True, predict: bool = True) -> dict | None:
+        """
+        enrich=False: מחזיר טכני + ציון + AI בלבד; סנטימנט וצ'קליסט (4+ קריאות רשת)
+        נשארים None עם "Enrichment"="deferred" ומחושבים אחר כך דרך enrich().
+        predict=False: בלי מודל לשורה; סריקה מרוכזת מחשבת אחר כך predict_many לכל התוצאות.
+        """
         try:
             info = self.data_provider.info(symbol)
             hist = self.data_provider.history(symbol, period=self.cfg.history_period, interval=self.cfg.history_interval)
@@ -51,16 +59,14 @@ class Screener:
                 print(f"⛔ מחיר {price} לא בטווח: {self.cfg.min_price}–{self.cfg.max_price}")
                 return None
 
-            # הפעלת Pipeline אם סופק (מוסיף עמודות כמו RSI/MACD/SMA וכו')
-            df = hist.copy()
-            df.columns = [c.title() for c in df.columns]  # Ensure ['Open','High','Low','Close','Volume']
-            if self.daily_pipeline:
-                df = self.daily_pipeline.run(df)
+            # הפעלת Pipeline אם סופק (מוסיף עמודות כמו RSI/MACD/SMA וכו') – דרך ה-FeatureCache:
+            # אותם נרות + אותו Pipeline -> אותו DataFrame בלי חישוב מחדש
+            df = self.features.run(symbol, hist, self.daily_pipeline)
 
-            # שליפות ערכים אחרונים לפי שמות עמודות הצפויים
-            ma20  = df["Close"].rolling(20).mean().iloc[-1]
-            ma50  = df["Close"].rolling(50).mean().iloc[-1]
-            ma200 = df["Close"].rolling(200).mean().iloc[-1]
+            # שליפות ערכים אחרונים לפי שמות עמודות הצפויים (SMA_20/50/200 מה-Pipeline אם קיימות)
+            ma20  = last_sma(df, 20)
+            ma50  = last_sma(df, 50)
+            ma200 = last_sma(df, 200)
             rsi_last = float(df.get("RSI", pd.Series([None])).iloc[-1]) if "RSI" in df else None
             macd_last = float(df.get("MACD Value", df.get("MACD", pd.Series([None]))).iloc[-1]) if (("MACD Value" in df) or ("MACD" in df)) else None
             # נפח – ייתכן שנוסף ע"י step או נחשב מהיסטוריה
@@ -74,13 +80,6 @@ class Screener:
                 volume_ratio = round(latest_volume / avg_volume, 2) if avg_volume else 0.0
                 volume_status = "High" if volume_ratio > 1.5 else "Normal"
 
-            # סנטימנט
-            sentiment_data, _ = self.sentiment_analyzer.run_full_analysis(symbol)
-            sentiment_score = float(sentiment_data.get("Sentiment Score", 0.0))
-
-            # צ'קליסט עסקי
-            checklist = self.business_checklist(info, sentiment_score, symbol, self.sentiment_analyzer)
-
             stock: dict[str, Any] = {
                 "Symbol": symbol,
                 "Name": info.get("shortName", ""),
@@ -99,14 +98,17 @@ class Screener:
                 "MACD Value": macd_last,
                 "Volume Ratio": volume_ratio,
                 "Volume Status": volume_status,
-                "Sentiment Score": sentiment_score,
+                "Sentiment Score": None,
                 "History": df,  # שומר את ה-DF המעובד (כולל פיצ’רים) לשימוש ב-UI
-                "Business Checklist": checklist,
+                "Business Checklist": None,
             }
 
             stock["Smart Score"] = self.scoring.score(stock)
-            stock["Forecast"] = generate_forecast(stock["Smart Score"], stock["Sentiment Score"])
-            stock["AI Success Probability (%)"] = self.success_predictor.predict_success(stock)
+            if enrich:
+                self.enrich(stock, info, predict=predict)
+            else:
+                stock["Enrichment"] = "deferred"
+                self.finalize(stock, predict=predict)
 
             print("✅ ניקוד מפורט:", stock["Symbol"], stock["Smart Score"])
             return stock
@@ -115,6 +117,60 @@ class Screener:
             print(f"❌ שגיאה בניתוח מניה {symbol}: {e}")
             return None
 
+    # ---------- ENRICHMENT (סנטימנט + צ'קליסט – החלק האיטי) ----------
+    def enrichment_fields(self, symbol: str, info: Optional[Mapping[str, Any]] = None) -> dict:
+        """סנטימנט + צ'קליסט עסקי לסימבול (Finnhub/Wikipedia/TipRanks/holders)."""
+        if info is None:
+            info = self.data_provider.info(symbol)
+        sentiment_data, _ = self.sentiment_analyzer.run_full_analysis(symbol)
+        sentiment_score = float(sentiment_data.get("Sentiment Score", 0.0))
+        checklist = self.business_checklist(info, sentiment_score, symbol, self.sentiment_analyzer)
+        return {"Sentiment Score": sentiment_score, "Business Checklist": checklist}
+
+    def prefetch_news(self, symbols: Sequence[str]) -> None:
+        """
+        חדשות לכמה סימבולים במקביל לפני העשרה מרובה (אם ה-analyzer תומך ב-fetch_news_many):
+        ה-run_full_analysis / הצ'קליסט של כל שורה קוראים אחר כך מה-cache של Finnhub בלי רשת.
+        """
+        many = getattr(self.sentiment_analyzer, "fetch_news_many", None)
+        if many is None or not symbols:
+            return
+        try:
+            many(symbols)
+        except Exception as e:
+            print(f"❌ שגיאה בשליפת חדשות מרוכזת: {e}")
+
+    def enrich(self, stock: dict, info: Optional[Mapping[str, Any]] = None,
+               fields: Optional[Mapping[str, Any]] = None, predict: bool = True) -> dict:
+        """ממלא סנטימנט וצ'קליסט ב-dict (במקום) ומחשב מחדש Forecast/AI שתלויים בסנטימנט."""
+        stock.update(fields if fields is not None else self.enrichment_fields(stock["Symbol"], info))
+        stock.pop("Enrichment", None)
+        return self.finalize(stock, predict=predict)
+
+    @staticmethod
+    def _model_row(stock: Mapping[str, Any]) -> dict:
+        # כל עוד אין סנטימנט – מניחים ניטרלי (0)
+        sentiment = stock.get("Sentiment Score")
+        return {**stock, "Sentiment Score": 0.0 if sentiment is None else float(sentiment)}
+
+    def finalize(self, stock: dict, predict: bool = True) -> dict:
+        """Forecast + AI; כל עוד אין סנטימנט – מניחים ניטרלי (0)."""
+        row = self._model_row(stock)
+        stock["Forecast"] = generate_forecast(stock["Smart Score"], row["Sentiment Score"])
+        stock["AI Success Probability (%)"] = self.success_predictor.predict_success(row) if predict else None
+        return stock
+
+    def predict_many(self, stocks: Sequence[dict]) -> List[dict]:
+        """AI Success Probability לכל השורות בקריאה אחת למודל (אם ה-predictor תומך ב-batch)."""
+        if not stocks:
+            return list(stocks)
+        rows = [self._model_row(s) for s in stocks]
+        many = getattr(self.success_predictor, "predict_success_many", None)
+        probs = many(rows) if many is not None else [self.success_predictor.predict_success(r) for r in rows]
+        for stock, prob in zip(stocks, probs):
+            stock["AI Success Probability (%)"] = prob
+        return list(stocks)
+
     # ---------- INTRADAY + STRATEGY (למשל OpeningBell) ----------
     def analyze_intraday_with_strategy(self, symbol: str, strategy_name: str) -> Optional[pd.DataFrame]:
         """מריץ אסטרטגיית אינטרדיי על נרות 5m (או לפי cfg)."""
@@ -0,0 +1,132 @@
+# src/stock_analysis/services/staged_scan.py
+from __future__ import annotations
+import os, time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from stock_analysis.infrastructure.data.universe_cube import open_fresh
+from stock_analysis.services.vector_screener import VectorDailyScreener, pack_cube, pack_right_aligned, stack_packed
+
+# שער המחיר הראשון נשען על snapshot (סגירה אחרונה) – מרווח כדי לא לפספס מניות שזזו מאז
+PRICE_GATE_TOLERANCE = float(os.getenv("PRICE_GATE_TOLERANCE", "0.10"))
+
+PriceSource = Callable[[List[str]], Mapping[str, float]]
+
+
+@dataclass
+class StageStats:
+    name: str
+    entered: int = 0
+    passed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rejected(self) -> int:
+        return self.entered - self.passed
+
+
+@dataclass
+class ScanReport:
+    stages: List[StageStats] = field(default_factory=list)
+
+    def stage(self, name: str, entered: int) -> StageStats:
+        st = StageStats(name=name, entered=entered)
+        self.stages.append(st)
+        return st
+
+    def as_rows(self) -> List[dict]:
+        return [{"Stage": s.name, "In": s.entered, "Out": s.passed, "Rejected": s.rejected,
+                 "Seconds": round(s.seconds, 2)} for s in self.stages]
+
+
+class _timed:
+    def __init__(self, stats: StageStats) -> None:
+        self.stats = stats
+
+    def __enter__(self) -> StageStats:
+        self._t0 = time.perf_counter()
+        return self.stats
+
+    def __exit__(self, *exc) -> None:
+        self.stats.seconds = time.perf_counter() - self._t0
+
+
+class StagedDailyScan:
+    """
+    סריקה יומית בשלבים מפורשים, מהזול ליקר – כל שלב מקבל רק את מי ששרד את הקודם:
+      1) price_gate  – מחיר מ-snapshot/quote מרוכז (בלי .info ובלי היסטוריה)
+      2) bars        – UniverseCube של ה-universe אם יש טרייה (cube_name), history_many רק למה שחסר בה
+      3) technicals  – אינדיקטורים וקטוריים + 200 נרות + שער מחיר מדויק
+      4) scoring     – info (cache) + Smart Score וקטורי
+      5) enrichment  – סנטימנט, צ'קליסט ומודלים (רשת איטית) – אחרון; deferred=True דוחה
+                       את הסנטימנט והצ'קליסט ל-LazyEnricher (לפי דרישה)
+    """
+
+    def __init__(self, screener, price_source: Optional[PriceSource] = None,
+                 tolerance: float = PRICE_GATE_TOLERANCE, cube_name: Optional[str] = None) -> None:
+        self.screener = screener
+        self.price_source = price_source
+        self.tolerance = tolerance
+        self.cube_name = cube_name
+        self.engine = VectorDailyScreener(screener)
+
+    def price_gate(self, symbols: Sequence[str], report: ScanReport) -> List[str]:
+        symbols = list(symbols)
+        with _timed(report.stage("price_gate", len(symbols))) as st:
+            if self.price_source is None:
+                st.passed = len(symbols)
+                return symbols
+            try:
+                prices = self.price_source(symbols)
+            except Exception:
+                prices = {}
+            lo = self.screener.cfg.min_price * (1.0 - self.tolerance)
+            hi = self.screener.cfg.max_price * (1.0 + self.tolerance)
+            # אין מחיר ב-snapshot -> לא פוסלים כאן; שלב הנרות יחליט
+            out = [s for s in symbols if s.upper() not in prices or lo <= prices[s.upper()] <= hi]
+            st.passed = len(out)
+            return out
+
+    def run(self, symbols: Sequence[str], workers: int = 8,
+            progress: Optional[Callable[[int, int], None]] = None,
+            on_stage: Optional[Callable[[str], None]] = None,
+            deferred: bool = False) -> Tuple[List[dict], ScanReport]:
+        cfg = self.screener.cfg
+        report = ScanReport()
+        notify = on_stage or (lambda _name: None)
+
+        notify("price_gate")
+        survivors = self.price_gate(symbols, report)
+
+        notify("bars")
+        with _timed(report.stage("bars", len(survivors))) as st:
+            cube = open_fresh(self.cube_name, cfg.history_period, cfg.history_interval) if self.cube_name else None
+            in_cube = [s for s in survivors if cube is not None and cube.index_of(s) is not None]
+            rest = [s for s in survivors if cube is None or cube.index_of(s) is None]
+            frames: Dict = {}
+            if rest:
+                frames, _missing = self.screener.data_provider.history_many(
+                    rest, period=cfg.history_period, interval=cfg.history_interval,
+                )
+            st.passed = len(in_cube) + len(frames)
+
+        notify("technicals")
+        with _timed(report.stage("technicals", st.passed)) as st:
+            packed = pack_cube(cube, in_cube) if in_cube else ([], {}, None)
+            syms, arrays, counts = stack_packed(packed, pack_right_aligned(frames))
+            passed, tech = self.engine.technical_table(syms, arrays, counts) if syms else ([], {})
+            st.passed = len(passed)
+
+        notify("scoring")
+        with _timed(report.stage("scoring", len(passed))) as st:
+            rows = self.engine.score_table(passed, tech, workers)
+            st.passed = len(rows)
+
+        notify("enrichment")
+        with _timed(report.stage("enrichment", len(rows))) as st:
+            # נרות לפי סימבול רק לשורדים שהגיעו מהקובייה (לפיצ'רים ולגרפים)
+            hist = {sym: frames[sym] if sym in frames else cube.frame(sym) for sym, *_ in rows}
+            results = self.engine.enrich_many(rows, hist, workers, progress, deferred)
+            st.passed = len(results)
+
+        return results, report
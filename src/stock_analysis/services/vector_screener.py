@@ -0,0 +1,282 @@
+# src/stock_analysis/services/vector_screener.py
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from stock_analysis.features.rsi import RSI
+from stock_analysis.features.macd import MACD
+from stock_analysis.features.volume import VolumeStatus
+
+MIN_HISTORY_BARS = 200   # כמו analyze_daily: פחות מ-200 נרות -> לא נסרק
+
+# (symbol, info, ערכים טכניים, Smart Score) – שורה שעברה ניקוד וממתינה להעשרה
+ScoredRow = Tuple[str, Mapping[str, Any], Dict[str, Any], int]
+
+
+# ---------- הכנת מערכים ----------
+def pack_right_aligned(frames: Mapping[str, pd.DataFrame],
+                       fields: Sequence[str] = ("Close", "Volume")) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+    """
+    אורז DataFrames לפי סימבול למטריצות symbols × bars מיושרות לימין:
+    העמודה האחרונה היא הנר האחרון של כל מניה, והחוסר מרופד ב-NaN משמאל.
+    כך חלון rolling על העמודות האחרונות שווה בדיוק לחישוב על הסדרה של המניה עצמה.
+    מחזיר (symbols, {field: matrix}, counts).
+    """
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    counts = np.array([len(frames[s]) for s in symbols], dtype=np.int64)
+    width = int(counts.max()) if len(counts) else 0
+    out: Dict[str, np.ndarray] = {}
+    for f in fields:
+        m = np.full((len(symbols), width), np.nan)
+        for i, s in enumerate(symbols):
+            df = frames[s]
+            col = f if f in df.columns else f.lower()
+            m[i, width - len(df):] = df[col].to_numpy(dtype=np.float64)
+        out[f] = m
+    return symbols, out, counts
+
+
+def pack_cube(cube, symbols: Optional[Sequence[str]] = None,
+              fields: Sequence[str] = ("Close", "Volume")) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+    """כמו pack_right_aligned אבל מתוך UniverseCube (ציר זמן משותף): דוחף את ה-NaN של כל שורה שמאלה."""
+    names = list(symbols) if symbols is not None else list(cube.symbols)
+    keep = [(s, r) for s, r in ((s, cube.index_of(s)) for s in names) if r is not None]
+    if not keep:
+        return [], {f: np.empty((0, 0)) for f in fields}, np.empty(0, dtype=np.int64)
+    idx = np.array([r for _, r in keep], dtype=np.int64)
+    raw = {f: np.asarray(cube.field(f)[idx], dtype=np.float64) for f in fields}
+    exists = np.zeros(raw[fields[0]].shape, dtype=bool)
+    for m in raw.values():
+        exists |= ~np.isnan(m)
+    # מיון יציב: שורות שאינן קיימות (False) קודם, והנרות הקיימים שומרים על הסדר
+    order = np.argsort(exists, axis=1, kind="stable")
+    out = {f: np.take_along_axis(m, order, axis=1) for f, m in raw.items()}
+    return [s.upper() for s, _ in keep], out, exists.sum(axis=1)
+
+
+def stack_packed(*packs: Tuple[List[str], Dict[str, np.ndarray], np.ndarray]
+                 ) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+    """מאחד כמה תוצאות pack_* (למשל קובייה + השלמה מ-history_many) – ריפוד NaN משמאל לרוחב המקסימלי."""
+    packs = [p for p in packs if p[0]]
+    if len(packs) <= 1:
+        return packs[0] if packs else ([], {}, np.empty(0, dtype=np.int64))
+    fields = list(packs[0][1])
+    width = max(p[1][fields[0]].shape[1] for p in packs)
+    out: Dict[str, np.ndarray] = {}
+    for f in fields:
+        parts = []
+        for _, arrays, _ in packs:
+            m = arrays[f]
+            parts.append(np.hstack([np.full((m.shape[0], width - m.shape[1]), np.nan), m]))
+        out[f] = np.vstack(parts)
+    symbols = [s for p in packs for s in p[0]]
+    return symbols, out, np.concatenate([p[2] for p in packs])
+
+
+# ---------- אינדיקטורים וקטוריים ----------
+@dataclass
+class DailyTechnicalParams:
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    volume_high: float = 1.5
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> "DailyTechnicalParams":
+        """קורא את הפרמטרים מה-daily_pipeline של ה-Screener, כדי ששני המנועים יחשבו אותו דבר."""
+        p = cls()
+        for step in getattr(pipeline, "steps", []) or []:
+            if isinstance(step, RSI):
+                p.rsi_period = step.period
+            elif isinstance(step, MACD):
+                p.macd_fast, p.macd_slow = step.span_fast, step.span_slow
+            elif isinstance(step, VolumeStatus):
+                p.volume_high = step.high_threshold
+        return p
+
+
+def _ewm_last(x: np.ndarray, span: int) -> np.ndarray:
+    # ewm(span, adjust=True).mean() בנקודה האחרונה: ממוצע משוקלל (1-a)^k, NaN לא נספר
+    alpha = 2.0 / (span + 1.0)
+    w = (1.0 - alpha) ** np.arange(x.shape[1] - 1, -1, -1, dtype=np.float64)
+    valid = ~np.isnan(x)
+    num = np.where(valid, x, 0.0) @ w
+    den = valid.astype(np.float64) @ w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return num / den
+
+
+def daily_technicals(close: np.ndarray, volume: np.ndarray,
+                     params: DailyTechnicalParams = DailyTechnicalParams()) -> Dict[str, np.ndarray]:
+    """
+    כל העמודות הטכניות של analyze_daily לנר האחרון, לכל ה-universe בבת אחת.
+    close/volume: מטריצות symbols × bars מיושרות לימין (pack_right_aligned / pack_cube).
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ma20 = close[:, -20:].mean(axis=1)
+        ma50 = close[:, -50:].mean(axis=1)
+        ma200 = close[:, -200:].mean(axis=1)
+
+        # RSI בנוסחה של features/rsi.py: ממוצע פשוט של רווחים/הפסדים (NaN -> 0 כמו where)
+        p = params.rsi_period
+        delta = np.diff(close[:, -(p + 1):], axis=1)
+        gain = np.where(delta > 0, delta, 0.0).mean(axis=1)
+        loss = np.where(delta < 0, -delta, 0.0).mean(axis=1)
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+
+        macd = _ewm_last(close, params.macd_fast) - _ewm_last(close, params.macd_slow)
+
+        avg_vol = np.nanmean(volume, axis=1)
+        ratio = np.where(avg_vol == 0, 0.0, volume[:, -1] / avg_vol)
+
+    return {
+        "Price": close[:, -1],
+        "MA20 > MA200": (ma20 > ma200) & (ma20 != 0) & (ma200 != 0),
+        "MA50 > MA200": (ma50 > ma200) & (ma50 != 0) & (ma200 != 0),
+        "RSI": rsi,
+        "MACD Value": macd,
+        "MACD Positive": macd > 0,
+        "Volume Ratio": ratio,
+    }
+
+
+def _num(v: Any) -> float:
+    try:
+        return float(v) if v is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# ---------- מנוע הסריקה ----------
+class VectorDailyScreener:
+    """
+    מנוע חלופי ל-Screener.analyze_daily בסריקה מרובה:
+    טכני + שער מחיר + Smart Score כפעולות numpy על כל ה-universe,
+    וההעשרה (info, סנטימנט, צ'קליסט, מודל) רק לשורדים. מחזיר אותם dicts כמו analyze_daily.
+    המחיר הוא Close של הנר היומי האחרון (אותו מקור ש-last_price משתמש בו כשהנרות טריים).
+    """
+
+    def __init__(self, screener) -> None:
+        self.screener = screener
+        self.params = DailyTechnicalParams.from_pipeline(screener.daily_pipeline)
+
+    def technical_table(self, symbols: Sequence[str], arrays: Mapping[str, np.ndarray],
+                        counts: np.ndarray) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """שלב וקטורי: אינדיקטורים + מסכות היסטוריה ומחיר. מחזיר רק שורות שעברו."""
+        cfg = self.screener.cfg
+        tech = daily_technicals(arrays["Close"], arrays["Volume"], self.params)
+        price = tech["Price"]
+        with np.errstate(invalid="ignore"):
+            mask = (counts >= MIN_HISTORY_BARS) & (price > 0) & (price >= cfg.min_price) & (price <= cfg.max_price)
+        keep = np.flatnonzero(mask)
+        return [symbols[i] for i in keep], {k: v[keep] for k, v in tech.items()}
+
+    def score_table(self, passed: Sequence[str], tech: Mapping[str, np.ndarray],
+                    workers: int = 8) -> List[ScoredRow]:
+        """שלב ניקוד: info (מה-cache המשותף) + Smart Score וקטורי. מחזיר רק שורות שאפשר לנקד."""
+        if not passed:
+            return []
+        dp = self.screener.data_provider
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            infos = list(ex.map(lambda s: self._safe_info(dp, s), passed))
+
+        fund = {
+            "Revenue Growth (%)": np.array([_num(i.get("revenueGrowth")) * 100 if i.get("revenueGrowth") else 0.0
+                                            for i in infos]),
+            "Profit Margin (%)": np.array([round(i["profitMargins"] * 100, 2) if i.get("profitMargins") else np.nan
+                                           for i in infos]),
+            "Free Cash Flow": np.array([_num(i.get("freeCashflow")) for i in infos]),
+            "Sector": np.array([i.get("sector") for i in infos], dtype=object),
+            "P/E Ratio": np.array([_num(i.get("trailingPE")) for i in infos]),
+        }
+        # score() רואה RSI מעוגל ל-2 ספרות – מעגלים גם כאן כדי שהגבולות 30/50 ייפלו אותו דבר
+        scores = self.screener.scoring.score_vector({**tech, "RSI": np.round(tech["RSI"], 2), **fund})
+        # analyze_daily נופל (ומחזיר None) כש-Profit Margin חסר – שומרים על אותה תוצאה
+        ok = ~np.isnan(fund["Profit Margin (%)"])
+        return [(passed[j], infos[j], {k: v[j] for k, v in tech.items()}, int(scores[j]))
+                for j in np.flatnonzero(ok)]
+
+    def enrich_many(self, rows: Sequence[ScoredRow], frames: Mapping[str, pd.DataFrame], workers: int = 8,
+                    progress: Optional[Callable[[int, int], None]] = None, deferred: bool = False,
+                    predict: bool = True) -> List[dict]:
+        """
+        שלב העשרה (רשת איטית): סנטימנט, צ'קליסט ומודל – רק לשורות ששרדו.
+        deferred=True: בלי סנטימנט/צ'קליסט (יחושבו לפי דרישה דרך LazyEnricher).
+        predict=True: המודל רץ פעם אחת על כל השורות בסוף (predict_many), לא בכל worker.
+        """
+        done = 0
+        results: List[dict] = []
+        if not deferred:
+            self.screener.prefetch_news([sym for sym, *_ in rows])
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            futures = [ex.submit(self._enrich, sym, info, tech, score, frames[sym], deferred, False) for sym, info, tech, score in rows]
+            for fut in futures:
+                try:
+                    res = fut.result()
+                    if res:
+                        results.append(res)
+                except Exception:
+                    pass
+                done += 1
+                if progress:
+                    progress(done, len(rows))
+        if predict:
+            self.screener.predict_many(results)
+        return results
+
+    def scan(self, frames: Mapping[str, pd.DataFrame], workers: int = 8,
+             progress: Optional[Callable[[int, int], None]] = None, deferred: bool = False) -> List[dict]:
+        symbols, arrays, counts = pack_right_aligned(frames)
+        passed, tech = self.technical_table(symbols, arrays, counts)
+        rows = self.score_table(passed, tech, workers)
+        return self.enrich_many(rows, frames, workers, progress, deferred)
+
+    @staticmethod
+    def _safe_info(dp, symbol: str) -> Mapping[str, Any]:
+        try:
+            return dp.info(symbol) or {}
+        except Exception:
+            return {}
+
+    def _enrich(self, symbol: str, info: Mapping[str, Any], tech: Mapping[str, Any],
+                smart_score: int, hist: pd.DataFrame, deferred: bool = False,
+                predict: bool = True) -> dict | None:
+        sc = self.screener
+        try:
+            df = sc.features.run(symbol, hist, sc.daily_pipeline)
+
+            rsi = float(tech["RSI"])
+            ratio = round(float(tech["Volume Ratio"]), 2)
+            stock: dict[str, Any] = {
+                "Symbol": symbol,
+                "Name": info.get("shortName", ""),
+                "Price (USD)": round(float(tech["Price"]), 2),
+                "P/E Ratio": info.get("trailingPE"),
+                "EPS": info.get("trailingEps"),
+                "Profit Margin (%)": round(info.get("profitMargins", 0) * 100, 2) if info.get("profitMargins") else None,
+                "Beta": info.get("beta"),
+                "Sector": info.get("sector"),
+                "Free Cash Flow": info.get("freeCashflow"),
+                "Revenue Growth (%)": info.get("revenueGrowth", 0) * 100 if info.get("revenueGrowth") else 0,
+                "MA20 > MA200": bool(tech["MA20 > MA200"]),
+                "MA50 > MA200": bool(tech["MA50 > MA200"]),
+                "RSI": round(rsi, 2),
+                "MACD Positive": bool(tech["MACD Positive"]),
+                "MACD Value": float(tech["MACD Value"]),
+                "Volume Ratio": ratio,
+                "Volume Status": "High" if ratio > self.params.volume_high else "Normal",
+                "Sentiment Score": None,
+                "History": df,
+                "Business Checklist": None,
+                "Smart Score": smart_score,
+            }
+            if deferred:
+                stock["Enrichment"] = "deferred"
+                return sc.finalize(stock, predict=predict)
+            return sc.enrich(stock, info, predict=predict)
+        except Exception as e:
+            print(f"❌ שגיאה בניתוח מניה {symbol}: {e}")
+            return None
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import os, threading, time
+from datetime import date, datetime
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import pandas as pd
+import pytz
+
+# ===== הגדרות (ENV) =====
+BENCHMARK_RETRY_SEC = float(os.getenv("BENCHMARK_RETRY_SEC", "30"))  # הורדה שנכשלה/ריקה לא נשמרת; ניסיון חוזר אחרי זה
+
+US_EASTERN = pytz.timezone("US/Eastern")
+DEFAULT_BENCHMARK = "SPY"
+
+# ETF סקטוריאלי (SPDR) – גם שמות GICS (ויקיפדיה) וגם שמות הסקטורים של yfinance
+SECTOR_ETFS: Dict[str, str] = {
+    "Information Technology": "XLK", "Technology": "XLK",
+    "Health Care": "XLV", "Healthcare": "XLV",
+    "Financials": "XLF", "Financial Services": "XLF",
+    "Consumer Discretionary": "XLY", "Consumer Cyclical": "XLY",
+    "Consumer Staples": "XLP", "Consumer Defensive": "XLP",
+    "Communication Services": "XLC",
+    "Industrials": "XLI",
+    "Energy": "XLE",
+    "Utilities": "XLU",
+    "Real Estate": "XLRE",
+    "Materials": "XLB", "Basic Materials": "XLB",
+}
+
+
+class BenchmarkCache:
+    """
+    Cache לנרות בנצ'מרק בתחום של סריקה אחת (או יום מסחר אחד):
+    כל בנצ'מרק (SPY / ETF סקטוריאלי) מורד פעם אחת ומשותף לכל ה-workers.
+    הורדה שנכשלה (או חזרה ריקה) לא נשמרת: ה-workers מקבלים DataFrame ריק רק עד retry_sec,
+    ואז הקריאה הבאה מנסה שוב – תקלת רשת רגעית לא משביתה את הבנצ'מרק עד סוף היום.
+    """
+
+    def __init__(self, data_provider, sectors: Optional[Mapping[str, str]] = None,
+                 default_symbol: str = DEFAULT_BENCHMARK, retry_sec: float = BENCHMARK_RETRY_SEC) -> None:
+        self.dp = data_provider
+        self.sectors = {k.upper(): v for k, v in (sectors or {}).items()}
+        self.default_symbol = default_symbol
+        self.retry_sec = retry_sec
+        self.session_date: date = datetime.now(US_EASTERN).date()
+        self._frames: Dict[Tuple[str, str, str], pd.DataFrame] = {}
+        self._locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._failed: Dict[Tuple[str, str, str], float] = {}  # key -> מתי נכשל (monotonic)
+        self._guard = threading.Lock()
+        self.fetches = 0
+
+    def symbol_for(self, symbol: str, use_sector: bool = False) -> str:
+        if use_sector:
+            etf = SECTOR_ETFS.get(self.sectors.get((symbol or "").upper(), ""))
+            if etf:
+                return etf
+        return self.default_symbol
+
+    def _roll_session(self) -> None:
+        # יום מסחר חדש -> הנתונים הישנים כבר לא רלוונטיים
+        today = datetime.now(US_EASTERN).date()
+        if today != self.session_date:
+            self._frames.clear()
+            self._locks.clear()
+            self._failed.clear()
+            self.session_date = today
+
+    def _recently_failed(self, key: Tuple[str, str, str]) -> bool:
+        failed_at = self._failed.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < self.retry_sec
+
+    def get(self, bench: str, period: str, interval: str) -> pd.DataFrame:
+        key = (bench, period, interval)
+        with self._guard:
+            self._roll_session()
+            if key in self._frames:
+                return self._frames[key]
+            if self._recently_failed(key):
+                return pd.DataFrame()
+            lock = self._locks.setdefault(key, threading.Lock())
+        # רק ה-worker הראשון מוריד; האחרים ממתינים על אותה נעילה ואז קוראים מה-cache
+        with lock:
+            with self._guard:
+                if key in self._frames:
+                    return self._frames[key]
+                if self._recently_failed(key):
+                    return pd.DataFrame()
+            try:
+                df = self.dp.history(bench, period=period, interval=interval)
+            except Exception:
+                df = None
+            with self._guard:
+                self.fetches += 1
+                if df is None or df.empty:
+                    self._failed[key] = time.monotonic()
+                    return pd.DataFrame()
+                self._frames[key] = df
+                self._failed.pop(key, None)
+            return df
+
+    def for_symbol(self, symbol: str, period: str, interval: str,
+                   use_sector: bool = False) -> Tuple[str, pd.DataFrame]:
+        bench = self.symbol_for(symbol, use_sector)
+        df = self.get(bench, period, interval)
+        if (df is None or df.empty) and bench != self.default_symbol:
+            bench = self.default_symbol
+            df = self.get(bench, period, interval)
+        return bench, df
+
+    def prefetch(self, symbols: Iterable[str], period: str, interval: str, use_sector: bool = False) -> None:
+        """מוריד מראש את כל הבנצ'מרקים שהסריקה תצטרך (בקריאה מרוכזת אחת אם אפשר)."""
+        needed = sorted({self.symbol_for(s, use_sector) for s in symbols} | {self.default_symbol})
+        bulk = getattr(self.dp, "history_many", None)
+        if bulk is not None:
+            try:
+                frames, _ = bulk(needed, period=period, interval=interval)
+                with self._guard:
+                    self._roll_session()
+                    for b in needed:
+                        if b in frames and not frames[b].empty:
+                            self._frames[(b, period, interval)] = frames[b]
+                            self._failed.pop((b, period, interval), None)
+                            self.fetches += 1
+            except Exception:
+                pass
+        for b in needed:
+            self.get(b, period, interval)
@@ -7,15 +7,25 @@ from stock_analysis.strategies.filters import (
     opening_range, first_idx_today, relative_strength_30m
 )
 
-# בחר בנצ'מרק לשוק כולו (אפשר לשפר ל-ETF סקטוריאלי בהמשך)
-BENCH_SYMBOL = "SPY"
+from stock_analysis.strategies.benchmarks import BenchmarkCache, DEFAULT_BENCHMARK
+
+# בנצ'מרק לשוק כולו; ETF סקטוריאלי אפשרי דרך sector_benchmark + BenchmarkCache
+BENCH_SYMBOL = DEFAULT_BENCHMARK
 
 class OpeningBellPlus:
     name = "OpeningBell+"
 
-    def __init__(self, filters: OpeningBellFilterConfig | None = None) -> None:
+    def __init__(self, filters: OpeningBellFilterConfig | None = None,
+                 sector_benchmark: bool = False,
+                 benchmarks: BenchmarkCache | None = None) -> None:
         # מאפשר להזרים preset מבחוץ (app.py -> presets_for_openingbell)
         self.filters = filters
+        self.sector_benchmark = sector_benchmark
+        self.benchmarks = benchmarks
+
+    def with_benchmarks(self, benchmarks: BenchmarkCache) -> "OpeningBellPlus":
+        """עותק של האסטרטגיה שקשור ל-cache בנצ'מרק של סריקה אחת (הרישום ברג'יסטרי לא משתנה)."""
+        return OpeningBellPlus(self.filters, self.sector_benchmark, benchmarks)
 
     def run(self, symbol: str, data_provider, period: str = "5d", interval: str = "5m") -> pd.DataFrame | None:
         # נתונים לסימבול
@@ -24,8 +34,12 @@ class OpeningBellPlus:
             return None
         df = df.copy()
 
-        # נתוני בנצ'מרק
-        bench = data_provider.history(BENCH_SYMBOL, period=period, interval=interval)
+        # נתוני בנצ'מרק (פעם אחת לסריקה אם יש cache)
+        if self.benchmarks is not None:
+            bench_symbol, bench = self.benchmarks.for_symbol(symbol, period, interval, use_sector=self.sector_benchmark)
+        else:
+            bench_symbol = BENCH_SYMBOL
+            bench = data_provider.history(BENCH_SYMBOL, period=period, interval=interval)
         if bench is None or bench.empty:
             bench = pd.DataFrame(index=df.index, data={"Close": np.nan, "Volume": np.nan})
 
@@ -124,6 +138,7 @@ class OpeningBellPlus:
         out.attrs["dollar_vol_m"]    = dvol_m
         out.attrs["atr_5m"]          = atr_5m
         out.attrs["rs_30m"]          = rs_30m
+        out.attrs["benchmark"]       = bench_symbol
         out.attrs["orb_high"]        = orb_high
         out.attrs["orh_break"]       = orh_break
 
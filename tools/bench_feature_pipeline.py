@@ -0,0 +1,86 @@
+# tools/bench_feature_pipeline.py
+# משווה את ה-Pipeline היומי במצב הישן (עותק לכל צעד) מול shared (frame אחד + תוצרי-ביניים משותפים)
+# שימוש: python tools/bench_feature_pipeline.py [symbols=200] [bars=252]
+import sys, time, tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis.features.pipeline import Pipeline
+from stock_analysis.features.rsi import RSI
+from stock_analysis.features.macd import MACD
+from stock_analysis.features.sma import SMA, last_sma
+from stock_analysis.features.volume import VolumeStatus
+
+def _steps():
+    # אותו Pipeline כמו ב-build_screener
+    return [
+        RSI(period=14, out_col="RSI"),
+        MACD(span_fast=12, span_slow=26, out_col="MACD Value"),
+        SMA(window=20), SMA(window=50), SMA(window=200),
+        VolumeStatus(out_ratio_col="Volume Ratio", out_status_col="Volume Status"),
+    ]
+
+def _frames(n: int, bars: int):
+    rng = np.random.default_rng(7)
+    idx = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=bars)
+    for _ in range(n):
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+        yield pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                            "Volume": rng.integers(1e5, 1e6, bars).astype(float)}, index=idx)
+
+def _legacy(pipeline, hist):
+    # כמו analyze_daily לפני: עותק, Pipeline, ואז ממוצעים נעים מחדש
+    df = pipeline.run(hist.copy())
+    return df, [df["Close"].rolling(w).mean().iloc[-1] for w in (20, 50, 200)]
+
+def _shared(pipeline, hist):
+    df = pipeline.run(hist.copy(), copy=False)
+    return df, [last_sma(df, w) for w in (20, 50, 200)]
+
+def _measure(fn, pipeline, frames):
+    """(זמן ממוצע לסימבול, שיא הקצאה ממוצע לסימבול) – כל סימבול נמדד לבד, בלי להחזיק תוצאות."""
+    t0 = time.perf_counter()
+    for f in frames:
+        fn(pipeline, f)
+    elapsed = (time.perf_counter() - t0) / len(frames)
+
+    peaks = []
+    tracemalloc.start()
+    for f in frames:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn(pipeline, f)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return elapsed, sum(peaks) / len(peaks)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 252
+    frames = list(_frames(n, bars))
+    legacy, shared = Pipeline(_steps()), Pipeline(_steps(), shared=True)
+
+    plan = shared.plan()
+    for st in plan["steps"]:
+        print(f"  {st['step']:<13} in={st['inputs']} out={st['outputs']} uses={st['intermediates']}")
+    print("  used by more than one step:", plan["shared"] or "—")
+    for _ in range(2):  # חימום (import-ים פנימיים של pandas)
+        _legacy(legacy, frames[0]); _shared(shared, frames[0])
+
+    for f in frames:
+        (df_a, ma_a), (df_b, ma_b) = _legacy(legacy, f), _shared(shared, f)
+        pd.testing.assert_frame_equal(df_a, df_b)
+        assert np.allclose(ma_a, ma_b, equal_nan=True)
+
+    t_a, peak_a = _measure(_legacy, legacy, frames)
+    t_b, peak_b = _measure(_shared, shared, frames)
+
+    print(f"{'mode':<8} {'ms/symbol':>10} {'peak KiB/symbol':>16}")
+    print(f"{'legacy':<8} {t_a * 1e3:>10.3f} {peak_a / 1024:>16.1f}")
+    print(f"{'shared':<8} {t_b * 1e3:>10.3f} {peak_b / 1024:>16.1f}")
+    print(f"[OK] identical output for {n} symbols × {bars} bars; "
+          f"time x{t_a / max(t_b, 1e-9):.2f}, peak alloc x{peak_a / max(peak_b, 1):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# tools/build_training_dataset.py
+# בונה dataset אימון point-in-time מהנרות היומיים השמורים (data/datasets/<name>/) – בלי רשת.
+# שימוש: python tools/build_training_dataset.py [sp500|nasdaq|stored] [step] [refresh_period]
+#   step: כל כמה ימי מסחר שורת as_of (ברירת מחדל 1)
+#   refresh_period: אם צוין (למשל 10y) – קודם ממלא את מאגר הנרות מהרשת לתקופה הזו
+import sys, time
+
+from stock_analysis.infrastructure.data_providers.yfinance_provider import YFinanceProvider
+from stock_analysis.infrastructure.data.bar_store import default_bar_store
+from stock_analysis.infrastructure.persistent.feature_rows import default_feature_rows
+from stock_analysis.ml.training_dataset import DATASET_DIR, build_training_dataset
+from stock_analysis.utils.symbols import load_sp500_symbols, load_nasdaq_symbols
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "sp500"
+    step = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    refresh_period = sys.argv[3] if len(sys.argv) > 3 else ""
+
+    store = default_bar_store()
+    if name == "stored":
+        symbols = store.symbols("1d")
+    else:
+        symbols = load_nasdaq_symbols() if name == "nasdaq" else load_sp500_symbols()
+    if not symbols:
+        raise SystemExit(f"No symbols for universe '{name}'")
+
+    t0 = time.time()
+    if refresh_period:
+        dp = YFinanceProvider(bar_store=store)
+        _frames, missing = dp.history_many(list(symbols), period=refresh_period, interval="1d")
+        print(f"[OK] bars {refresh_period}: {len(symbols) - len(missing)}/{len(symbols)} in {time.time() - t0:.1f}s")
+
+    # Sector כמו ב-extract (info של yfinance) – מהשורות שכבר חולצו, אם יש
+    rows = default_feature_rows()
+    sectors = {t: r.get("Sector", "Other") for t, r in (rows.rows(symbols) if rows is not None else {}).items()}
+
+    ds = build_training_dataset(name, symbols, store=store, sectors=sectors, step=step)
+    print(f"[OK] {name}: {len(ds)} rows, {len(ds.symbols)} symbols in {time.time() - t0:.1f}s -> {DATASET_DIR}/{name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# tools/build_universe_cube.py
+# בונה/מרענן קובייה memory-mapped של נרות ל-universe שלם (data/cubes/<name>/)
+# שימוש: python tools/build_universe_cube.py sp500 [period] [interval]
+import sys, time
+
+from stock_analysis.infrastructure.data_providers.yfinance_provider import YFinanceProvider
+from stock_analysis.infrastructure.data.bar_store import default_bar_store
+from stock_analysis.infrastructure.data.universe_cube import refresh_universe_cube
+from stock_analysis.utils.symbols import load_sp500_symbols, load_nasdaq_symbols
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "sp500"
+    period = sys.argv[2] if len(sys.argv) > 2 else "1y"
+    interval = sys.argv[3] if len(sys.argv) > 3 else "1d"
+
+    symbols = load_nasdaq_symbols() if name == "nasdaq" else load_sp500_symbols()
+    if not symbols:
+        raise SystemExit(f"No symbols for universe '{name}' (missing prices CSV?)")
+
+    t0 = time.time()
+    dp = YFinanceProvider(bar_store=default_bar_store())
+    cube = refresh_universe_cube(name, symbols, dp, period=period, interval=interval)
+    print(f"[OK] {name}: shape={cube.shape} ({len(cube.symbols)}/{len(symbols)} symbols) "
+          f"in {time.time() - t0:.1f}s -> data/cubes/{name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# tools/export_compact_forests.py
+# מייצא את היערות המאומנים (model_<period>.pkl) למערכי NumPy שטוחים (forest_<period>/) ל-ModelRegistry
+# שימוש: python tools/export_compact_forests.py [artifacts_dir]
+import sys, time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from stock_analysis.ml.compact_forest import compact_dir, export_forest
+
+def main():
+    artifacts_dir = Path(sys.argv[1] if len(sys.argv) > 1 else "artifacts")
+    models = sorted(artifacts_dir.glob("model_*.pkl"))
+    if not models:
+        raise SystemExit(f"No model_*.pkl in {artifacts_dir}")
+
+    for model_path in models:
+        period = model_path.stem[len("model_"):]
+        t0 = time.time()
+        model = joblib.load(model_path)
+        feature_names = list(joblib.load(artifacts_dir / f"features_{period}.pkl"))
+        forest = export_forest(model, feature_names, compact_dir(artifacts_dir, period), source=model_path)
+        # בדיקת זהות על שורות אקראיות בטווח הערכים של הספים
+        X = np.random.default_rng(0).normal(0, 50, size=(256, len(feature_names)))
+        same = np.array_equal(model.predict_proba(X), forest.predict_proba(X))
+        print(f"[{'OK' if same else 'MISMATCH'}] {period}: {forest.n_estimators} trees, "
+              f"{forest.meta['n_nodes']} nodes, {forest.nbytes / 1e6:.2f}MB in {time.time() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
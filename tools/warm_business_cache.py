@@ -0,0 +1,45 @@
+# tools/warm_business_cache.py
+# מחמם את ה-cache העסקי (ויקי / מתחרים / מחזיקים) ל-universe שלם, כדי שהצ'קליסט בסריקה לא יעלה רשת
+# שימוש: python tools/warm_business_cache.py sp500|nasdaq [workers]
+import sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+from stock_analysis.infrastructure.business.business_cache import (
+    CachedWikipediaClient, CachedCompetitorClient, CachedHoldersProvider, default_business_cache,
+)
+from stock_analysis.infrastructure.business.wiki_client import WikipediaHttpClient
+from stock_analysis.infrastructure.business.tipranks_client import TipRanksClient
+from stock_analysis.infrastructure.business.holders_yf import YFinanceHoldersProvider
+from stock_analysis.utils.symbols import load_sp500_symbols, load_nasdaq_symbols
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "sp500"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    symbols = load_nasdaq_symbols() if name == "nasdaq" else load_sp500_symbols()
+    if not symbols:
+        raise SystemExit(f"No symbols for universe '{name}' (missing prices CSV?)")
+    cache = default_business_cache()
+    if cache is None:
+        raise SystemExit("BUSINESS_CACHE_DB is empty – business cache disabled")
+
+    wiki = CachedWikipediaClient(WikipediaHttpClient(strict=True), cache)
+    competitors = CachedCompetitorClient(TipRanksClient(strict=True), cache)
+    holders = CachedHoldersProvider(YFinanceHoldersProvider(strict=True), cache)
+
+    def warm(symbol: str) -> None:
+        # אותם מפתחות שהצ'קליסט משתמש בהם (כותרת ויקי = הסימבול, top_n=5)
+        wiki.page_summary(symbol)
+        competitors.similar_symbols(symbol)
+        holders.top_institutional_holders(symbol, top_n=5)
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for i, _ in enumerate(ex.map(warm, symbols), 1):
+            if i % 50 == 0:
+                print(f"  {i}/{len(symbols)}")
+    print(f"[OK] {name}: {len(symbols)} symbols in {time.time() - t0:.1f}s -> {cache.db_path}")
+    print(cache.stats())
+
+if __name__ == "__main__":
+    main()
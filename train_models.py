@@ -1,4 +1,8 @@
+import sys
+
 from stock_analysis.ml.periodic_trainer import train_models
 
 if __name__ == "__main__":
-    train_models(artifacts_dir="artifacts", save_legacy_copy=True)
+    # python train_models.py [dataset] – בלי ארגומנט: צילום מצב של ה-S&P 500 (ההתנהגות המקורית)
+    train_models(artifacts_dir="artifacts", save_legacy_copy=True,
+                 dataset=sys.argv[1] if len(sys.argv) > 1 else None)